@@ -6,7 +6,7 @@ Project: Instagram Bot – Automate Instagram Messages
 File: __init__.py 
 Author: Mobin Yousefi (GitHub: github.com/mobinyousefi) 
 Created: 2025-10-20 
-Updated: 2025-10-20 
+Updated: 2026-10-18 
 License: MIT License (see LICENSE file for details)
 =================================================================== 
 
@@ -23,9 +23,17 @@ Notes:
 """
 from __future__ import annotations
 
-from .auth import login_and_persist
-from .messaging import send_dm
-from .scheduler import delay_then, repeat_every
+import importlib
+from typing import TYPE_CHECKING, Any
+
+# Public name -> submodule; resolved on first access so `import instagram_bot`
+# (and the CLI's --help) does not pay for Selenium.
+_LAZY = {
+    "login_and_persist": ".auth",
+    "send_dm": ".messaging",
+    "delay_then": ".scheduler",
+    "repeat_every": ".scheduler",
+}
 
 __all__ = [
     "login_and_persist",
@@ -33,3 +41,21 @@ __all__ = [
     "delay_then",
     "repeat_every",
 ]
+
+if TYPE_CHECKING:
+    from .auth import login_and_persist
+    from .messaging import send_dm
+    from .scheduler import delay_then, repeat_every
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value  # later lookups skip __getattr__
+    return value
+
+
+def __dir__() -> list:
+    return sorted(set(globals()) | set(__all__))
@@ -6,7 +6,7 @@ Project: Instagram Bot – Automate Instagram Messages
 File: auth.py 
 Author: Mobin Yousefi (GitHub: github.com/mobinyousefi) 
 Created: 2025-10-20 
-Updated: 2025-10-20 
+Updated: 2026-10-18 
 License: MIT License (see LICENSE file for details)
 =================================================================== 
 
@@ -24,108 +24,314 @@ Notes:
 """
 from __future__ import annotations
 
-import json
+import logging
 import time
 from pathlib import Path
-from typing import Iterable
+from typing import TYPE_CHECKING, Any, Dict, Tuple
 
+from selenium.common.exceptions import StaleElementReferenceException
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.remote.webdriver import WebDriver
 
+from . import metrics
+from .automation.waits import navigate, wait_for
 from .config import Settings
-from .exceptions import LoginError, SelectorNotFoundError
-from .utils.selectors import SX
+from .cookie_store import SESSION_COOKIE, CookieStore, SessionRecord
+from .exceptions import (
+    ChallengeRequiredError,
+    LoginError,
+    SelectorNotFoundError,
+    SessionExpiredError,
+)
+from .pages import LoginPage
+from .utils.lazy import lazy_import
+from .utils import selectors as sel
 
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
 
-def _click_if_present(driver: WebDriver, xpath: str, timeout: float = 5.0) -> bool:
-    try:
-        el = WebDriverWait(driver, timeout).until(EC.element_to_be_clickable((By.XPATH, xpath)))
-        el.click()
-        return True
-    except Exception:
-        return False
+# Pulls in the whole WebDriver client; load it with the first wait, not at import
+EC = lazy_import("selenium.webdriver.support.expected_conditions")
 
+log = logging.getLogger(__name__)
 
-def _restore_cookies(driver: WebDriver, base_url: str, cookie_path: Path) -> bool:
-    if not cookie_path.exists():
+_EXPIRY_MARGIN = 60.0  # seconds a "fresh" session cookie must still be valid for
+
+
+# Page states a fresh login can be in; _login_state() reports whichever shows up first
+BANNER = "banner"
+FORM = "form"
+DIALOG = "dialog"  # "Save your login info?" / "Turn on Notifications", both dismissed
+CHALLENGE = "challenge"
+ERROR = "error"
+DONE = "done"
+LOGIN_STATES = (BANNER, FORM, DIALOG, CHALLENGE, ERROR, DONE)
+
+_LOGIN_TIMEOUT = 60.0  # whole flow, not per step
+_MAX_VISITS = 3  # the same state handled this often means the page is not reacting
+_DISMISS_TIMEOUT = 5.0  # for a clicked banner/dialog to close before it counts as a revisit
+
+
+def is_auth_wall(url: str) -> bool:
+    """True if ``url`` is where Instagram sends unauthenticated sessions."""
+    return "/accounts/login" in url or "/challenge/" in url
+
+
+def ensure_authenticated(driver: WebDriver) -> None:
+    """Raise ``SessionExpiredError`` if the last navigation bounced to login.
+
+    A checkpoint page raises ``ChallengeRequiredError`` instead: logging in
+    again would only land on it once more.
+    """
+    url = driver.current_url
+    if "/challenge/" in url:
+        raise ChallengeRequiredError("Checkpoint/2FA challenge encountered; complete it manually.")
+    if is_auth_wall(url):
+        raise SessionExpiredError("Session rejected; log in again.")
+
+
+def _session_fresh(record: SessionRecord, ttl: float) -> bool:
+    """Session cookie unexpired and the session was confirmed valid within ``ttl``."""
+    if ttl <= 0 or record.validated_at is None:
+        return False
+    now = time.time()
+    if now - record.validated_at >= ttl:
+        return False
+    if not any(c.get("name") == "sessionid" for c in record.cookies):
         return False
+    return record.expires is None or record.expires > now + _EXPIRY_MARGIN
+
+
+def _cdp_cookie(c: dict, base_url: str) -> dict:
+    """Selenium cookie dict -> CDP Network.CookieParam."""
+    param = {"name": c["name"], "value": c["value"], "path": c.get("path", "/")}
+    if c.get("domain"):
+        param["domain"] = c["domain"]
+    else:
+        param["url"] = base_url  # host-only cookie
+    for src, dst in (("secure", "secure"), ("httpOnly", "httpOnly"), ("expiry", "expires")):
+        if c.get(src) is not None:
+            param[dst] = c[src]
+    if c.get("sameSite") in ("Strict", "Lax", "None"):
+        param["sameSite"] = c["sameSite"]
+    return param
+
+
+def _set_cookies_cdp(driver: WebDriver, base_url: str, cookies: list) -> list | None:
+    """Set all cookies in one CDP call; return the names Chrome did not keep.
+
+    Returns None when CDP is unavailable (non-Chromium driver).
+    """
     try:
-        cookies = json.loads(cookie_path.read_text(encoding="utf-8"))
+        driver.execute_cdp_cmd(
+            "Network.setCookies", {"cookies": [_cdp_cookie(c, base_url) for c in cookies]}
+        )
+        stored = driver.execute_cdp_cmd("Network.getAllCookies", {}).get("cookies", [])
     except Exception:
-        return False
+        return None
+    kept = {(c["name"], c.get("domain", "").lstrip(".")) for c in stored}
+    kept_names = {name for name, _ in kept}
+
+    def _kept(c: dict) -> bool:
+        if c.get("domain"):
+            return (c["name"], c["domain"].lstrip(".")) in kept
+        return c["name"] in kept_names
 
-    driver.get(base_url)
+    return [c["name"] for c in cookies if not _kept(c)]
+
+
+def _add_cookies_webdriver(driver: WebDriver, base_url: str, cookies: list) -> list:
+    # WebDriver can only add cookies for the current document's domain
+    navigate(driver, base_url)
+    rejected = []
     for c in cookies:
-        # Selenium expects domain-less cookies added after at least one navigation
-        c.pop("sameSite", None)  # avoid invalid enum values
+        c = dict(c)
+        if c.get("sameSite") not in ("Strict", "Lax", "None"):
+            c.pop("sameSite", None)  # avoid invalid enum values
         try:
             driver.add_cookie(c)
         except Exception:
-            pass
-    driver.get(base_url)
-    return True
+            rejected.append(c["name"])
+    return rejected
+
+
+def _restore_cookies(driver: WebDriver, base_url: str, cookie_path: Path) -> bool:
+    """Load stored cookies into the browser before its first real navigation.
+
+    Uses one CDP Network.setCookies batch where available, so the next page
+    loaded is already the one we need. Expired and rejected cookies are logged.
+    """
+    record = CookieStore(cookie_path).load()
+    if record is None:
+        return False
+
+    now = time.time()
+    expired = [c["name"] for c in record.cookies if c.get("expiry") and c["expiry"] <= now]
+    cookies = [c for c in record.cookies if c["name"] not in expired]
+
+    with metrics.span("auth.restore_cookies", label="cdp", cookies=len(cookies)) as attrs:
+        rejected = _set_cookies_cdp(driver, base_url, cookies)
+        if rejected is None:
+            attrs["label"] = "add_cookie"
+            rejected = _add_cookies_webdriver(driver, base_url, cookies)
+        attrs["rejected"] = len(rejected)
+
+    for name in expired:
+        log.info("Stored cookie %r has expired; not restoring it.", name)
+    for name in rejected:
+        log.warning("Browser rejected stored cookie %r.", name)
+        metrics.event("auth.cookie_rejected", label=name)
+    return len(rejected) < len(cookies)
 
 
 def _save_cookies(driver: WebDriver, cookie_path: Path) -> None:
-    cookies = driver.get_cookies()
-    cookie_path.write_text(json.dumps(cookies, ensure_ascii=False, indent=2), encoding="utf-8")
+    # Only called with a session that was just confirmed, so stamp it valid
+    record = SessionRecord(cookies=driver.get_cookies(), validated_at=time.time())
+    CookieStore(cookie_path).save(record)
+
+
+def mark_session_valid(cfg: Settings) -> None:
+    """Record that the stored session just worked (e.g. after a successful send)."""
+    CookieStore(cfg.cookie_path).mark_valid()
 
 
 def _wait_disappear(driver: WebDriver, xpath: str, timeout: float = 10.0) -> None:
     try:
-        WebDriverWait(driver, timeout).until(EC.invisibility_of_element_located((By.XPATH, xpath)))
+        gone = EC.invisibility_of_element_located((By.XPATH, xpath))
+        wait_for(driver, timeout, gone, "disappear")
     except Exception:
         pass
 
 
-def login_and_persist(driver: WebDriver, cfg: Settings) -> None:
-    """Ensure an authenticated session using cookie-restore-first strategy."""
-    # Attempt cookie restore
-    restored = _restore_cookies(driver, cfg.base_url, cfg.cookie_path)
+def _wait_gone(driver: WebDriver, el: Any) -> None:
+    def gone(_: WebDriver) -> bool:
+        try:
+            return not el.is_displayed()
+        except StaleElementReferenceException:
+            return True
 
-    # Check if already logged in by hitting /direct/inbox/
-    driver.get(f"{cfg.base_url}/direct/inbox/")
-    time.sleep(2)
-    if "/accounts/login" not in driver.current_url and "/challenge/" not in driver.current_url:
-        return  # session is valid
+    try:
+        wait_for(driver, _DISMISS_TIMEOUT, gone, "dismiss", poll_frequency=0.1)
+    except Exception:
+        pass
 
-    # Fresh login
-    driver.get(f"{cfg.base_url}/accounts/login/")
 
-    # Accept cookies if banner shown
-    _click_if_present(driver, SX.ACCEPT_COOKIES_BTN, timeout=5)
+def _session_valid(driver: WebDriver, base_url: str) -> bool:
+    # Check if already logged in by hitting /direct/inbox/
+    with metrics.span("auth.validate", label="inbox_probe") as attrs:
+        navigate(driver, f"{base_url}/direct/inbox/")
+        time.sleep(2)
+        attrs["valid"] = valid = not is_auth_wall(driver.current_url)
+    return valid
 
-    try:
-        username_input = WebDriverWait(driver, 15).until(
-            EC.visibility_of_element_located((By.XPATH, SX.USERNAME_INPUT))
-        )
-        password_input = WebDriverWait(driver, 15).until(
-            EC.visibility_of_element_located((By.XPATH, SX.PASSWORD_INPUT))
-        )
-    except Exception as e:
-        raise SelectorNotFoundError("Login inputs not found; DOM likely changed.") from e
 
-    username_input.clear()
-    username_input.send_keys(cfg.username)
-    password_input.clear()
-    password_input.send_keys(cfg.password)
+def login_and_persist(driver: WebDriver, cfg: Settings, *, allow_skip: bool = True) -> None:
+    """Ensure an authenticated session using cookie-restore-first strategy.
+
+    If the stored session was confirmed valid within ``cfg.session_ttl`` and its
+    cookie has not expired, the /direct/inbox/ probe is skipped (unless
+    ``allow_skip`` is False). Validation then happens on the first real
+    navigation, which raises ``SessionExpiredError`` when it lands on login.
+    """
+    with metrics.span("auth.login", label="login_and_persist"):
+        _login_and_persist(driver, cfg, allow_skip)
 
-    _click_if_present(driver, SX.LOGIN_BUTTON, timeout=10)
 
-    # Wait for redirect or challenge
-    WebDriverWait(driver, 30).until(
-        lambda d: "/accounts/login" not in d.current_url
+def _login_and_persist(driver: WebDriver, cfg: Settings, allow_skip: bool) -> None:
+    # Attempt cookie restore; a warm persistent profile already has its own, newer cookies
+    restored = getattr(driver, "profile_warm", False) or _restore_cookies(
+        driver, cfg.base_url, cfg.cookie_path
     )
 
-    if "/challenge/" in driver.current_url:
-        raise LoginError("Checkpoint/2FA challenge encountered. Complete manually then retry with cookies.")
+    store = CookieStore(cfg.cookie_path)
+    record = store.load() if restored else None
+    if allow_skip and record is not None and _session_fresh(record, cfg.session_ttl):
+        metrics.event("auth.skip_probe", label="fresh_session")
+        return
+
+    if _session_valid(driver, cfg.base_url):
+        if record is not None:
+            store.mark_valid()
+        return  # session is valid
 
-    # Dismiss any "Save info" / "Turn on notifications" dialogs
-    for _ in range(2):
-        _click_if_present(driver, SX.NOT_NOW_BUTTON, timeout=5)
-        time.sleep(1)
+    # Fresh login
+    metrics.event("auth.fresh_login", label="credentials", restored=restored)
+    _fresh_login(driver, cfg)
 
     # Persist cookies
     _save_cookies(driver, cfg.cookie_path)
+
+
+def _login_state(driver: WebDriver, submitted: bool) -> Tuple[str, Any] | None:
+    """The state the login flow is in now, with the element to act on; None if unclear."""
+    url = driver.current_url
+    if "/challenge/" in url:
+        return CHALLENGE, None
+    if "/accounts/login" in url:
+        el = sel.ACCEPT_COOKIES.find(driver, "clickable")
+        if el is not None:
+            return BANNER, el
+        if submitted:
+            el = sel.LOGIN_ERROR.find(driver, "visible")
+            return (ERROR, el) if el is not None else None
+        el = sel.USERNAME_INPUT.find(driver, "visible")
+        return (FORM, el) if el is not None else None
+    el = sel.NOT_NOW.find(driver, "clickable")
+    if el is not None:
+        return DIALOG, el
+    # Off the login page is not proof (redirects pass through "/" first); the cookie is
+    if driver.get_cookie(SESSION_COOKIE) is None:
+        return None
+    return DONE, None
+
+
+def _fresh_login(driver: WebDriver, cfg: Settings) -> None:
+    """Log in with credentials, handling each page state as soon as it appears.
+
+    One wait covers every state, so a dialog that never shows up costs nothing
+    and the flow takes as long as the site does, bounded by _LOGIN_TIMEOUT.
+    """
+    page = LoginPage(driver)
+    page.open(cfg.base_url)
+    deadline = time.monotonic() + _LOGIN_TIMEOUT
+    submitted = False
+    visits: Dict[str, int] = {}
+    while True:
+        remaining = deadline - time.monotonic()
+        try:
+            state, el = wait_for(
+                driver,
+                max(remaining, 0.0),
+                lambda d: _login_state(d, submitted),
+                "login_state",
+                poll_frequency=0.2,
+            )
+        except Exception as e:
+            raise LoginError(f"Login did not complete within {_LOGIN_TIMEOUT:.0f}s.") from e
+        visits[state] = visits.get(state, 0) + 1
+        metrics.event("auth.login_state", label=state, visit=visits[state])
+        if visits[state] > _MAX_VISITS:
+            raise LoginError(f"Login stuck at the {state!r} step.")
+
+        if state == DONE:
+            return
+        if state == CHALLENGE:
+            raise ChallengeRequiredError(
+                "Checkpoint/2FA challenge encountered. Complete manually then retry with cookies."
+            )
+        if state == ERROR:
+            raise LoginError(f"Login rejected: {el.text.strip() or 'no reason given'}")
+        if state == FORM:
+            try:
+                page.fill(cfg.username, cfg.password)
+                page.submit()
+            except Exception as e:
+                raise SelectorNotFoundError("Login inputs not found; DOM likely changed.") from e
+            submitted = True
+            continue
+        # BANNER / DIALOG: dismiss and let it close (it may animate out) before looking
+        # again, so only a click that did nothing shows up as a revisit
+        try:
+            el.click()
+        except Exception:
+            pass
+        _wait_gone(driver, el)
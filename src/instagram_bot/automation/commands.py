@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+=================================================================== 
+Project: Instagram Bot – Automate Instagram Messages 
+File: automation/commands.py 
+Author: Mobin Yousefi (GitHub: github.com/mobinyousefi) 
+Created: 2026-10-18 
+Updated: 2026-10-18 
+License: MIT License (see LICENSE file for details)
+=================================================================== 
+
+Description: 
+Opt-in accounting of WebDriver commands. Every chromedriver command is an
+HTTP round-trip; this counts and times them by command and by the
+operation that issued it (login, open thread, type, send).
+
+Usage: 
+acc = CommandAccounting()
+driver = acc.attach(make_driver())
+with acc.budget(60):
+    send_dm(driver, base_url, "alice", "hi")
+print(acc.report())
+
+Notes: 
+- The operation is taken from the innermost open metrics span listed in
+  OPERATIONS (see metrics.open_spans()); anything else is "other".
+- Works on anything with a ``command_executor.execute(command, params)``,
+  which is selenium's RemoteConnection and testing.fake_driver.FakeDriver.
+
+===================================================================
+"""
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List
+
+from .. import metrics
+
+# Span name -> operation the commands inside it are charged to
+OPERATIONS = {
+    "auth.login": "login",
+    "messaging.open_thread": "open_thread",
+    "messaging.type_text": "type",
+    "messaging.submit": "send",
+}
+OTHER = "other"
+
+
+class CommandBudgetExceeded(AssertionError):
+    """A block issued more WebDriver commands than its budget allows."""
+
+
+@dataclass
+class CommandStat:
+    count: int = 0
+    seconds: float = 0.0
+    slowest: float = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        self.slowest = max(self.slowest, seconds)
+
+
+def current_operation() -> str:
+    for name in reversed(metrics.open_spans()):
+        if name in OPERATIONS:
+            return OPERATIONS[name]
+    return OTHER
+
+
+class CommandAccounting:
+    """Counts and times the commands of every driver passed to attach()."""
+
+    def __init__(self) -> None:
+        self.stats: Dict[str, Dict[str, CommandStat]] = {}  # operation -> command -> stat
+        self._attached: List[Any] = []
+
+    def attach(self, driver: Any) -> Any:
+        """Wrap ``driver``'s command executor; returns ``driver`` for chaining."""
+        executor = driver.command_executor
+        inner = executor.execute
+
+        def execute(command: str, params: Any = None) -> Any:
+            op = current_operation()
+            start = time.perf_counter()
+            try:
+                return inner(command, params)
+            finally:
+                stat = self.stats.setdefault(op, {}).setdefault(command, CommandStat())
+                stat.add(time.perf_counter() - start)
+
+        executor.execute = execute
+        self._attached.append(executor)
+        return driver
+
+    def detach(self) -> None:
+        for executor in self._attached:
+            try:
+                del executor.execute  # back to the class's method
+            except AttributeError:
+                pass
+        self._attached.clear()
+
+    def total(self, operation: str | None = None) -> int:
+        ops = [operation] if operation else list(self.stats)
+        return sum(s.count for op in ops for s in self.stats.get(op, {}).values())
+
+    def by_command(self) -> Dict[str, CommandStat]:
+        out: Dict[str, CommandStat] = {}
+        for per_op in self.stats.values():
+            for command, s in per_op.items():
+                agg = out.setdefault(command, CommandStat())
+                agg.count += s.count
+                agg.seconds += s.seconds
+                agg.slowest = max(agg.slowest, s.slowest)
+        return out
+
+    def reset(self) -> None:
+        self.stats.clear()
+
+    @contextmanager
+    def budget(self, max_commands: int, operation: str | None = None) -> Iterator[None]:
+        """Raise CommandBudgetExceeded if the block issues more than ``max_commands``."""
+        before = self.total(operation)
+        yield
+        used = self.total(operation) - before
+        if used > max_commands:
+            scope = f"{operation!r} " if operation else ""
+            raise CommandBudgetExceeded(
+                f"{used} {scope}WebDriver commands, budget {max_commands}"
+            )
+
+    def emit_metrics(self) -> None:
+        for op, per_op in self.stats.items():
+            for command, s in per_op.items():
+                metrics.event(
+                    "driver.commands",
+                    label=op,
+                    command=command,
+                    count=s.count,
+                    seconds=round(s.seconds, 6),
+                )
+
+    def report(self) -> str:
+        """Per-operation table of command counts with total and mean milliseconds."""
+        lines = [f"{'operation / command':<32}{'count':>8}{'total ms':>11}{'mean ms':>10}"]
+        ops = sorted(self.stats, key=lambda op: -self.total(op))
+        for op in ops:
+            per_op = self.stats[op]
+            seconds = sum(s.seconds for s in per_op.values())
+            lines.append(f"{op:<32}{self.total(op):>8}{seconds * 1000:>11.1f}")
+            for command, s in sorted(per_op.items(), key=lambda kv: -kv[1].count):
+                lines.append(
+                    f"  {command:<30}{s.count:>8}{s.seconds * 1000:>11.1f}"
+                    f"{s.seconds / s.count * 1000:>10.2f}"
+                )
+        lines.append(f"{'total':<32}{self.total():>8}")
+        return "\n".join(lines)
@@ -6,7 +6,7 @@ Project: Instagram Bot – Automate Instagram Messages
 File: automation/driver.py 
 Author: Mobin Yousefi (GitHub: github.com/mobinyousefi) 
 Created: 2025-10-20 
-Updated: 2025-10-20 
+Updated: 2026-10-18 
 License: MIT License (see LICENSE file for details)
 =================================================================== 
 
@@ -19,18 +19,105 @@ from instagram_bot.automation.driver import make_driver
 Notes: 
 - Uses Selenium 4 Service and built-in driver manager when available.
 - Disables automation flags as much as possible (still detectable by IG).
+- Optional persistent profile (IG_PROFILE_DIR), guarded by a sibling .lock file.
+- Blocking profiles (IG_BLOCK_PROFILE) keep images, media, fonts and
+  trackers from loading and use the "eager" page-load strategy.
 
 ===================================================================
 """
 from __future__ import annotations
 
+import time
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Dict, Iterable, Tuple
+
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 
+from .. import metrics
+from ..exceptions import ProfileLockedError
+from ..utils.filelock import FileLock
+
+# Left behind by a Chrome that crashed; they make the next launch refuse the profile
+_SINGLETON_FILES = ("SingletonLock", "SingletonSocket", "SingletonCookie")
+# Chrome's words for a profile it cannot use; any other launch error is not the profile's fault
+_PROFILE_ERRORS = (
+    "user data directory is already in use",
+    "processsingleton",
+    "profile appears to be in use",
+    "profile could not be opened",
+    "cannot create default profile directory",
+)
+
+
+@dataclass(frozen=True)
+class BlockProfile:
+    """What a driver does not load: URL patterns (CDP wildcards) and, optionally, images."""
+
+    name: str
+    urls: Tuple[str, ...] = ()
+    images: bool = False
+    page_load: str = "normal"  # Selenium page_load_strategy
+
+
+_MEDIA = ("*.mp4*", "*.m4v*", "*.webm*", "*.m3u8*", "*.mpd*")
+_FONTS = ("*.woff*", "*.ttf*", "*.otf*")
+_TRACKERS = (
+    "*connect.facebook.net/*",
+    "*google-analytics.com/*",
+    "*googletagmanager.com/*",
+    "*doubleclick.net/*",
+)
+_TELEMETRY = ("*/logging_client_events*", "*/ajax/bz*", "*/ajax/logging/*")
+
+BLOCK_PROFILES: Dict[str, BlockProfile] = {
+    "off": BlockProfile("off"),
+    # Nothing the login form, compose dialog or composer needs
+    "safe": BlockProfile("safe", _MEDIA + _FONTS + _TRACKERS, images=True, page_load="eager"),
+    # Also Instagram's own client telemetry
+    "strict": BlockProfile(
+        "strict", _MEDIA + _FONTS + _TRACKERS + _TELEMETRY, images=True, page_load="eager"
+    ),
+}
+
+
+def block_profile(name: str, extra_urls: Iterable[str] = ()) -> BlockProfile:
+    """The named profile, with ``extra_urls`` blocked as well."""
+    try:
+        profile = BLOCK_PROFILES[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown block profile {name!r}; expected one of {', '.join(BLOCK_PROFILES)}."
+        ) from None
+    extra = tuple(u for u in extra_urls if u not in profile.urls)
+    if extra:
+        profile = replace(profile, urls=profile.urls + extra)
+    return profile
+
+
+class _ProfileChrome(webdriver.Chrome):
+    """Chrome on a persistent profile; releases the profile lock on quit()."""
+
+    profile_lock: FileLock | None = None
+    profile_warm: bool = False  # profile already held data before this launch
+
+    def quit(self) -> None:
+        try:
+            super().quit()
+        finally:
+            if self.profile_lock is not None:
+                self.profile_lock.release()
 
-def make_driver(headless: bool = True) -> webdriver.Chrome:
+
+def _options(headless: bool, blocking: BlockProfile) -> Options:
     opts = Options()
+    opts.page_load_strategy = blocking.page_load
+    if blocking.images:
+        opts.add_experimental_option(
+            "prefs", {"profile.managed_default_content_settings.images": 2}
+        )
     if headless:
         opts.add_argument("--headless=new")
     opts.add_argument("--disable-blink-features=AutomationControlled")
@@ -41,18 +128,106 @@ def make_driver(headless: bool = True) -> webdriver.Chrome:
     # Some steadiness
     opts.add_experimental_option("excludeSwitches", ["enable-automation"]) 
     opts.add_experimental_option("useAutomationExtension", False)
+    return opts
+
 
+def _start(
+    opts: Options, blocking: BlockProfile, cls: type = webdriver.Chrome
+) -> webdriver.Chrome:
     # Selenium Manager will fetch the correct ChromeDriver automatically
     service = Service()
-    driver = webdriver.Chrome(service=service, options=opts)
-
-    # Fingerprint light mitigations
-    driver.execute_cdp_cmd(
-        "Page.addScriptToEvaluateOnNewDocument",
-        {
-            "source": (
-                "Object.defineProperty(navigator, 'webdriver', {get: () => undefined});"
-            )
-        },
-    )
+    driver = cls(service=service, options=opts)
+    try:
+        # Fingerprint light mitigations
+        driver.execute_cdp_cmd(
+            "Page.addScriptToEvaluateOnNewDocument",
+            {
+                "source": (
+                    "Object.defineProperty(navigator, 'webdriver', {get: () => undefined});"
+                )
+            },
+        )
+        if blocking.urls:
+            # Applies to every later navigation of this tab
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(blocking.urls)})
+    except Exception:
+        try:
+            driver.quit()  # nobody else holds this Chrome; don't leave it running
+        except Exception:
+            pass
+        raise
+    return driver
+
+
+def _profile_error(exc: Exception) -> bool:
+    text = str(exc).lower()
+    return any(marker in text for marker in _PROFILE_ERRORS)
+
+
+def _start_with_profile(
+    headless: bool, profile_dir: Path, blocking: BlockProfile
+) -> webdriver.Chrome:
+    lock = FileLock(profile_dir.with_name(f"{profile_dir.name}.lock"), timeout=0)
+    if not lock.acquire():
+        raise ProfileLockedError(f"Chrome profile {profile_dir} is in use by another process.")
+
+    warm = profile_dir.is_dir() and any(profile_dir.iterdir())
+    for name in _SINGLETON_FILES:  # we hold the lock, so nobody else is using them
+        try:
+            (profile_dir / name).unlink()
+        except OSError:
+            pass
+
+    opts = _options(headless, blocking)
+    opts.add_argument(f"--user-data-dir={profile_dir.resolve()}")
+    try:
+        driver = _start(opts, blocking, _ProfileChrome)
+    except Exception as profile_error:
+        if not _profile_error(profile_error):
+            lock.release()
+            raise
+        # Make sure it is the profile and not Chrome: try a throwaway profile
+        try:
+            driver = _start(_options(headless, blocking), blocking)
+        except Exception:
+            lock.release()
+            raise profile_error
+        # Chrome is fine, so the profile is not; set it aside for the next run.
+        # The caller's cookie restore rebuilds the session this time.
+        aside = profile_dir.with_name(f"{profile_dir.name}.corrupt-{int(time.time())}")
+        try:
+            profile_dir.rename(aside)
+        except OSError:
+            pass
+        lock.release()
+        metrics.event("driver.profile_fallback", label="corrupt_profile", moved_to=str(aside))
+        return driver
+
+    driver.profile_lock = lock
+    driver.profile_warm = warm
     return driver
+
+
+def make_driver(
+    headless: bool = True,
+    profile_dir: Path | None = None,
+    blocking: BlockProfile | str = "safe",
+) -> webdriver.Chrome:
+    """Start Chrome, on a throwaway profile or on ``profile_dir``.
+
+    A persistent profile keeps cookies, HTTP cache and service workers across
+    runs and is locked against concurrent use (``ProfileLockedError``). If
+    Chrome refuses it as locked or corrupt, the profile is moved aside and a
+    throwaway profile is used for this run; other launch errors are raised.
+
+    ``blocking`` names a BLOCK_PROFILES entry (or is a BlockProfile) that
+    decides which resources the browser does not fetch.
+    """
+    if isinstance(blocking, str):
+        blocking = block_profile(blocking)
+    label = "profile" if profile_dir else "throwaway"
+    with metrics.span("driver.start", label=label, blocking=blocking.name):
+        if profile_dir is None:
+            return _start(_options(headless, blocking), blocking)
+        return _start_with_profile(headless, profile_dir, blocking)
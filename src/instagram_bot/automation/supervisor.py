@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+=================================================================== 
+Project: Instagram Bot – Automate Instagram Messages 
+File: automation/supervisor.py 
+Author: Mobin Yousefi (GitHub: github.com/mobinyousefi) 
+Created: 2026-10-18 
+Updated: 2026-10-18 
+License: MIT License (see LICENSE file for details)
+=================================================================== 
+
+Description: 
+Keeps one logged-in Chrome for a long-running process and replaces it
+after a number of sends, when its memory grows past a limit, or when it
+has died. The replacement logs in through the usual cookie restore.
+
+Usage: 
+sup = DriverSupervisor(lambda: make_driver(), lambda d: login_and_persist(d, cfg),
+                       max_sends=200, max_memory_mb=1500)
+driver = sup.get()
+...send...
+sup.after_send()
+
+Notes: 
+- Memory is the PSS (else RSS) of chromedriver and every process below it,
+  read from /proc; elsewhere the renderer's JS heap from CDP
+  Performance.getMetrics stands in.
+- Recycling only closes the browser; the next get() starts the new one.
+
+===================================================================
+"""
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+
+from .. import metrics
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
+
+# Recycle reasons (metrics label "driver.recycle")
+SEND_COUNT = "send_count"
+MEMORY = "memory"
+CRASH = "crash"
+
+_PROC = Path("/proc")
+
+
+def _children() -> Dict[int, List[int]]:
+    kids: Dict[int, List[int]] = {}
+    for entry in os.scandir(_PROC):
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (_PROC / entry.name / "stat").read_text()
+        except OSError:
+            continue  # exited while we looked
+        # The command name may hold spaces and parentheses; ppid follows the last ")"
+        ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        kids.setdefault(ppid, []).append(int(entry.name))
+    return kids
+
+
+def _process_kb(pid: int) -> int:
+    try:
+        for line in (_PROC / str(pid) / "smaps_rollup").read_text().splitlines():
+            if line.startswith("Pss:"):
+                return int(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    try:
+        pages = int((_PROC / str(pid) / "statm").read_text().split()[1])
+    except (OSError, ValueError, IndexError):
+        return 0
+    return pages * os.sysconf("SC_PAGE_SIZE") // 1024
+
+
+def process_tree_mb(root_pid: int) -> Optional[float]:
+    """Memory of ``root_pid`` and all its descendants in MiB; None without /proc."""
+    if not _PROC.is_dir():
+        return None
+    kids = _children()
+    total, todo = 0, [root_pid]
+    while todo:
+        pid = todo.pop()
+        total += _process_kb(pid)
+        todo.extend(kids.get(pid, ()))
+    return total / 1024.0
+
+
+def _cdp_heap_mb(driver: WebDriver) -> Optional[float]:
+    try:
+        driver.execute_cdp_cmd("Performance.enable", {})
+        values = driver.execute_cdp_cmd("Performance.getMetrics", {}).get("metrics", [])
+    except Exception:
+        return None
+    for m in values:
+        if m.get("name") == "JSHeapTotalSize":
+            return m["value"] / (1024.0 * 1024.0)
+    return None
+
+
+def browser_memory_mb(driver: WebDriver) -> Optional[float]:
+    """Best available memory figure for the browser behind ``driver``, in MiB."""
+    process = getattr(getattr(driver, "service", None), "process", None)
+    pid = getattr(process, "pid", None)
+    if pid is not None:
+        mb = process_tree_mb(pid)
+        if mb is not None:
+            return mb
+    return _cdp_heap_mb(driver)
+
+
+class DriverSupervisor:
+    """Owns the WebDriver: starts and logs it in on demand, recycles it when due."""
+
+    def __init__(
+        self,
+        factory: Callable[[], WebDriver],
+        login: Callable[[WebDriver], None],
+        *,
+        max_sends: int = 0,
+        max_memory_mb: float = 0.0,
+        memory_probe: Callable[[WebDriver], Optional[float]] = browser_memory_mb,
+        label: str = "main",
+    ) -> None:
+        self._factory = factory
+        self._login = login
+        self.max_sends = max_sends
+        self.max_memory_mb = max_memory_mb
+        self._memory_probe = memory_probe
+        self.label = label
+        self.driver: WebDriver | None = None
+        self.starts = 0
+        self.sends = 0  # since the current browser started
+        self.recycles: Dict[str, int] = {}
+
+    def get(self) -> WebDriver:
+        """The live driver, starting (and logging in) a new one if there is none."""
+        if self.driver is None:
+            with metrics.span("supervisor.start", label=self.label, restart=self.starts > 0):
+                driver = self._factory()
+                try:
+                    self._login(driver)
+                except BaseException:
+                    driver.quit()
+                    raise
+            self.driver = driver
+            self.starts += 1
+            self.sends = 0
+        return self.driver
+
+    def alive(self) -> bool:
+        if self.driver is None:
+            return False
+        try:
+            self.driver.current_url  # cheap round-trip to chromedriver
+            return True
+        except Exception:
+            return False
+
+    def after_send(self) -> Optional[str]:
+        """Count a send (successful or not); recycle if due. Returns the reason, if any."""
+        if self.driver is None:
+            return None
+        self.sends += 1
+        reason = None
+        if not self.alive():
+            reason = CRASH
+        elif self.max_sends and self.sends >= self.max_sends:
+            reason = SEND_COUNT
+        elif self.max_memory_mb:
+            mb = self._memory_probe(self.driver)
+            if mb is not None:
+                metrics.event("supervisor.memory", label=self.label, mb=round(mb, 1))
+                if mb > self.max_memory_mb:
+                    reason = MEMORY
+        if reason is not None:
+            self.recycle(reason)
+        return reason
+
+    def recycle(self, reason: str) -> None:
+        metrics.event("driver.recycle", label=reason, sends=self.sends, supervisor=self.label)
+        self.recycles[reason] = self.recycles.get(reason, 0) + 1
+        self.close()
+
+    def close(self) -> None:
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except Exception:
+                pass  # already dead
+            self.driver = None
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+=================================================================== 
+Project: Instagram Bot – Automate Instagram Messages 
+File: automation/waits.py 
+Author: Mobin Yousefi (GitHub: github.com/mobinyousefi) 
+Created: 2026-10-18 
+Updated: 2026-10-18 
+License: MIT License (see LICENSE file for details)
+=================================================================== 
+
+Description: 
+Instrumented wrappers for the two things that cost the most time in a
+send: explicit waits and page navigations.
+
+Usage: 
+from instagram_bot.automation.waits import navigate, wait_for
+box = wait_for(driver, 10, EC.visibility_of_element_located(...), "dm_textbox")
+
+Notes: 
+- Each call is a metrics span ("wait" / "navigate") labelled by purpose.
+
+===================================================================
+"""
+from __future__ import annotations
+
+import re
+from typing import TYPE_CHECKING, Any, Callable
+from urllib.parse import urlparse
+
+from .. import metrics
+from ..utils.lazy import lazy_import
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
+
+_wait = lazy_import("selenium.webdriver.support.wait")
+
+_ID_SEGMENT_RE = re.compile(r"/direct/t/[^/]+/")
+
+
+def route_of(url: str) -> str:
+    """URL path with thread ids collapsed, for low-cardinality labels."""
+    return _ID_SEGMENT_RE.sub("/direct/t/:id/", urlparse(url).path or "/")
+
+
+def wait_for(
+    driver: WebDriver,
+    timeout: float,
+    condition: Callable[[WebDriver], Any],
+    label: str,
+    poll_frequency: float = 0.5,
+) -> Any:
+    with metrics.span("wait", label=label, timeout=timeout):
+        return _wait.WebDriverWait(driver, timeout, poll_frequency=poll_frequency).until(condition)
+
+
+def navigations(driver: WebDriver) -> int:
+    """How many times navigate() has loaded a page in ``driver``."""
+    return getattr(driver, "_ig_navigations", 0)
+
+
+def navigate(driver: WebDriver, url: str) -> None:
+    with metrics.span("navigate", label=route_of(url)) as attrs:
+        try:
+            driver.get(url)
+        finally:
+            # Element handles from the previous document are now stale (see pages.Page)
+            driver._ig_navigations = navigations(driver) + 1
+        attrs["landed"] = route_of(driver.current_url)
@@ -6,7 +6,7 @@ Project: Instagram Bot – Automate Instagram Messages
 File: config.py 
 Author: Mobin Yousefi (GitHub: github.com/mobinyousefi) 
 Created: 2025-10-20 
-Updated: 2025-10-20 
+Updated: 2026-10-18 
 License: MIT License (see LICENSE file for details)
 =================================================================== 
 
@@ -18,31 +18,94 @@ from instagram_bot.config import Settings
 cfg = Settings()
 
 Notes: 
-- Loads .env via python-dotenv if present.
+- Loads .env via python-dotenv (once, on the first Settings()).
+- The environment is read when Settings() is built, not at import.
 - Provides sane defaults for headless, base URL, etc.
 
 ===================================================================
 """
 from __future__ import annotations
 
-from dataclasses import dataclass
-from pathlib import Path
 import os
-from dotenv import load_dotenv
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Tuple
+
+
+@lru_cache(maxsize=None)
+def load_env() -> None:
+    """Load .env once, on first use; real environment variables win."""
+    from dotenv import load_dotenv
+
+    load_dotenv(override=False)
+
+
+def _env(name: str, default: str, cast: Callable[[str], Any] = str) -> Any:
+    """Dataclass field read from the environment each time Settings() is built."""
+
+    def _read() -> Any:
+        load_env()
+        return cast(os.getenv(name, default))
+
+    return field(default_factory=_read)
+
+
+def _flag(value: str) -> bool:
+    return value.lower() == "true"
+
+
+def _csv(value: str) -> Tuple[str, ...]:
+    return tuple(v.strip() for v in value.split(",") if v.strip())
 
 
-load_dotenv(override=False)
+def _optional_path(value: str) -> Path | None:
+    return Path(value) if value else None
 
 
 @dataclass(frozen=True)
 class Settings:
-    username: str = os.getenv("IG_USERNAME", "")
-    password: str = os.getenv("IG_PASSWORD", "")
-    base_url: str = os.getenv("IG_BASE_URL", "https://www.instagram.com")
-    headless: bool = os.getenv("IG_HEADLESS", "true").lower() == "true"
-    cookie_path: Path = Path(os.getenv("IG_COOKIE_PATH", ".ig_session.json"))
-    delay_min: float = float(os.getenv("IG_DEFAULT_DELAY_MIN", "1.0"))
-    delay_max: float = float(os.getenv("IG_DEFAULT_DELAY_MAX", "2.5"))
+    username: str = _env("IG_USERNAME", "")
+    password: str = _env("IG_PASSWORD", "")
+    base_url: str = _env("IG_BASE_URL", "https://www.instagram.com")
+    headless: bool = _env("IG_HEADLESS", "true", _flag)
+    cookie_path: Path = _env("IG_COOKIE_PATH", ".ig_session.json", Path)
+    # Skip the login probe if the session was confirmed within this many seconds (0 = never)
+    session_ttl: float = _env("IG_SESSION_TTL", "900", float)
+    thread_index_path: Path = _env("IG_THREAD_INDEX_PATH", ".ig_threads.json", Path)
+    # Usernames that resolved to no one are skipped until this many seconds have passed
+    recipient_cache_path: Path | None = _env(
+        "IG_RECIPIENT_CACHE_PATH", ".ig_recipients.json", _optional_path
+    )
+    recipient_ttl: float = _env("IG_RECIPIENT_TTL", "86400", float)
+    # Learned selector ranking and hit/latency stats, kept across runs ("" = in memory only)
+    selector_stats_path: Path | None = _env(
+        "IG_SELECTOR_STATS_PATH", ".ig_selectors.json", _optional_path
+    )
+    # Persistent Chrome user-data-dir; unset = fresh throwaway profile per run
+    profile_dir: Path | None = _env("IG_PROFILE_DIR", "", _optional_path)
+    # What Chrome does not load (automation.driver.BLOCK_PROFILES), plus extra URL patterns
+    block_profile: str = _env("IG_BLOCK_PROFILE", "safe")
+    blocked_urls: Tuple[str, ...] = _env("IG_BLOCKED_URLS", "", _csv)
+    # Long runs replace Chrome after this many sends or past this much memory (0 = never)
+    driver_max_sends: int = _env("IG_DRIVER_MAX_SENDS", "200", int)
+    driver_max_memory_mb: float = _env("IG_DRIVER_MAX_MEMORY_MB", "1500", float)
+    delay_min: float = _env("IG_DEFAULT_DELAY_MIN", "1.0", float)
+    delay_max: float = _env("IG_DEFAULT_DELAY_MAX", "2.5", float)
+    send_confirm_timeout: float = _env("IG_SEND_CONFIRM_TIMEOUT", "10.0", float)
+    # Local API of `--serve`; `--daemon` submits here
+    daemon_url: str = _env("IG_DAEMON_URL", "http://127.0.0.1:8765")
+    # Bearer token of the daemon API; unset = generated into daemon_token_path by --serve
+    daemon_token: str = _env("IG_DAEMON_TOKEN", "")
+    daemon_token_path: Path = _env("IG_DAEMON_TOKEN_PATH", ".ig_daemon_token", Path)
+    # Durable send queue (SQLite); unset = send straight from the command line
+    outbox_path: Path | None = _env("IG_OUTBOX_PATH", "", _optional_path)
+    # Profile lookups (utils.profile_scrape): on-disk cache, its TTL, and requests per hour
+    profile_cache_path: Path | None = _env(
+        "IG_PROFILE_CACHE_PATH", ".ig_profiles.json", _optional_path
+    )
+    profile_cache_ttl: float = _env("IG_PROFILE_CACHE_TTL", "86400", float)
+    profile_lookup_budget: int = _env("IG_PROFILE_LOOKUP_BUDGET", "100", int)
 
     def validate(self) -> None:
         if not self.username or not self.password:
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+=================================================================== 
+Project: Instagram Bot – Automate Instagram Messages 
+File: cookie_store.py 
+Author: Mobin Yousefi (GitHub: github.com/mobinyousefi) 
+Created: 2026-10-18 
+Updated: 2026-10-18 
+License: MIT License (see LICENSE file for details)
+=================================================================== 
+
+Description: 
+Crash-safe session cookie storage: compact versioned JSON with expiry
+metadata, atomic replace-on-write, an advisory lock against concurrent
+writers and read-back validation.
+
+Usage: 
+from instagram_bot.cookie_store import CookieStore
+store = CookieStore(Path(".ig_session.json"))
+record = store.load()
+python -m instagram_bot.cookie_store migrate .ig_session.json
+
+Notes: 
+- Reads the older formats (bare cookie list; {"validated_at", "cookies"}).
+- Writers serialize on "<file>.lock"; readers never block.
+
+===================================================================
+"""
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from .exceptions import CookieStoreError
+from .utils.filelock import FileLock
+
+FORMAT_VERSION = 2
+SESSION_COOKIE = "sessionid"
+
+
+@dataclass
+class SessionRecord:
+    cookies: List[Dict[str, Any]] = field(default_factory=list)
+    validated_at: Optional[float] = None  # last time the session was confirmed valid
+    saved_at: Optional[float] = None
+    version: int = FORMAT_VERSION  # format the record was read from
+
+    @property
+    def expires(self) -> Optional[float]:
+        """Expiry of the session cookie (None = session cookie or not present)."""
+        for c in self.cookies:
+            if c.get("name") == SESSION_COOKIE:
+                return c.get("expiry")
+        return None
+
+    def to_json(self) -> str:
+        data = {
+            "v": FORMAT_VERSION,
+            "saved_at": self.saved_at,
+            "validated_at": self.validated_at,
+            "expires": self.expires,
+            "cookies": self.cookies,
+        }
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+def _valid_cookies(cookies: Any) -> bool:
+    return isinstance(cookies, list) and all(
+        isinstance(c, dict) and isinstance(c.get("name"), str) and "value" in c for c in cookies
+    )
+
+
+def decode(text: str) -> SessionRecord:
+    """Parse any known cookie file format; raises CookieStoreError if unusable."""
+    try:
+        data = json.loads(text)
+    except ValueError as e:
+        raise CookieStoreError("Cookie file is not valid JSON (truncated write?).") from e
+
+    if isinstance(data, list):  # v0: bare driver.get_cookies() dump
+        record = SessionRecord(cookies=data, version=0)
+    elif isinstance(data, dict) and data.get("v", 1) in (1, FORMAT_VERSION):
+        record = SessionRecord(
+            cookies=data.get("cookies"),
+            validated_at=data.get("validated_at"),
+            saved_at=data.get("saved_at"),
+            version=data.get("v", 1),
+        )
+    else:
+        found = data.get("v") if isinstance(data, dict) else type(data).__name__
+        raise CookieStoreError(f"Unsupported cookie file format: {found!r}.")
+
+    if not _valid_cookies(record.cookies):
+        raise CookieStoreError("Cookie file has no usable cookie list.")
+    return record
+
+
+def _fsync_dir(path: Path) -> None:
+    if os.name == "nt":  # pragma: no cover - directories cannot be opened on Windows
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class CookieStore:
+    """Versioned session file at ``path`` with atomic, locked writes."""
+
+    def __init__(self, path: Path, lock_timeout: float = 10.0) -> None:
+        self.path = path
+        self._lock = FileLock(path.with_name(f"{path.name}.lock"), timeout=lock_timeout)
+
+    def load(self) -> Optional[SessionRecord]:
+        """Return the stored session, or None if missing or unreadable."""
+        try:
+            return decode(self.path.read_text(encoding="utf-8"))
+        except (OSError, CookieStoreError):
+            return None
+
+    def save(self, record: SessionRecord) -> None:
+        with self._lock:
+            self._write(record)
+
+    def update(self, fn: Callable[[SessionRecord], None]) -> Optional[SessionRecord]:
+        """Read-modify-write under the lock; no-op if nothing is stored."""
+        with self._lock:
+            record = self.load()
+            if record is None:
+                return None
+            fn(record)
+            self._write(record)
+            return record
+
+    def mark_valid(self, when: Optional[float] = None) -> None:
+        stamp = time.time() if when is None else when
+        self.update(lambda r: setattr(r, "validated_at", stamp))
+
+    def migrate(self) -> bool:
+        """Rewrite an older-format file in the current format. True if rewritten."""
+        with self._lock:
+            try:
+                text = self.path.read_text(encoding="utf-8")
+            except OSError:
+                return False
+            record = decode(text)
+            if record.version == FORMAT_VERSION:
+                return False
+            self._write(record)
+            return True
+
+    def _write(self, record: SessionRecord) -> None:
+        record.saved_at = time.time()
+        record.version = FORMAT_VERSION
+        payload = record.to_json()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp, "w", encoding="utf-8") as fh:
+                fh.write(payload)
+                fh.flush()
+                os.fsync(fh.fileno())
+            # Read back before it replaces the last good copy
+            if decode(tmp.read_text(encoding="utf-8")).cookies != record.cookies:
+                raise CookieStoreError("Cookie file did not read back identically.")
+            os.replace(tmp, self.path)
+        finally:
+            if tmp.exists():
+                tmp.unlink()
+        _fsync_dir(self.path.parent)
+
+
+def main(argv: List[str] | None = None) -> int:
+    args = sys.argv[1:] if argv is None else argv
+    if len(args) != 2 or args[0] != "migrate":
+        print("usage: python -m instagram_bot.cookie_store migrate <cookie-file>", file=sys.stderr)
+        return 2
+    store = CookieStore(Path(args[1]))
+    try:
+        changed = store.migrate()
+    except CookieStoreError as e:
+        print(f"{args[1]}: {e}", file=sys.stderr)
+        return 1
+    print(f"{args[1]}: {'migrated' if changed else 'already current or missing'}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
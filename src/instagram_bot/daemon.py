@@ -0,0 +1,473 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+=================================================================== 
+Project: Instagram Bot – Automate Instagram Messages 
+File: daemon.py 
+Author: Mobin Yousefi (GitHub: github.com/mobinyousefi) 
+Created: 2026-10-18 
+Updated: 2026-10-18 
+License: MIT License (see LICENSE file for details)
+=================================================================== 
+
+Description: 
+Service mode: one warm, logged-in Chrome behind a small localhost HTTP
+API. Send jobs are queued and run one at a time through send_dm.
+
+Usage: 
+python -m instagram_bot.main --serve
+python -m instagram_bot.main --daemon --to user1 --message "Hi"
+curl -s localhost:8765/status
+
+Notes: 
+- Endpoints: POST /send, GET /jobs/<id>, GET /health, GET /status.
+- Every request needs the bearer token: IG_DAEMON_TOKEN, or the one
+  --serve writes to IG_DAEMON_TOKEN_PATH (mode 0600) for local clients.
+- Browser-style requests (an Origin header, a non-JSON POST, or a Host
+  other than the loopback address) are refused.
+- The driver is only ever touched from the worker thread.
+- The browser is replaced after IG_DRIVER_MAX_SENDS sends, past
+  IG_DRIVER_MAX_MEMORY_MB, or when it dies (automation.supervisor).
+
+===================================================================
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import queue
+import secrets
+import signal
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from . import metrics
+from .auth import login_and_persist, mark_session_valid
+from .automation.supervisor import DriverSupervisor
+from .config import Settings
+from .exceptions import DaemonError
+from .messaging import TYPING_MODES, deliver
+from .recipients import RecipientCache
+from .retry import classify
+from .thread_index import ThreadIndex
+from .utils.selectors import REGISTRY
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
+
+log = logging.getLogger(__name__)
+
+_LOOPBACK = ("127.0.0.1", "localhost", "::1")
+_STOPPED = "daemon stopped"
+
+
+@dataclass
+class Job:
+    id: str
+    to: List[str]
+    message: str
+    typing: str = "keys"
+    state: str = "queued"  # queued -> running -> done | failed
+    results: Dict[str, str] = field(default_factory=dict)  # username -> "sent" or error
+    failures: Dict[str, str] = field(default_factory=dict)  # username -> failure class
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    done: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "to": list(self.to),
+            "typing": self.typing,
+            "state": self.state,
+            # Copies: the worker thread keeps writing to the live dicts
+            "results": dict(self.results),
+            "failures": dict(self.failures),
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class Daemon:
+    """Job queue plus the worker thread that owns the browser."""
+
+    def __init__(
+        self,
+        cfg: Settings,
+        *,
+        thread_index: ThreadIndex | None = None,
+        recipients: RecipientCache | None = None,
+        driver_factory: Callable[[], WebDriver] | None = None,
+        history: int = 200,
+    ) -> None:
+        self.cfg = cfg
+        self.thread_index = thread_index
+        self.recipients = recipients
+        self.supervisor = DriverSupervisor(
+            driver_factory or self._make_driver,
+            lambda driver: login_and_persist(driver, self.cfg),
+            max_sends=cfg.driver_max_sends,
+            max_memory_mb=cfg.driver_max_memory_mb,
+            label="daemon",
+        )
+        self._queue: "queue.Queue[Optional[Job]]" = queue.Queue()
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._history = history
+        self._lock = threading.Lock()
+        self._worker: threading.Thread | None = None
+        self._running: Optional[str] = None
+        self._stopping = threading.Event()
+        self.started_at = time.time()
+        self.counters = {"sent": 0, "failed": 0}
+        self.last_error = ""
+
+    # -- lifecycle -----------------------------------------------------------
+    def start(self) -> "Daemon":
+        self._worker = threading.Thread(target=self._work, name="ig-daemon-worker", daemon=True)
+        self._worker.start()
+        return self
+
+    def stop(self, timeout: float = 30.0) -> None:
+        """Fail queued jobs, let the current send finish, then quit the browser."""
+        self._stopping.set()
+        self._fail_queued()
+        self._queue.put(None)
+        if self._worker is not None:
+            self._worker.join(timeout)
+
+    # -- API -----------------------------------------------------------------
+    def submit(self, to: List[str], message: str, typing: str = "keys") -> Job:
+        job = Job(secrets.token_hex(6), list(to), message, typing)
+        with self._lock:
+            self._jobs[job.id] = job
+            while len(self._jobs) > self._history:
+                self._jobs.popitem(last=False)
+        self._queue.put(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def health(self) -> Dict[str, Any]:
+        alive = self._worker is not None and self._worker.is_alive()
+        return {"ok": alive, "driver": self.supervisor.driver is not None}
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            states: Dict[str, int] = {}
+            for job in self._jobs.values():
+                states[job.state] = states.get(job.state, 0) + 1
+        return {
+            **self.health(),
+            "uptime": time.time() - self.started_at,
+            "queued": self._queue.qsize(),
+            "running": self._running,
+            "jobs": states,
+            "messages": {**self.counters, "driver_starts": self.supervisor.starts},
+            "recycles": dict(self.supervisor.recycles),
+            "last_error": self.last_error,
+            "selectors": REGISTRY.stats(),
+        }
+
+    # -- worker --------------------------------------------------------------
+    def _work(self) -> None:
+        try:
+            try:
+                self.supervisor.get()  # warm up before the first job arrives
+            except Exception as e:
+                log.warning("Browser warm-up failed: %s", e)
+            while True:
+                job = self._queue.get()
+                if job is None:
+                    break
+                if self._stopping.is_set():
+                    _fail(job)
+                    continue
+                self._run(job)
+        finally:
+            self.supervisor.close()
+            self._fail_queued()
+
+    def _make_driver(self) -> WebDriver:
+        from .automation.driver import block_profile, make_driver
+
+        return make_driver(
+            headless=self.cfg.headless,
+            profile_dir=self.cfg.profile_dir,
+            blocking=block_profile(self.cfg.block_profile, self.cfg.blocked_urls),
+        )
+
+    def _run(self, job: Job) -> None:
+        self._running = job.id
+        job.state = "running"
+        job.started_at = time.time()
+        try:
+            with metrics.span("daemon.job", label=job.typing, recipients=len(job.to)):
+                for user in job.to:
+                    if self._stopping.is_set():
+                        job.results[user] = _STOPPED
+                        continue
+                    job.results[user] = self._send_one(user, job)
+        finally:
+            job.finished_at = time.time()
+            job.state = "done" if all(r == "sent" for r in job.results.values()) else "failed"
+            self._running = None
+            job.done.set()
+        if any(r == "sent" for r in job.results.values()):
+            try:
+                mark_session_valid(self.cfg)
+            except Exception as e:  # bookkeeping only; never take the worker down
+                log.warning("Could not stamp the session file: %s", e)
+
+    def _send_one(self, user: str, job: Job) -> str:
+        try:
+            if self.recipients is not None:
+                self.recipients.check(user)  # before a cold browser would start
+            driver = self.supervisor.get()
+            deliver(
+                driver,
+                self.cfg,
+                user,
+                job.message,
+                thread_index=self.thread_index,
+                typing=job.typing,
+                recipients=self.recipients,
+            )
+        except Exception as e:
+            self.counters["failed"] += 1
+            self.last_error = f"{type(e).__name__}: {e}"
+            job.failures[user] = classify(e)
+            log.warning(
+                "Daemon send to %s failed (%s): %s", user, job.failures[user], self.last_error
+            )
+            self.supervisor.after_send()  # a dead browser is restarted on the next send
+            return self.last_error
+        self.counters["sent"] += 1
+        self.supervisor.after_send()
+        return "sent"
+
+    def _fail_queued(self) -> None:
+        while True:
+            try:
+                job = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if job is not None:
+                _fail(job)
+
+
+def _fail(job: Job) -> None:
+    job.state = "failed"
+    job.results = {u: _STOPPED for u in job.to}
+    job.finished_at = time.time()
+    job.done.set()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "_Server"
+
+    def log_message(self, fmt: str, *args) -> None:
+        log.debug("daemon: " + fmt, *args)
+
+    def _json(self, status: int, body: Dict[str, Any]) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _authorized(self) -> bool:
+        # Browsers send Origin on cross-site requests; DNS rebinding shows up as a foreign Host
+        hosts = self.server.allowed_hosts
+        if self.headers.get("Origin") is not None or (
+            hosts and self.headers.get("Host", "").lower() not in hosts
+        ):
+            self._json(403, {"error": "browser requests are not accepted"})
+            return False
+        given = self.headers.get("Authorization", "")
+        if secrets.compare_digest(given, f"Bearer {self.server.token}"):
+            return True
+        self._json(401, {"error": "missing or wrong token"})
+        return False
+
+    def do_GET(self) -> None:  # noqa: N802
+        if not self._authorized():
+            return
+        daemon = self.server.bot
+        path = urlparse(self.path).path.rstrip("/")
+        if path == "/health":
+            body = daemon.health()
+            self._json(200 if body["ok"] else 503, body)
+        elif path == "/status":
+            self._json(200, daemon.status())
+        elif path.startswith("/jobs/"):
+            job = daemon.get(path[len("/jobs/") :])
+            if job is None:
+                self._json(404, {"error": "unknown job"})
+            else:
+                self._json(200, job.to_dict())
+        else:
+            self._json(404, {"error": "not found"})
+
+    def do_POST(self) -> None:  # noqa: N802
+        if not self._authorized():
+            return
+        if urlparse(self.path).path.rstrip("/") != "/send":
+            self._json(404, {"error": "not found"})
+            return
+        if self.headers.get_content_type() != "application/json":
+            self._json(415, {"error": "Content-Type must be application/json"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", "0"))
+            req = json.loads(self.rfile.read(length) or b"{}")
+            to, message, typing, wait, timeout = _parse_send(req)
+        except (ValueError, TypeError) as e:
+            self._json(400, {"error": str(e)})
+            return
+        job = self.server.bot.submit(to, message, typing)
+        if wait:
+            job.done.wait(timeout)
+        self._json(200 if job.done.is_set() or not wait else 202, job.to_dict())
+
+
+def _parse_send(req: Any) -> Tuple[List[str], str, str, bool, float]:
+    if not isinstance(req, dict):
+        raise ValueError("body must be a JSON object")
+    to = req.get("to")
+    to = [to] if isinstance(to, str) else to
+    if not to or not all(isinstance(u, str) and u for u in to):
+        raise ValueError("'to' must be a username or a list of usernames")
+    message = req.get("message")
+    if not isinstance(message, str) or not message:
+        raise ValueError("'message' must be a non-empty string")
+    typing = req.get("typing", "keys")
+    if typing not in TYPING_MODES:
+        raise ValueError(f"'typing' must be one of {TYPING_MODES}")
+    return to, message, typing, bool(req.get("wait", True)), float(req.get("timeout", 300))
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, addr: Tuple[str, int], daemon: Daemon, token: str) -> None:
+        if not token:
+            raise ValueError("The daemon API needs a token.")
+        super().__init__(addr, _Handler)
+        self.bot = daemon
+        self.token = token
+        self.allowed_hosts = _allowed_hosts(addr[0], self.server_address[1])
+
+
+def _allowed_hosts(host: str, port: int) -> Tuple[str, ...]:
+    """Host header values accepted on a loopback bind; empty = any."""
+    if host not in _LOOPBACK:
+        return ()
+    names = ("127.0.0.1", "localhost", "[::1]")
+    return names + tuple(f"{name}:{port}" for name in names)
+
+
+def daemon_token(cfg: Settings, *, create: bool = False) -> str:
+    """IG_DAEMON_TOKEN, else the token file; ``create`` writes a new one if missing."""
+    if cfg.daemon_token:
+        return cfg.daemon_token
+    path = cfg.daemon_token_path
+    try:
+        return path.read_text(encoding="utf-8").strip()
+    except FileNotFoundError:
+        if not create:
+            raise DaemonError(
+                f"No daemon token: set IG_DAEMON_TOKEN or start --serve to create {path}."
+            ) from None
+    return _write_token(path)
+
+
+def _write_token(path: Path) -> str:
+    token = secrets.token_urlsafe(32)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as fh:
+        fh.write(token)
+    return token
+
+
+def listen_address(url: str) -> Tuple[str, int]:
+    parsed = urlparse(url)
+    return parsed.hostname or "127.0.0.1", parsed.port or 8765
+
+
+def serve(
+    cfg: Settings,
+    *,
+    thread_index: ThreadIndex | None = None,
+    recipients: RecipientCache | None = None,
+) -> int:
+    """Run the daemon in the foreground until SIGINT/SIGTERM."""
+    host, port = listen_address(cfg.daemon_url)
+    token = daemon_token(cfg, create=True)
+
+    daemon = Daemon(cfg, thread_index=thread_index, recipients=recipients)
+    # Bind before the worker starts Chrome: a taken port must not leave a browser behind
+    server = _Server((host, port), daemon, token)
+
+    def _stop(signum, frame) -> None:
+        # shutdown() blocks until serve_forever returns, so not from this thread
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    previous = signal.signal(signal.SIGTERM, _stop)
+    daemon.start()
+    log.info("Daemon listening on http://%s:%d", host, port)
+    if not cfg.daemon_token:
+        log.info("API token is in %s", cfg.daemon_token_path)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        signal.signal(signal.SIGTERM, previous)
+        server.server_close()
+        daemon.stop()
+    return 0
+
+
+def submit(
+    cfg: Settings,
+    to: List[str],
+    message: str,
+    *,
+    typing: str = "keys",
+    wait: bool = True,
+    timeout: float = 300.0,
+) -> Dict[str, Any]:
+    """Send a job to a running daemon; returns the job as JSON."""
+    token = daemon_token(cfg)
+    body = json.dumps(
+        {"to": to, "message": message, "typing": typing, "wait": wait, "timeout": timeout}
+    ).encode("utf-8")
+    req = urllib.request.Request(
+        cfg.daemon_url.rstrip("/") + "/send",
+        data=body,
+        headers={"Content-Type": "application/json", "Authorization": f"Bearer {token}"},
+        method="POST",
+    )
+    try:
+        with urllib.request.urlopen(req, timeout=timeout + 10) as resp:
+            return json.loads(resp.read())
+    except urllib.error.HTTPError as e:
+        detail = e.read().decode("utf-8", errors="replace")
+        raise DaemonError(f"Daemon rejected the job ({e.code}): {detail}") from e
+    except OSError as e:
+        raise DaemonError(f"No daemon reachable at {cfg.daemon_url} ({e}).") from e
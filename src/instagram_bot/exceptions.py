@@ -6,7 +6,7 @@ Project: Instagram Bot – Automate Instagram Messages
 File: exceptions.py 
 Author: Mobin Yousefi (GitHub: github.com/mobinyousefi) 
 Created: 2025-10-20 
-Updated: 2025-10-20 
+Updated: 2026-10-18 
 License: MIT License (see LICENSE file for details)
 =================================================================== 
 
@@ -18,23 +18,82 @@ raise LoginError("...")
 
 Notes: 
 - Keep exception taxonomy small and meaningful.
+- ``failure_class`` says whether a retry can help (see retry.classify).
 
 ===================================================================
 """
 from __future__ import annotations
 
+# Failure classes: retry as is, never retry, retry after logging in again,
+# or retry in a new browser (the current one is gone)
+TRANSIENT = "transient"
+PERMANENT = "permanent"
+REAUTH = "reauth"
+RESTART = "restart"
+FAILURE_CLASSES = (TRANSIENT, PERMANENT, REAUTH, RESTART)
+
 
 class InstagramBotError(Exception):
     """Base exception for the instagram_bot package."""
 
+    failure_class = PERMANENT
+
 
 class LoginError(InstagramBotError):
     """Raised when login fails (e.g., invalid credentials or DOM changes)."""
 
 
+class SessionExpiredError(LoginError):
+    """Raised when a stored session turns out to be logged out mid-run."""
+
+    failure_class = REAUTH
+
+
+class ChallengeRequiredError(LoginError):
+    """Raised when Instagram asks for a checkpoint/2FA challenge; needs a human."""
+
+
+class CookieStoreError(InstagramBotError):
+    """Raised when a session cookie file is unreadable or fails to write back."""
+
+
 class SelectorNotFoundError(InstagramBotError):
     """Raised when a critical DOM element cannot be located."""
 
+    failure_class = TRANSIENT
+
 
 class MessageSendError(InstagramBotError):
     """Raised when sending a DM fails after retries."""
+
+    failure_class = TRANSIENT
+
+
+class ActionBlockedError(MessageSendError):
+    """Raised when Instagram answers a send with "Try Again Later" (action blocked)."""
+
+    failure_class = PERMANENT
+
+
+class ProfileLockedError(InstagramBotError):
+    """Raised when the persistent Chrome profile is in use by another process."""
+
+
+class OutboxLockedError(InstagramBotError):
+    """Raised when another process is already draining the same outbox."""
+
+
+class DaemonError(InstagramBotError):
+    """Raised when the local daemon is unreachable or rejects a job."""
+
+    failure_class = TRANSIENT
+
+
+class LookupBudgetError(InstagramBotError):
+    """Raised when a profile lookup needs a request but the request budget is spent."""
+
+
+class RecipientNotFoundError(MessageSendError):
+    """Raised when a username matches no account in the DM compose dialog."""
+
+    failure_class = PERMANENT
@@ -6,7 +6,7 @@ Project: Instagram Bot – Automate Instagram Messages
 File: main.py 
 Author: Mobin Yousefi (GitHub: github.com/mobinyousefi) 
 Created: 2025-10-20 
-Updated: 2025-10-20 
+Updated: 2026-10-18 
 License: MIT License (see LICENSE file for details)
 =================================================================== 
 
@@ -25,19 +25,33 @@ Notes:
 from __future__ import annotations
 
 import argparse
+import dataclasses
 import sys
-from typing import List
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, List
 
-from .automation.driver import make_driver
-from .auth import login_and_persist
+from . import metrics
+from .auth import login_and_persist, mark_session_valid
+from .automation.commands import CommandAccounting
+from .automation.supervisor import DriverSupervisor
 from .config import Settings
-from .messaging import send_dm
+from .exceptions import LookupBudgetError, RecipientNotFoundError
+from .messaging import TYPING_MODES, deliver
+from .outbox import FAILED, SENT, Outbox, drain
+from .recipients import RecipientCache
+from .scheduler import MODES, OVERRUN_POLICIES, delay_then, repeat_every
+from .thread_index import ThreadIndex
+from .utils.selectors import REGISTRY
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
 
 
 def _parse_args(argv: List[str]) -> argparse.Namespace:
     p = argparse.ArgumentParser(prog="instagram-bot")
-    p.add_argument("--to", nargs="+", required=True, help="Target username(s)")
-    p.add_argument("--message", required=True, help="Message text to send")
+    p.add_argument("--to", nargs="+", default=[], help="Target username(s)")
+    p.add_argument("--message", help="Message text to send")
     p.add_argument("--delay", type=float, default=0.0, help="Delay before first send (seconds)")
     p.add_argument(
         "--repeat",
@@ -45,39 +59,289 @@ def _parse_args(argv: List[str]) -> argparse.Namespace:
         default=0.0,
         help="Repeat interval in seconds (0 = no repeat)",
     )
-    return p.parse_args(argv)
+    p.add_argument(
+        "--repeat-mode",
+        choices=MODES,
+        default="fixed_rate",
+        help="fixed_rate = start every interval; fixed_delay = wait interval after each run",
+    )
+    p.add_argument(
+        "--overrun",
+        choices=OVERRUN_POLICIES,
+        default="skip",
+        help="What to do with repeats missed while a slow run was still going",
+    )
+    p.add_argument(
+        "--typing",
+        choices=TYPING_MODES,
+        default="keys",
+        help="keys = per-character typing; insert = whole message at once (emoji-safe)",
+    )
+    p.add_argument(
+        "--scan-inbox",
+        action="store_true",
+        help="Index existing threads from /direct/inbox/ before sending",
+    )
+    p.add_argument(
+        "--no-thread-index",
+        action="store_true",
+        help="Always compose via /direct/new/ instead of reusing known thread URLs",
+    )
+    p.add_argument(
+        "--precheck",
+        action="store_true",
+        help="Look up --to profiles over HTTP first and skip usernames that do not exist",
+    )
+    p.add_argument(
+        "--profile-dir",
+        type=Path,
+        help="Persistent Chrome profile directory (overrides IG_PROFILE_DIR)",
+    )
+    p.add_argument(
+        "--block-profile",
+        choices=("off", "safe", "strict"),
+        help="Resources Chrome does not load (overrides IG_BLOCK_PROFILE)",
+    )
+    p.add_argument(
+        "--outbox",
+        type=Path,
+        help="Durable send queue (SQLite; overrides IG_OUTBOX_PATH); reruns skip sent DMs",
+    )
+    p.add_argument(
+        "--batch",
+        default="",
+        help="Outbox batch name; the same message to the same user is sent once per batch",
+    )
+    p.add_argument(
+        "--enqueue-only", action="store_true", help="Queue --to/--message in the outbox and exit"
+    )
+    p.add_argument(
+        "--drain", action="store_true", help="Send what is pending in the outbox (no --to needed)"
+    )
+    p.add_argument(
+        "--serve",
+        action="store_true",
+        help="Run as a daemon with one warm browser, accepting jobs on IG_DAEMON_URL",
+    )
+    p.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Hand the send to a running --serve daemon instead of starting a browser",
+    )
+    p.add_argument("--metrics-jsonl", type=Path, help="Append timing spans as JSON lines here")
+    p.add_argument(
+        "--profile",
+        action="store_true",
+        help="Count and time WebDriver commands per operation; print a report at exit",
+    )
+    p.add_argument(
+        "--metrics-prom", type=Path, help="Write span totals here in Prometheus text format"
+    )
+    ns = p.parse_args(argv)
+    if (ns.enqueue_only or ns.drain) and not ns.outbox and not Settings().outbox_path:
+        p.error("--enqueue-only/--drain need --outbox or IG_OUTBOX_PATH")
+    if ns.daemon and (ns.outbox or ns.enqueue_only or ns.drain or ns.serve):
+        p.error("--daemon cannot be combined with --outbox/--enqueue-only/--drain/--serve")
+    if ns.profile and (ns.serve or ns.daemon):
+        p.error("--profile only applies to runs that drive their own browser")
+    if not (ns.drain or ns.serve) and not (ns.to and ns.message):
+        p.error("--to and --message are required (unless --drain or --serve)")
+    return ns
+
+
+def _schedule(ns: argparse.Namespace, fn: Callable[[], None]) -> None:
+    if ns.repeat > 0:
+        repeat_every(ns.repeat, fn, first_delay=ns.delay, mode=ns.repeat_mode, overrun=ns.overrun)
+    else:
+        delay_then(ns.delay, fn)
+
+
+def _save_selector_stats(cfg: Settings) -> None:
+    REGISTRY.emit_metrics()
+    if cfg.selector_stats_path:
+        try:
+            REGISTRY.save(cfg.selector_stats_path)
+        except OSError:
+            pass  # only a ranking hint; never fail a run over it
+
+
+def _precheck(cfg: Settings, usernames: List[str], recipients: RecipientCache) -> None:
+    """Record usernames whose profile page is a 404, using the cached lookup client."""
+    from .utils.profile_scrape import lookup_client
+
+    with lookup_client(cfg) as lookup:
+        for user in usernames:
+            if recipients.missing(user) is not None:
+                continue
+            try:
+                info = lookup.lookup(user)
+            except LookupBudgetError:
+                print("Profile lookup budget spent; the rest are not prechecked.", file=sys.stderr)
+                return
+            if info is not None and not info.exists:
+                recipients.mark_missing(user, "no profile page")
+
+
+def _submit_to_daemon(ns: argparse.Namespace, cfg: Settings) -> int:
+    from . import daemon
+
+    failed = 0
+
+    def _send_all() -> None:
+        nonlocal failed
+        job = daemon.submit(cfg, ns.to, ns.message, typing=ns.typing)
+        if job["state"] in ("queued", "running"):
+            print(f"Job {job['id']} is still {job['state']} on the daemon.", file=sys.stderr)
+            return
+        failures = job.get("failures", {})
+        for user, result in job["results"].items():
+            if result != "sent":
+                failed += 1
+                print(f"{user} ({failures.get(user, '?')}): {result}", file=sys.stderr)
+
+    _schedule(ns, _send_all)
+    return 1 if failed else 0
 
 
 def main(argv: List[str] | None = None) -> int:
     ns = _parse_args(sys.argv[1:] if argv is None else argv)
 
     cfg = Settings()
+    if ns.profile_dir is not None:
+        cfg = dataclasses.replace(cfg, profile_dir=ns.profile_dir)
+    if ns.outbox is not None:
+        cfg = dataclasses.replace(cfg, outbox_path=ns.outbox)
+    if ns.block_profile is not None:
+        cfg = dataclasses.replace(cfg, block_profile=ns.block_profile)
+
+    if ns.daemon:
+        return _submit_to_daemon(ns, cfg)
+
+    box = Outbox(cfg.outbox_path) if cfg.outbox_path and not ns.serve else None
+    if box is not None and ns.enqueue_only:
+        with box:
+            added = box.enqueue_many(ns.to, ns.message, batch=ns.batch)
+        print(f"Queued {added} new message(s) in {cfg.outbox_path}.")
+        return 0
+    if box is not None:
+        box.recover()
+
     cfg.validate()
 
-    driver = make_driver(headless=cfg.headless)
+    index = None if ns.no_thread_index else ThreadIndex(cfg.thread_index_path)
+    recipients = RecipientCache(cfg.recipient_cache_path, cfg.recipient_ttl)
+    if ns.precheck and ns.to:
+        _precheck(cfg, ns.to, recipients)
+    if box is None and not ns.serve and ns.repeat <= 0 and ns.to:
+        if all(recipients.missing(user) is not None for user in ns.to):
+            # Every recipient is known not to exist: no reason to start a browser
+            for user in ns.to:
+                try:
+                    recipients.check(user)
+                except RecipientNotFoundError as e:
+                    print(e, file=sys.stderr)
+            return 1
+
+    if ns.metrics_jsonl:
+        metrics.add_sink(metrics.JsonLinesSink(ns.metrics_jsonl))
+    if ns.metrics_prom:
+        metrics.add_sink(metrics.PrometheusTextSink(ns.metrics_prom))
+
+    if cfg.selector_stats_path:
+        REGISTRY.load(cfg.selector_stats_path)
+
+    if ns.serve:
+        from . import daemon
+
+        try:
+            return daemon.serve(cfg, thread_index=index, recipients=recipients)
+        finally:
+            _save_selector_stats(cfg)
+            metrics.clear_sinks()
+
+    # The Selenium import; only when needed
+    from .automation.driver import block_profile, make_driver
+
+    blocking = block_profile(cfg.block_profile, cfg.blocked_urls)
+    accounting = CommandAccounting() if ns.profile else None
+
+    def _new_driver() -> WebDriver:
+        driver = make_driver(headless=cfg.headless, profile_dir=cfg.profile_dir, blocking=blocking)
+        return accounting.attach(driver) if accounting is not None else driver
+
+    sup = DriverSupervisor(
+        _new_driver,
+        lambda driver: login_and_persist(driver, cfg),
+        max_sends=cfg.driver_max_sends,
+        max_memory_mb=cfg.driver_max_memory_mb,
+    )
+    failed = 0
     try:
-        login_and_persist(driver, cfg)
+        driver = sup.get()
 
-        # Optional initial delay
-        if ns.delay > 0:
-            import time as _t
+        if index is not None and ns.scan_inbox:
+            index.harvest_inbox(driver, cfg.base_url)
 
-            _t.sleep(ns.delay)
+        def _deliver(user: str, message: str) -> None:
+            recipients.check(user)  # a known-missing user should not start a browser
+            try:
+                deliver(
+                    sup.get(),
+                    cfg,
+                    user,
+                    message,
+                    thread_index=index,
+                    typing=ns.typing,
+                    recipients=recipients,
+                )
+            finally:
+                sup.after_send()
 
         def _send_all() -> None:
-            for user in ns.to:
-                send_dm(driver, cfg.base_url, user, ns.message, delay_before_send=0)
-
-        if ns.repeat > 0:
-            from .scheduler import repeat_every
+            nonlocal failed
+            sent = 0
+            if box is None:
+                for user in ns.to:
+                    try:
+                        _deliver(user, ns.message)
+                        sent += 1
+                    except RecipientNotFoundError as e:
+                        failed += 1
+                        print(e, file=sys.stderr)
+                    except Exception as e:
+                        # One bad send (or a crashed browser) must not end a --repeat run
+                        if ns.repeat <= 0:
+                            raise
+                        failed += 1
+                        print(f"{user}: {type(e).__name__}: {e}", file=sys.stderr)
+            else:
+                if ns.to and not ns.drain:
+                    # Each repeat slot is its own batch; a restart within the slot dedupes
+                    batch = ns.batch
+                    if ns.repeat > 0:
+                        batch = f"{batch}@{int(time.time() // ns.repeat)}"
+                    box.enqueue_many(ns.to, ns.message, batch=batch)
+                done = drain(box, lambda item: _deliver(item.username, item.message))
+                failed += done[FAILED]
+                sent = done[SENT]
+            if sent:  # only a delivered message proves the session still works
+                try:
+                    mark_session_valid(cfg)
+                except Exception as e:  # bookkeeping only; the messages are already out
+                    print(f"Could not stamp the session file: {e}", file=sys.stderr)
 
-            repeat_every(ns.repeat, _send_all)
-        else:
-            _send_all()
+        _schedule(ns, _send_all)
 
-        return 0
+        return 1 if failed else 0
     finally:
-        driver.quit()
+        sup.close()
+        if box is not None:
+            box.close()
+        _save_selector_stats(cfg)
+        if accounting is not None:
+            accounting.emit_metrics()
+            print(accounting.report(), file=sys.stderr)
+        metrics.clear_sinks()
 
 
 if __name__ == "__main__":
@@ -6,7 +6,7 @@ Project: Instagram Bot – Automate Instagram Messages
 File: messaging.py 
 Author: Mobin Yousefi (GitHub: github.com/mobinyousefi) 
 Created: 2025-10-20 
-Updated: 2025-10-20 
+Updated: 2026-10-18 
 License: MIT License (see LICENSE file for details)
 =================================================================== 
 
@@ -18,7 +18,7 @@ from instagram_bot.messaging import send_dm
 
 Notes: 
 - DOM is fragile; adjust selectors in utils/selectors.py as IG changes.
-- Uses direct URL to user thread when possible.
+- Uses direct URL to user thread when possible (see thread_index.py).
 
 ===================================================================
 """
@@ -26,84 +26,257 @@ from __future__ import annotations
 
 import random
 import time
-from typing import Iterable
+from typing import TYPE_CHECKING, Any, Tuple
 
-from selenium.webdriver.common.by import By
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.remote.webdriver import WebDriver
 
-from .exceptions import MessageSendError, SelectorNotFoundError
-from .utils.selectors import SX
+from . import metrics, retry
+from .auth import ensure_authenticated, login_and_persist
+from .automation.waits import navigate, wait_for
+from .config import Settings
+from .exceptions import (
+    PERMANENT,
+    RESTART,
+    ActionBlockedError,
+    MessageSendError,
+    RecipientNotFoundError,
+    SelectorNotFoundError,
+)
+from .pages import ComposeDialog, ThreadPage
+from .recipients import RecipientCache
+from .retry import RetryPolicy
+from .thread_index import ThreadIndex, thread_url_from
+from .utils import selectors as sel
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
 
 
 def _human_delay(min_s: float, max_s: float) -> None:
     time.sleep(random.uniform(min_s, max_s))
 
 
-def _open_dm_thread(driver: WebDriver, base_url: str, username: str) -> None:
+# deliver(): one fresh login on a rejected session; send_dm already retried the rest
+_DELIVER_POLICY = RetryPolicy(transient=0, reauth=1)
+
+
+def _open_known_thread(
+    driver: WebDriver, username: str, index: ThreadIndex
+) -> ThreadPage | None:
+    url = index.get(username)
+    if not url:
+        return None
+    navigate(driver, url)
+    ensure_authenticated(driver)
+
+    def _ready(d: WebDriver) -> Tuple[Any, bool] | bool:
+        if thread_url_from(d.current_url) != url:
+            return False
+        box = sel.DM_TEXTBOX.find(d, "visible")
+        if box is None:
+            return False
+        peer = sel.THREAD_PEER.find(d, username=username.strip().lstrip("@").lower())
+        return box, peer is not None
+
+    try:
+        box, with_peer = wait_for(driver, 10, _ready, "known_thread")
+    except TimeoutException:
+        ensure_authenticated(driver)
+        # Thread gone or redirected elsewhere: forget it and compose again
+        metrics.event("messaging.fallback", label="stale_thread")
+        index.drop(username)
+        return None
+    if not with_peer:
+        # Someone else's thread (or a group) under this username: never send there
+        metrics.event("messaging.fallback", label="wrong_thread")
+        index.drop(username)
+        return None
+    page = ThreadPage(driver)
+    page.remember(sel.DM_TEXTBOX, box)
+    return page
+
+
+def _open_dm_thread(
+    driver: WebDriver, base_url: str, username: str, index: ThreadIndex | None = None
+) -> ThreadPage:
+    """Open the thread with ``username``; the returned page already holds its textbox."""
+    with metrics.span("messaging.open_thread", label="thread_index") as attrs:
+        if index is not None:
+            page = _open_known_thread(driver, username, index)
+            if page is not None:
+                return page
+        attrs["label"] = "compose"
+        return _compose_thread(driver, base_url, username, index)
+
+
+def _raise_unless_transient(exc: Exception) -> None:
+    """Re-raise ``exc`` as is when wrapping it would hide a dead browser or a refusal."""
+    if retry.classify(exc) in (PERMANENT, RESTART):
+        raise exc
+
+
+def _compose_thread(
+    driver: WebDriver, base_url: str, username: str, index: ThreadIndex | None
+) -> ThreadPage:
     # Navigate to a direct compose for the username
-    driver.get(f"{base_url}/direct/new/")
+    dialog = ComposeDialog(driver)
+    dialog.open(base_url)
+    ensure_authenticated(driver)
 
-    # Type username in the recipient box and select first result
+    # Type username in the recipient box and select the matching result
     try:
-        input_box = WebDriverWait(driver, 15).until(
-            EC.visibility_of_element_located((By.XPATH, "//input[@name='queryBox']"))
-        )
+        dialog.search(username)
     except Exception as e:
+        _raise_unless_transient(e)
         raise SelectorNotFoundError("DM recipient input not found.") from e
-
-    input_box.clear()
-    input_box.send_keys(username)
     _human_delay(0.5, 1.2)
 
-    # Click the user in the dropdown list
+    # Click the user in the dropdown list; anything but an exact match raises
     try:
-        candidate = WebDriverWait(driver, 15).until(
-            EC.element_to_be_clickable(
-                (
-                    By.XPATH,
-                    f"//div[@role='dialog']//div[contains(@style,'cursor') and descendant::div[text()='@{username}'] or descendant::div[text()='{username}']]",
-                )
-            )
-        )
-        candidate.click()
-    except Exception:
-        # Fallback: choose the first result if exact match fails
-        try:
-            first = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.XPATH, "(//div[@role='dialog']//button)[1]"))
-            )
-            first.click()
-        except Exception as e:  # noqa: PERF203
-            raise SelectorNotFoundError("Cannot select recipient in compose list.") from e
+        dialog.pick(username)
+    except Exception as e:
+        _raise_unless_transient(e)
+        raise SelectorNotFoundError("Cannot select recipient in compose list.") from e
 
     # Click Next to open the thread
     try:
-        next_btn = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.XPATH, "//div[@role='dialog']//div[text()='Next']/parent::button"))
-        )
-        next_btn.click()
+        dialog.next()
     except Exception as e:
+        _raise_unless_transient(e)
         raise SelectorNotFoundError("Next button in compose dialog not found.") from e
 
-    # Wait for textbox to appear
-    WebDriverWait(driver, 20).until(
-        EC.visibility_of_element_located((By.XPATH, SX.TEXTAREA_DM))
-    )
+    # Wait for textbox to appear; Next navigated in-page, so this is a new document
+    page = ThreadPage(driver)
+    page.textbox(timeout=20)
+
+    # Remember the thread for next time
+    if index is not None:
+        try:
+            wait_for(driver, 5, lambda d: thread_url_from(d.current_url), "thread_url")
+            index.put(username, driver.current_url)
+        except Exception:
+            pass
+    return page
+
+
+# "keys": one send_keys per character with human-like pauses (BMP text only).
+# "insert": the whole text in a single Input.insertText, like an IME commit.
+TYPING_MODES = ("keys", "insert")
+
+
+def _insert_text(driver: WebDriver, box, text: str) -> None:
+    box.click()  # focus; insertText targets the focused element
+    try:
+        driver.execute_cdp_cmd("Input.insertText", {"text": text})
+    except Exception:
+        # Non-Chromium drivers: execCommand still fires the input events React listens to
+        metrics.event("messaging.fallback", label="exec_command")
+        driver.execute_script(
+            "arguments[0].focus(); document.execCommand('insertText', false, arguments[1]);",
+            box,
+            text,
+        )
 
 
-def _type_text(driver: WebDriver, text: str, min_delay: float, max_delay: float) -> None:
+def _type_text(
+    page: ThreadPage, text: str, min_delay: float, max_delay: float, mode: str = "keys"
+) -> None:
+    if mode not in TYPING_MODES:
+        raise ValueError(f"Unknown typing mode {mode!r}; expected one of {TYPING_MODES}.")
     # Some IG inputs are contenteditable divs; use generic approach
-    box = WebDriverWait(driver, 15).until(
-        EC.visibility_of_element_located((By.XPATH, SX.TEXTAREA_DM))
-    )
+    if mode == "insert":
+        page.use(sel.DM_TEXTBOX, lambda box: _insert_text(page.driver, box, text))
+        return
     for ch in text:
-        box.send_keys(ch)
+        page.use(sel.DM_TEXTBOX, lambda box: box.send_keys(ch))
         _human_delay(min_delay, max_delay)
 
 
+def _composer_text(box) -> str:
+    # <textarea> keeps its content in `value`; contenteditable divs expose it as text
+    value = box.get_attribute("value")
+    return (value if value is not None else box.text or "").strip()
+
+
+def _composer_empty(page: ThreadPage) -> bool:
+    return not page.use(sel.DM_TEXTBOX, _composer_text)
+
+
+_BLOCKED = "blocked"
+
+
+def _landed(page: ThreadPage, rows_before: int) -> bool:
+    return page.message_count() > rows_before or _composer_empty(page)
+
+
+def _confirm_sent(page: ThreadPage, rows_before: int, timeout: float) -> None:
+    """Return once the outgoing bubble shows up or the composer clears.
+
+    Raises ``ActionBlockedError`` as soon as Instagram shows its "Try Again
+    Later" notice, since no retry can get that message through.
+    """
+
+    def _sent(d: WebDriver) -> bool | str:
+        if _landed(page, rows_before):
+            return True
+        return _BLOCKED if sel.ACTION_BLOCKED.find(d, "visible") is not None else False
+
+    try:
+        outcome = wait_for(page.driver, timeout, _sent, "send_confirm", poll_frequency=0.1)
+    except Exception as e:
+        raise MessageSendError(f"Send not confirmed within {timeout:.1f}s.") from e
+    if outcome == _BLOCKED:
+        raise ActionBlockedError("Instagram blocked this send (\"Try Again Later\").")
+
+
+def _submit(page: ThreadPage, policy: RetryPolicy, confirm_timeout: float) -> None:
+    # Press Enter to send (typical for IG). If fails, click Send button.
+    page.textbox(timeout=10)
+    rows_before = page.message_count()
+    # One deadline for Enter, the Send button and every retry
+    deadline = time.monotonic() + confirm_timeout
+    tried = False
+
+    def _left() -> float:
+        return max(deadline - time.monotonic(), 0.0)
+
+    def _attempt() -> None:
+        nonlocal tried
+        # A previous attempt may have gone through after its deadline
+        if tried and _landed(page, rows_before):
+            return
+        tried = True
+        try:
+            page.use(sel.DM_TEXTBOX, lambda box: box.send_keys(Keys.ENTER))
+            _confirm_sent(page, rows_before, _left() / 2)  # keep the rest for the button
+            return
+        except Exception as e:
+            if policy.classify(e) in (PERMANENT, RESTART):
+                raise
+        # Enter may have landed just after its wait: clicking now would send twice
+        if _landed(page, rows_before):
+            return
+        # Fallback: try clicking a Send button
+        metrics.event("messaging.fallback", label="send_button")
+        page.click_send()
+        _confirm_sent(page, rows_before, _left())
+
+    def _pause(seconds: float) -> None:
+        if seconds >= _left():
+            raise MessageSendError(f"Send not confirmed within {confirm_timeout:.1f}s.")
+        time.sleep(seconds)
+
+    try:
+        retry.run(_attempt, policy, label="send", sleep=_pause)
+    except MessageSendError:
+        raise
+    except Exception as e:
+        err = MessageSendError("Failed to send DM after retries.")
+        err.failure_class = policy.classify(e)  # a dead browser stays what it is
+        raise err from e
+
+
 def send_dm(
     driver: WebDriver,
     base_url: str,
@@ -113,37 +286,70 @@ def send_dm(
     type_delay_min: float = 0.02,
     type_delay_max: float = 0.06,
     retries: int = 2,
+    confirm_timeout: float = 10.0,
+    thread_index: ThreadIndex | None = None,
+    typing: str = "keys",
+    recipients: RecipientCache | None = None,
+    retry_policy: RetryPolicy | None = None,
 ) -> None:
-    """Open (or compose) a DM thread and send a message."""
-    _open_dm_thread(driver, base_url, username)
+    """Open (or compose) a DM thread and send a message.
 
-    if delay_before_send and delay_before_send > 0:
-        time.sleep(delay_before_send)
+    Returns only once the send is confirmed in the thread; raises
+    ``MessageSendError`` if that does not happen within ``confirm_timeout``,
+    one budget shared by Enter, the Send button and every retry. With a
+    ``thread_index`` known recipients are opened by their thread URL and new
+    threads are recorded for next time.
+    ``typing="insert"`` enters the whole message in one call (see TYPING_MODES).
+    With ``recipients``, usernames that recently matched nobody raise
+    ``RecipientNotFoundError`` before the browser is touched.
+    Send attempts follow ``retry_policy`` (default: ``retries`` transient
+    retries with jittered backoff); permanent failures are never retried.
+    """
+    if recipients is not None:
+        recipients.check(username)
+    with metrics.span("messaging.send_dm", label=typing):
+        try:
+            page = _open_dm_thread(driver, base_url, username, thread_index)
+        except RecipientNotFoundError:
+            if recipients is not None:
+                recipients.mark_missing(username, "compose search")
+            raise
+        if recipients is not None:
+            recipients.mark_resolved(username)
 
-    # Type text like a human
-    _type_text(driver, message, type_delay_min, type_delay_max)
+        if delay_before_send and delay_before_send > 0:
+            time.sleep(delay_before_send)
 
-    # Press Enter to send (typical for IG). If fails, click Send button.
-    box = WebDriverWait(driver, 10).until(
-        EC.visibility_of_element_located((By.XPATH, SX.TEXTAREA_DM))
-    )
+        # Type text like a human
+        with metrics.span("messaging.type_text", label=typing, chars=len(message)):
+            _type_text(page, message, type_delay_min, type_delay_max, typing)
 
-    for attempt in range(retries + 1):
-        try:
-            box.send_keys(Keys.ENTER)
-            # Simple confirmation: wait for input to clear / last bubble to appear
-            time.sleep(1.5)
-            return
-        except Exception:
-            # Fallback: try clicking a Send button
-            try:
-                send_btn = WebDriverWait(driver, 5).until(
-                    EC.element_to_be_clickable((By.XPATH, SX.SEND_BUTTON))
-                )
-                send_btn.click()
-                time.sleep(1.5)
-                return
-            except Exception:
-                if attempt >= retries:
-                    raise MessageSendError("Failed to send DM after retries.")
-                time.sleep(1.0 + attempt)
+        with metrics.span("messaging.submit", label=typing):
+            _submit(page, retry_policy or RetryPolicy(transient=retries), confirm_timeout)
+
+
+def deliver(
+    driver: WebDriver,
+    cfg: Settings,
+    username: str,
+    message: str,
+    *,
+    thread_index: ThreadIndex | None = None,
+    typing: str = "keys",
+    recipients: RecipientCache | None = None,
+) -> None:
+    """``send_dm`` with the run's settings, logging in again once if the session was rejected."""
+    kwargs = dict(
+        delay_before_send=0,
+        confirm_timeout=cfg.send_confirm_timeout,
+        thread_index=thread_index,
+        typing=typing,
+        recipients=recipients,
+    )
+    retry.run(
+        lambda: send_dm(driver, cfg.base_url, username, message, **kwargs),
+        _DELIVER_POLICY,
+        label="deliver",
+        # Session was trusted without a probe (or expired since): log in for real
+        on_reauth=lambda: login_and_persist(driver, cfg, allow_skip=False),
+    )
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+=================================================================== 
+Project: Instagram Bot – Automate Instagram Messages 
+File: metrics.py 
+Author: Mobin Yousefi (GitHub: github.com/mobinyousefi) 
+Created: 2026-10-18 
+Updated: 2026-10-18 
+License: MIT License (see LICENSE file for details)
+=================================================================== 
+
+Description: 
+Timing spans and events for auth, messaging and scheduler steps, fed to
+pluggable sinks (JSON lines, Prometheus text file, in-process callback).
+
+Usage: 
+from instagram_bot import metrics
+metrics.add_sink(metrics.JsonLinesSink(Path("spans.jsonl")))
+with metrics.span("wait", label="dm_textbox"):
+    ...
+
+Notes: 
+- With no sinks registered a span costs two perf_counter() calls and a
+  push/pop on this thread's stack of open span names (open_spans()).
+- Keep `label` low-cardinality; it becomes a Prometheus label.
+
+===================================================================
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Protocol, Tuple
+
+
+@dataclass
+class Span:
+    name: str
+    start: float  # wall clock (time.time()) at span start
+    duration: float  # seconds
+    ok: bool = True
+    error: Optional[str] = None  # exception class name when ok is False
+    attrs: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def label(self) -> str:
+        return str(self.attrs.get("label", ""))
+
+
+class Sink(Protocol):
+    def emit(self, span: Span) -> None: ...
+
+    def close(self) -> None: ...
+
+
+_sinks: List[Sink] = []
+_sinks_lock = threading.Lock()
+_local = threading.local()
+
+
+def add_sink(sink: Sink) -> Sink:
+    with _sinks_lock:
+        _sinks.append(sink)
+    return sink
+
+
+def remove_sink(sink: Sink) -> None:
+    with _sinks_lock:
+        if sink in _sinks:
+            _sinks.remove(sink)
+    sink.close()
+
+
+def clear_sinks() -> None:
+    with _sinks_lock:
+        sinks = list(_sinks)
+        _sinks.clear()
+    for s in sinks:
+        s.close()
+
+
+def _emit(sp: Span) -> None:
+    for sink in list(_sinks):
+        try:
+            sink.emit(sp)
+        except Exception:
+            pass  # instrumentation must never break a send
+
+
+def _open() -> List[str]:
+    try:
+        return _local.open
+    except AttributeError:
+        _local.open = []
+        return _local.open
+
+
+def open_spans() -> Tuple[str, ...]:
+    """Names of the spans open on this thread, outermost first."""
+    return tuple(_open())
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Dict[str, Any]]:
+    """Time the enclosed block; yields ``attrs`` so callers can add to it."""
+    stack = _open()
+    stack.append(name)
+    wall = time.time()
+    start = time.perf_counter()
+    try:
+        yield attrs
+    except BaseException as e:
+        if _sinks:
+            _emit(Span(name, wall, time.perf_counter() - start, False, type(e).__name__, attrs))
+        raise
+    finally:
+        stack.pop()
+    if _sinks:
+        _emit(Span(name, wall, time.perf_counter() - start, True, None, attrs))
+
+
+def event(name: str, **attrs: Any) -> None:
+    """Record a zero-duration occurrence such as a retry or a fallback."""
+    if _sinks:
+        _emit(Span(name, time.time(), 0.0, True, None, attrs))
+
+
+class CallbackSink:
+    """Hand every span to ``fn`` in-process."""
+
+    def __init__(self, fn: Callable[[Span], None]) -> None:
+        self.fn = fn
+
+    def emit(self, span: Span) -> None:
+        self.fn(span)
+
+    def close(self) -> None:
+        pass
+
+
+class JsonLinesSink:
+    """Append one JSON object per span to ``path``."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._fh = open(path, "a", encoding="utf-8")
+
+    def emit(self, span: Span) -> None:
+        line = json.dumps(asdict(span), ensure_ascii=False, default=str)
+        with self._lock:
+            self._fh.write(line + "\n")
+            self._fh.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._fh.closed:
+                self._fh.close()
+
+
+class PrometheusTextSink:
+    """Aggregate spans and rewrite ``path`` in Prometheus text format.
+
+    Meant for node_exporter's textfile collector. The file is replaced
+    atomically, at most every ``min_interval`` seconds and on close().
+    """
+
+    PREFIX = "instagram_bot_span"
+
+    def __init__(self, path: Path, min_interval: float = 5.0) -> None:
+        self.path = path
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        # (name, label) -> [count, sum_seconds, errors]
+        self._agg: Dict[Tuple[str, str], List[float]] = {}
+        self._last_write = 0.0
+
+    def emit(self, span: Span) -> None:
+        with self._lock:
+            agg = self._agg.setdefault((span.name, span.label), [0, 0.0, 0])
+            agg[0] += 1
+            agg[1] += span.duration
+            agg[2] += 0 if span.ok else 1
+            due = time.monotonic() - self._last_write >= self.min_interval
+        if due:
+            self.flush()
+
+    def render(self) -> str:
+        with self._lock:
+            items = sorted(self._agg.items())
+        p = self.PREFIX
+        lines = [
+            f"# HELP {p}_seconds Duration of instrumented bot steps.",
+            f"# TYPE {p}_seconds summary",
+        ]
+        errors = [
+            f"# HELP {p}_errors_total Instrumented steps that raised.",
+            f"# TYPE {p}_errors_total counter",
+        ]
+        for (name, label), (count, total, errs) in items:
+            lbl = f'span="{_escape(name)}",label="{_escape(label)}"'
+            lines.append(f"{p}_seconds_sum{{{lbl}}} {total:.6f}")
+            lines.append(f"{p}_seconds_count{{{lbl}}} {int(count)}")
+            errors.append(f"{p}_errors_total{{{lbl}}} {int(errs)}")
+        return "\n".join(lines + errors) + "\n"
+
+    def flush(self) -> None:
+        text = self.render()
+        tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        with self._write_lock:
+            tmp.write_text(text, encoding="utf-8")
+            os.replace(tmp, self.path)
+            self._last_write = time.monotonic()
+
+    def close(self) -> None:
+        self.flush()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+=================================================================== 
+Project: Instagram Bot – Automate Instagram Messages 
+File: outbox.py 
+Author: Mobin Yousefi (GitHub: github.com/mobinyousefi) 
+Created: 2026-10-18 
+Updated: 2026-10-18 
+License: MIT License (see LICENSE file for details)
+=================================================================== 
+
+Description: 
+Durable SQLite send queue. Each DM is a row keyed by an idempotency key
+and moves pending -> in_flight -> sent | failed; every attempt is timed.
+A restarted run only sends what is not already marked sent.
+
+Usage: 
+from instagram_bot.outbox import Outbox, drain
+box = Outbox(Path(".ig_outbox.sqlite3"))
+box.enqueue("alice", "Hello")
+drain(box, lambda item: send_dm(driver, base_url, item.username, item.message))
+
+Notes: 
+- Enqueueing the same (batch, username, message) twice is a no-op.
+- recover() and drain() take an exclusive lock on the outbox, held until
+  close(), so two runs never send from the same queue. Enqueueing does
+  not need it.
+- A row still in_flight at startup was interrupted mid-send; recover()
+  puts it back to pending (delivery is at-least-once in that window).
+- A failed attempt puts the row back after a doubling delay
+  (retry_delay, 2 x retry_delay, ...); drain() waits for it.
+
+===================================================================
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from . import metrics
+from .exceptions import PERMANENT, OutboxLockedError
+from .retry import classify
+from .utils.filelock import FileLock
+
+log = logging.getLogger(__name__)
+
+PENDING = "pending"
+IN_FLIGHT = "in_flight"
+SENT = "sent"
+FAILED = "failed"
+STATES = (PENDING, IN_FLIGHT, SENT, FAILED)
+
+_MAX_RETRY_DELAY = 3600.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id          INTEGER PRIMARY KEY,
+    key         TEXT NOT NULL UNIQUE,
+    username    TEXT NOT NULL,
+    message     TEXT NOT NULL,
+    state       TEXT NOT NULL DEFAULT 'pending',
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    not_before  REAL NOT NULL DEFAULT 0,
+    last_error  TEXT,
+    created_at  REAL NOT NULL,
+    updated_at  REAL NOT NULL,
+    sent_at     REAL
+);
+CREATE INDEX IF NOT EXISTS messages_state ON messages (state, id);
+CREATE TABLE IF NOT EXISTS attempts (
+    id          INTEGER PRIMARY KEY,
+    message_id  INTEGER NOT NULL REFERENCES messages (id),
+    started_at  REAL NOT NULL,
+    duration    REAL NOT NULL,
+    ok          INTEGER NOT NULL,
+    error       TEXT
+);
+"""
+
+
+def idempotency_key(username: str, message: str, batch: str = "") -> str:
+    digest = hashlib.sha256(message.encode("utf-8")).hexdigest()[:16]
+    return f"{batch}:{username.strip().lstrip('@').lower()}:{digest}"
+
+
+@dataclass(frozen=True)
+class OutboxItem:
+    id: int
+    key: str
+    username: str
+    message: str
+    attempts: int
+
+
+class Outbox:
+    """Send queue stored in the SQLite database at ``path``."""
+
+    def __init__(self, path: Path, max_attempts: int = 3, retry_delay: float = 30.0) -> None:
+        self.path = path
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = FileLock(path.with_name(f"{path.name}.lock"), timeout=0)
+        # Autocommit mode; writes that must be atomic use explicit BEGIN IMMEDIATE
+        self._db = sqlite3.connect(str(path), isolation_level=None, timeout=30.0)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=FULL")  # a "sent" mark must survive a crash
+        self._db.executescript(_SCHEMA)
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(messages)")}
+        if "not_before" not in columns:  # outboxes created before retry backoff
+            self._db.execute("ALTER TABLE messages ADD COLUMN not_before REAL NOT NULL DEFAULT 0")
+
+    def close(self) -> None:
+        self._db.close()
+        self._lock.release()
+
+    def __enter__(self) -> "Outbox":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # -- producer ------------------------------------------------------------
+    def enqueue(self, username: str, message: str, *, batch: str = "", key: str = "") -> bool:
+        """Queue one DM. False if a row with the same key already exists."""
+        now = time.time()
+        cur = self._db.execute(
+            "INSERT OR IGNORE INTO messages (key, username, message, created_at, updated_at)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (key or idempotency_key(username, message, batch), username, message, now, now),
+        )
+        return cur.rowcount == 1
+
+    def enqueue_many(self, usernames: List[str], message: str, *, batch: str = "") -> int:
+        with self._tx():
+            return sum(self.enqueue(u, message, batch=batch) for u in usernames)
+
+    # -- consumer ------------------------------------------------------------
+    def lock(self) -> None:
+        """Become this outbox's only consumer until close(); no-op if already."""
+        if not self._lock.acquire():
+            raise OutboxLockedError(f"Outbox {self.path} is being drained by another process.")
+
+    def recover(self) -> int:
+        """Return rows left in_flight by a crashed run to pending."""
+        self.lock()  # otherwise "in_flight" may be another run's send in progress
+        cur = self._db.execute(
+            "UPDATE messages SET state = ?, updated_at = ? WHERE state = ?",
+            (PENDING, time.time(), IN_FLIGHT),
+        )
+        if cur.rowcount:
+            log.warning("Requeued %d message(s) interrupted mid-send.", cur.rowcount)
+        return cur.rowcount
+
+    def claim(self) -> Optional[OutboxItem]:
+        """Move the oldest pending row that is due to in_flight and return it."""
+        with self._tx():
+            row = self._db.execute(
+                "SELECT id, key, username, message, attempts FROM messages"
+                " WHERE state = ? AND not_before <= ? ORDER BY id LIMIT 1",
+                (PENDING, time.time()),
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute(
+                "UPDATE messages SET state = ?, attempts = attempts + 1, updated_at = ?"
+                " WHERE id = ?",
+                (IN_FLIGHT, time.time(), row[0]),
+            )
+        return OutboxItem(row[0], row[1], row[2], row[3], row[4] + 1)
+
+    def mark_sent(self, item: OutboxItem, started: float, duration: float) -> None:
+        with self._tx():
+            self._record_attempt(item, started, duration, None)
+            self._db.execute(
+                "UPDATE messages SET state = ?, sent_at = ?, last_error = NULL, updated_at = ?"
+                " WHERE id = ?",
+                (SENT, started + duration, time.time(), item.id),
+            )
+
+    def mark_failed(
+        self, item: OutboxItem, started: float, duration: float, error: str, final: bool = False
+    ) -> str:
+        """Record a failed attempt; the row goes back to pending until max_attempts.
+
+        ``final`` (a permanent failure) marks it failed at once. A pending row
+        is not claimed again for ``retry_delay * 2**(attempts - 1)`` seconds.
+        """
+        state = FAILED if final or item.attempts >= self.max_attempts else PENDING
+        now = time.time()
+        backoff = min(_MAX_RETRY_DELAY, self.retry_delay * 2 ** (item.attempts - 1))
+        with self._tx():
+            self._record_attempt(item, started, duration, error)
+            self._db.execute(
+                "UPDATE messages SET state = ?, last_error = ?, not_before = ?, updated_at = ?"
+                " WHERE id = ?",
+                (state, error, now + backoff, now, item.id),
+            )
+        return state
+
+    def next_due(self) -> Optional[float]:
+        """When the earliest pending row may be claimed; None if nothing is pending."""
+        row = self._db.execute(
+            "SELECT MIN(not_before) FROM messages WHERE state = ?", (PENDING,)
+        ).fetchone()
+        return row[0]
+
+    def release(self, item: OutboxItem) -> None:
+        """Hand an in-flight row back without counting the attempt (e.g. on Ctrl-C)."""
+        self._db.execute(
+            "UPDATE messages SET state = ?, attempts = attempts - 1, updated_at = ?"
+            " WHERE id = ? AND state = ?",
+            (PENDING, time.time(), item.id, IN_FLIGHT),
+        )
+
+    def retry_failed(self) -> int:
+        cur = self._db.execute(
+            "UPDATE messages SET state = ?, attempts = 0, not_before = 0, updated_at = ?"
+            " WHERE state = ?",
+            (PENDING, time.time(), FAILED),
+        )
+        return cur.rowcount
+
+    # -- inspection ----------------------------------------------------------
+    def counts(self) -> Dict[str, int]:
+        out = {s: 0 for s in STATES}
+        for state, n in self._db.execute("SELECT state, COUNT(*) FROM messages GROUP BY state"):
+            out[state] = n
+        return out
+
+    def state_of(self, key: str) -> Optional[str]:
+        row = self._db.execute("SELECT state FROM messages WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _record_attempt(
+        self, item: OutboxItem, started: float, duration: float, error: Optional[str]
+    ) -> None:
+        self._db.execute(
+            "INSERT INTO attempts (message_id, started_at, duration, ok, error)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (item.id, started, duration, int(error is None), error),
+        )
+
+    def _tx(self) -> "_Transaction":
+        return _Transaction(self._db)
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT/ROLLBACK; nested uses join the outer one."""
+
+    def __init__(self, db: sqlite3.Connection) -> None:
+        self.db = db
+        self.outer = False
+
+    def __enter__(self) -> None:
+        if not self.db.in_transaction:
+            self.db.execute("BEGIN IMMEDIATE")
+            self.outer = True
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self.outer:
+            self.db.execute("ROLLBACK" if exc_type else "COMMIT")
+
+
+def drain(
+    box: Outbox,
+    send: Callable[[OutboxItem], None],
+    *,
+    should_stop: Callable[[], bool] = lambda: False,
+    sleep: Callable[[float], None] = time.sleep,
+) -> Dict[str, int]:
+    """Send every pending row through ``send``; returns sent/failed/retry counts.
+
+    Rows waiting out a retry delay are waited for, so this returns once
+    nothing is pending (or ``should_stop()``).
+    """
+    box.lock()
+    done = {SENT: 0, FAILED: 0, PENDING: 0}
+    while not should_stop():
+        item = box.claim()
+        if item is None:
+            due = box.next_due()
+            if due is None:
+                break
+            sleep(max(0.0, due - time.time()))
+            continue
+        started = time.time()
+        t0 = time.perf_counter()
+        try:
+            with metrics.span("outbox.send", label="attempt", attempt=item.attempts):
+                send(item)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            failure = classify(e)
+            # RESTART stays pending: the supervisor replaces the dead browser for the next try
+            state = box.mark_failed(
+                item, started, time.perf_counter() - t0, error, final=failure == PERMANENT
+            )
+            log.warning(
+                "Send to %s failed (attempt %d, %s): %s", item.username, item.attempts, failure, e
+            )
+            done[state] += 1
+            continue
+        except BaseException:
+            box.release(item)
+            raise
+        box.mark_sent(item, started, time.perf_counter() - t0)
+        done[SENT] += 1
+    return done
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+=================================================================== 
+Project: Instagram Bot – Automate Instagram Messages 
+File: pages.py 
+Author: Mobin Yousefi (GitHub: github.com/mobinyousefi) 
+Created: 2026-10-18 
+Updated: 2026-10-18 
+License: MIT License (see LICENSE file for details)
+=================================================================== 
+
+Description: 
+Page objects for the login page, the compose dialog and a DM thread.
+Each element is resolved once and its handle reused until a navigation
+or a StaleElementReferenceException shows it is gone.
+
+Usage: 
+from instagram_bot.pages import ThreadPage
+page = ThreadPage(driver)
+page.use(sel.DM_TEXTBOX, lambda box: box.send_keys("hi"))
+
+Notes: 
+- Navigations are counted by automation.waits.navigate(); in-page
+  redirects (e.g. compose -> thread) need a new page object.
+
+===================================================================
+"""
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, Tuple, TypeVar
+
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+
+from . import metrics
+from .automation.waits import navigate, navigations, wait_for
+from .exceptions import RecipientNotFoundError
+from .utils import selectors as sel
+from .utils.selectors import Selector
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
+    from selenium.webdriver.remote.webelement import WebElement
+
+T = TypeVar("T")
+
+# Seconds "No account found." must stay up before it is believed; the dialog
+# shows it for the half-typed query until the final results replace it
+_NOT_FOUND_SETTLE = 1.0
+
+
+class Page:
+    """Element handle cache for whatever document ``driver`` shows now."""
+
+    def __init__(self, driver: WebDriver) -> None:
+        self.driver = driver
+        self._handles: Dict[Tuple[str, str, Tuple], WebElement] = {}
+        self._seen_nav = navigations(driver)
+
+    def find(
+        self,
+        selector: Selector,
+        state: str = "visible",
+        timeout: float = 10.0,
+        label: str = "",
+        **params: str,
+    ) -> WebElement:
+        """Cached handle for ``selector``, waiting up to ``timeout`` on first use."""
+        if self._seen_nav != navigations(self.driver):
+            self._handles.clear()
+            self._seen_nav = navigations(self.driver)
+        key = (selector.name, state, tuple(sorted(params.items())))
+        el = self._handles.get(key)
+        if el is None:
+            condition = getattr(selector, state)(**params)
+            el = wait_for(self.driver, timeout, condition, label or selector.name)
+            self._handles[key] = el
+        return el
+
+    def use(self, selector: Selector, fn: Callable[[WebElement], T], **find_kwargs: Any) -> T:
+        """Call ``fn(element)``; re-resolve once if the cached handle went stale."""
+        try:
+            return fn(self.find(selector, **find_kwargs))
+        except StaleElementReferenceException:
+            metrics.event("page.stale", label=selector.name)
+            self.forget(selector)
+            return fn(self.find(selector, **find_kwargs))
+
+    def remember(
+        self, selector: Selector, el: WebElement, state: str = "visible", **params: str
+    ) -> None:
+        """Seed the cache with a handle some other wait already produced."""
+        self._handles[(selector.name, state, tuple(sorted(params.items())))] = el
+
+    def forget(self, selector: Selector | None = None) -> None:
+        if selector is None:
+            self._handles.clear()
+        else:
+            for key in [k for k in self._handles if k[0] == selector.name]:
+                del self._handles[key]
+
+
+class LoginPage(Page):
+    def open(self, base_url: str) -> None:
+        navigate(self.driver, f"{base_url}/accounts/login/")
+
+    def fill(self, username: str, password: str) -> None:
+        for selector, value, label in (
+            (sel.USERNAME_INPUT, username, "username"),
+            (sel.PASSWORD_INPUT, password, "password"),
+        ):
+            el = self.find(selector, timeout=15, label=label)
+            el.clear()
+            el.send_keys(value)
+
+    def submit(self) -> None:
+        self.use(
+            sel.LOGIN_BUTTON,
+            lambda el: el.click(),
+            state="clickable",
+            timeout=10,
+            label="login_button",
+        )
+
+
+class ComposeDialog(Page):
+    def open(self, base_url: str) -> None:
+        navigate(self.driver, f"{base_url}/direct/new/")
+
+    def search(self, username: str) -> None:
+        box = self.find(sel.RECIPIENT_INPUT, timeout=15, label="recipient_input")
+        box.clear()
+        box.send_keys(username)
+
+    def pick(self, username: str) -> None:
+        """Click the result for exactly ``username``.
+
+        Raises RecipientNotFoundError once the dialog keeps saying nobody
+        matches, or when no exact result shows up in time. Another account is
+        never picked instead: whatever is picked gets the message.
+        """
+        exact = sel.RECIPIENT_EXACT.clickable(username=username)
+        nobody = sel.RECIPIENT_NONE.visible()
+        since: float | None = None  # when "No account found." was first seen, this time
+
+        def outcome(d: WebDriver) -> Any:
+            nonlocal since
+            el = exact(d)
+            if el:
+                return el
+            if not nobody(d):
+                since = None
+                return False
+            since = time.monotonic() if since is None else since
+            return time.monotonic() - since >= _NOT_FOUND_SETTLE
+
+        try:
+            # One wait for either outcome, so a bad username costs no timeout
+            found = wait_for(self.driver, 15, outcome, "recipient_exact", poll_frequency=0.2)
+        except TimeoutException:
+            raise RecipientNotFoundError(f"No result is exactly {username!r}.") from None
+        if found is True:
+            raise RecipientNotFoundError(f"No account named {username!r}.")
+        self.remember(sel.RECIPIENT_EXACT, found, "clickable", username=username)
+        self.use(
+            sel.RECIPIENT_EXACT,
+            lambda el: el.click(),
+            state="clickable",
+            timeout=5,
+            label="recipient_exact",
+            username=username,
+        )
+
+    def next(self) -> None:
+        self.use(
+            sel.NEXT_BUTTON,
+            lambda el: el.click(),
+            state="clickable",
+            timeout=10,
+            label="next_button",
+        )
+
+
+class ThreadPage(Page):
+    def textbox(self, timeout: float = 15.0) -> WebElement:
+        return self.find(sel.DM_TEXTBOX, timeout=timeout, label="dm_textbox")
+
+    def message_count(self) -> int:
+        # The row list changes with every send, so it is never cached
+        return len(sel.MESSAGE_ROW.find_all(self.driver))
+
+    def click_send(self, timeout: float = 5.0) -> None:
+        self.use(
+            sel.SEND_BUTTON,
+            lambda el: el.click(),
+            state="clickable",
+            timeout=timeout,
+            label="send_button",
+        )
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+=================================================================== 
+Project: Instagram Bot – Automate Instagram Messages 
+File: recipients.py 
+Author: Mobin Yousefi (GitHub: github.com/mobinyousefi) 
+Created: 2026-10-18 
+Updated: 2026-10-18 
+License: MIT License (see LICENSE file for details)
+=================================================================== 
+
+Description: 
+On-disk record of usernames that did not resolve to anyone, so sends to
+them fail at once instead of waiting out the compose dialog every run.
+Usernames that did resolve live in the thread index.
+
+Usage: 
+from instagram_bot.recipients import RecipientCache
+recipients = RecipientCache(Path(".ig_recipients.json"), ttl=86400)
+recipients.check("someone")  # raises RecipientNotFoundError if known bad
+
+Notes: 
+- Entries expire after ``ttl`` seconds; a new account may take the name.
+- Filled by the compose dialog and, with --precheck, by profile lookups.
+
+===================================================================
+"""
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from . import metrics
+from .exceptions import RecipientNotFoundError
+from .utils.atomicfile import write_text_atomic
+
+
+def _key(username: str) -> str:
+    return username.strip().lstrip("@").lower()
+
+
+class RecipientCache:
+    """Persistent username → (reason, when) map of recipients that did not resolve."""
+
+    def __init__(
+        self, path: Path | None, ttl: float = 86400.0, clock: Callable[[], float] = time.time
+    ) -> None:
+        self.path = path
+        self.ttl = ttl
+        self._clock = clock
+        self._missing: Dict[str, Dict[str, object]] = {}
+        self._load()
+
+    def _load(self) -> None:
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except Exception:
+            return  # unreadable cache: every recipient gets a fresh try
+        if isinstance(data, dict):
+            self._missing = {_key(k): v for k, v in data.items() if isinstance(v, dict)}
+            # Expired entries are only dead weight in the file
+            self._missing = {k: v for k, v in self._missing.items() if self._fresh(v)}
+
+    def _fresh(self, entry: Dict[str, object]) -> bool:
+        return self._clock() - float(entry.get("at", 0)) < self.ttl
+
+    def save(self) -> None:
+        if self.path is not None:
+            write_text_atomic(self.path, json.dumps(self._missing, ensure_ascii=False))
+
+    def missing(self, username: str) -> Optional[str]:
+        """Why ``username`` is known not to resolve, or None if it may."""
+        entry = self._missing.get(_key(username))
+        if entry is None or not self._fresh(entry):
+            return None
+        return str(entry.get("reason", ""))
+
+    def check(self, username: str) -> None:
+        reason = self.missing(username)
+        if reason is not None:
+            metrics.event("recipients.skip", label="cached")
+            raise RecipientNotFoundError(f"Recipient {username!r} not found ({reason}); skipped.")
+
+    def mark_missing(self, username: str, reason: str) -> None:
+        self._missing[_key(username)] = {"reason": reason, "at": self._clock()}
+        self.save()
+
+    def mark_resolved(self, username: str) -> None:
+        if self._missing.pop(_key(username), None) is not None:
+            self.save()
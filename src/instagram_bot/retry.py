@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+=================================================================== 
+Project: Instagram Bot – Automate Instagram Messages 
+File: retry.py 
+Author: Mobin Yousefi (GitHub: github.com/mobinyousefi) 
+Created: 2026-10-18 
+Updated: 2026-10-18 
+License: MIT License (see LICENSE file for details)
+=================================================================== 
+
+Description: 
+Failure classification and the retry policy built on it: transient
+failures back off exponentially with jitter, permanent ones are raised
+at once, and session loss triggers a re-login, each class with its own
+retry budget. A dead browser is raised at once too, but as RESTART: the
+send can be tried again once the supervisor has started a new one.
+
+Usage: 
+from instagram_bot.retry import RetryPolicy, classify, run
+run(lambda: send(), RetryPolicy(transient=3), label="send")
+
+Notes: 
+- Package exceptions carry their class (exceptions.failure_class);
+  Selenium and network errors are classified by type name, so this
+  module does not import Selenium.
+- An exception that exhausts the policy is re-raised with its class in
+  ``exc.failure_class``.
+
+===================================================================
+"""
+from __future__ import annotations
+
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional, TypeVar
+
+from . import metrics
+from .exceptions import FAILURE_CLASSES, PERMANENT, REAUTH, RESTART, TRANSIENT
+
+T = TypeVar("T")
+
+# Selenium / network failures that a second try can fix
+_TRANSIENT_NAMES = frozenset(
+    {
+        "StaleElementReferenceException",
+        "TimeoutException",
+        "ElementClickInterceptedException",
+        "ElementNotInteractableException",
+        "NoSuchElementException",
+        "MoveTargetOutOfBoundsException",
+        "ConnectionError",
+        "ConnectionResetError",
+        "Timeout",
+        "ReadTimeout",
+        "ConnectTimeout",
+    }
+)
+# The browser itself is gone; retrying in it cannot work, in a new one it can
+_RESTART_NAMES = frozenset(
+    {"InvalidSessionIdException", "NoSuchWindowException", "SessionNotCreatedException"}
+)
+
+
+def classify(exc: BaseException) -> str:
+    """TRANSIENT, PERMANENT, REAUTH or RESTART for ``exc``; unknown errors are transient."""
+    cls = getattr(exc, "failure_class", None)
+    if cls in FAILURE_CLASSES:
+        return cls
+    for klass in type(exc).__mro__:
+        if klass.__name__ in _RESTART_NAMES:
+            return RESTART
+        if klass.__name__ in _TRANSIENT_NAMES:
+            return TRANSIENT
+    return TRANSIENT
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Per-class retry budgets plus jittered exponential backoff.
+
+    ``delay(n)`` is ``base_delay * multiplier**n`` capped at ``max_delay``,
+    shortened by up to ``jitter`` (a fraction) at random. Subclass and
+    override ``classify``/``budget``/``delay`` to change the policy.
+    """
+
+    transient: int = 2
+    reauth: int = 1
+    permanent: int = 0
+    restart: int = 0  # the browser is not replaced inside run(); the caller does that
+    base_delay: float = 1.0
+    multiplier: float = 2.0
+    max_delay: float = 30.0
+    jitter: float = 0.5
+    rng: random.Random = field(default_factory=random.Random, compare=False, repr=False)
+
+    def classify(self, exc: BaseException) -> str:
+        return classify(exc)
+
+    def budget(self, failure_class: str) -> int:
+        return {
+            TRANSIENT: self.transient,
+            REAUTH: self.reauth,
+            PERMANENT: self.permanent,
+            RESTART: self.restart,
+        }[failure_class]
+
+    def delay(self, retry: int) -> float:
+        """Pause before retry number ``retry`` (0-based) of a transient failure."""
+        full = min(self.max_delay, self.base_delay * self.multiplier**retry)
+        return full * (1.0 - self.jitter * self.rng.random())
+
+
+def run(
+    fn: Callable[[], T],
+    policy: RetryPolicy,
+    *,
+    label: str,
+    on_reauth: Optional[Callable[[], None]] = None,
+    sleep: Callable[[float], None] = time.sleep,
+) -> T:
+    """Call ``fn`` until it succeeds or its failure class is out of budget.
+
+    REAUTH failures call ``on_reauth`` (e.g. a fresh login) before the next
+    try, and are raised as-is when no ``on_reauth`` is given.
+    """
+    used: Dict[str, int] = {}
+    while True:
+        try:
+            return fn()
+        except Exception as e:
+            cls = policy.classify(e)
+            used[cls] = used.get(cls, 0) + 1
+            exhausted = used[cls] > policy.budget(cls) or (cls == REAUTH and on_reauth is None)
+            if exhausted:
+                metrics.event("retry.give_up", label=label, failure_class=cls)
+                try:
+                    e.failure_class = cls
+                except Exception:
+                    pass  # exceptions with __slots__; the class is still classify(e)
+                raise
+            metrics.event("retry", label=label, failure_class=cls, attempt=used[cls])
+            if cls == REAUTH:
+                on_reauth()
+            else:
+                sleep(policy.delay(used[cls] - 1))
@@ -6,37 +6,238 @@ Project: Instagram Bot – Automate Instagram Messages
 File: scheduler.py 
 Author: Mobin Yousefi (GitHub: github.com/mobinyousefi) 
 Created: 2025-10-20 
-Updated: 2025-10-20 
+Updated: 2026-10-18 
 License: MIT License (see LICENSE file for details)
 =================================================================== 
 
 Description: 
-Simple delay and repeat helpers for scheduling tasks.
+Drift-free job scheduler on the monotonic clock, plus the simple delay
+and repeat helpers built on it.
 
 Usage: 
 from instagram_bot.scheduler import delay_then, repeat_every
+from instagram_bot.scheduler import Scheduler
+sched = Scheduler()
+sched.every(900, send_all, overrun="coalesce")
+sched.run()
 
 Notes: 
 - Lightweight on purpose; integrate APScheduler/Cron later if needed.
+- fixed_rate runs on a grid (t0, t0+i, t0+2i, ...); fixed_delay waits `i` after each run.
+- SIGINT/SIGTERM stop the loop after the running job (main thread only).
 
 ===================================================================
 """
 from __future__ import annotations
 
+import heapq
+import itertools
+import math
+import signal
+import threading
 import time
-from typing import Callable
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+from . import metrics
+
+FIXED_RATE = "fixed_rate"
+FIXED_DELAY = "fixed_delay"
+MODES = (FIXED_RATE, FIXED_DELAY)
+
+# What a fixed-rate job does when a run overshoots one or more grid slots:
+#   skip      - drop the missed slots, continue at the next future slot
+#   coalesce  - run once right away for all missed slots, then back on the grid
+#   catch_up  - run every missed slot back-to-back
+OVERRUN_POLICIES = ("skip", "coalesce", "catch_up")
+
+_EPS = 1e-9
+
+
+@dataclass(eq=False)
+class Job:
+    fn: Callable[[], None]
+    interval: Optional[float]  # None = one-shot
+    mode: str = FIXED_RATE
+    overrun: str = "skip"
+    name: str = ""
+    next_run: float = 0.0
+    anchor: float = 0.0  # grid origin for fixed-rate jobs
+    runs: int = 0
+    missed: int = 0  # grid slots dropped or coalesced by the overrun policy
+    last_duration: float = 0.0
+    cancelled: bool = False
+
+
+class Scheduler:
+    """Heap-based scheduler for many jobs; one thread runs them in order."""
+
+    def __init__(
+        self,
+        clock: Callable[[], float] = time.monotonic,
+        wait: Optional[Callable[[float], object]] = None,
+        handle_signals: bool = True,
+    ) -> None:
+        self.clock = clock
+        self.handle_signals = handle_signals
+        self._heap: List[Tuple[float, int, Job]] = []
+        self._seq = itertools.count()  # tie-breaker so equal times never compare Jobs
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._wait = wait or self._wakeup.wait
+        self._stopping = False
+
+    # -- job management ------------------------------------------------------
+    def every(
+        self,
+        interval: float,
+        fn: Callable[[], None],
+        *,
+        mode: str = FIXED_RATE,
+        overrun: str = "skip",
+        first_delay: float = 0.0,
+        name: str = "",
+    ) -> Job:
+        if interval <= 0:
+            raise ValueError("interval must be positive.")
+        if mode not in MODES:
+            raise ValueError(f"Unknown mode {mode!r}; expected one of {MODES}.")
+        if overrun not in OVERRUN_POLICIES:
+            raise ValueError(f"Unknown overrun policy {overrun!r}; expected {OVERRUN_POLICIES}.")
+        start = self.clock() + max(0.0, first_delay)
+        job = Job(fn, interval, mode, overrun, name or _name_of(fn), start, start)
+        self._add(job)
+        return job
+
+    def once(self, delay: float, fn: Callable[[], None], *, name: str = "") -> Job:
+        at = self.clock() + max(0.0, delay)
+        job = Job(fn, None, name=name or _name_of(fn), next_run=at, anchor=at)
+        self._add(job)
+        return job
+
+    def cancel(self, job: Job) -> None:
+        job.cancelled = True
+        self._wakeup.set()
+
+    def shutdown(self) -> None:
+        """Stop the run loop once the job in progress (if any) returns."""
+        self._stopping = True
+        self._wakeup.set()
+
+    def _add(self, job: Job) -> None:
+        self._push(job)
+        self._wakeup.set()
+
+    def _push(self, job: Job) -> None:
+        with self._lock:
+            heapq.heappush(self._heap, (job.next_run, next(self._seq), job))
+
+    # -- loop ----------------------------------------------------------------
+    def run(self, stop_after: Optional[float] = None) -> None:
+        """Run jobs until none are left, shutdown() is called, or ``stop_after`` elapses.
+
+        Jobs due after the ``stop_after`` deadline are not waited for.
+        """
+        deadline = None if stop_after is None else self.clock() + stop_after
+        self._stopping = False
+        restore = self._install_signal_handlers()
+        try:
+            while not self._stopping:
+                # Cleared before looking, so any add/cancel/shutdown from now on wakes the wait
+                self._wakeup.clear()
+                job = self._peek()
+                if job is None:
+                    break
+                if deadline is not None and job.next_run > deadline:
+                    break
+                delay = job.next_run - self.clock()
+                if delay > 0:
+                    self._wait(delay)
+                    continue  # re-check: a job may have been added, cancelled or stopped
+                with self._lock:
+                    heapq.heappop(self._heap)
+                self._run_job(job)
+        finally:
+            restore()
+
+    def _peek(self) -> Optional[Job]:
+        with self._lock:
+            items = self._heap
+            while items and items[0][2].cancelled:
+                heapq.heappop(items)
+            return items[0][2] if items else None
+
+    def _run_job(self, job: Job) -> None:
+        scheduled = job.next_run
+        started = self.clock()
+        try:
+            with metrics.span("scheduler.run", label=job.name, lateness=started - scheduled):
+                job.fn()
+        finally:
+            job.runs += 1
+            job.last_duration = self.clock() - started
+            if job.interval is not None and not job.cancelled:
+                self._reschedule(job, scheduled)
+
+    def _reschedule(self, job: Job, scheduled: float) -> None:
+        now = self.clock()
+        interval = job.interval or 0.0
+        if job.mode == FIXED_DELAY:
+            job.next_run = now + interval
+        else:
+            # First grid slot after the one just served (coalesced runs are off-grid)
+            slot = math.floor((scheduled - job.anchor) / interval + _EPS) + 1
+            nxt = job.anchor + slot * interval
+            if nxt <= now:
+                missed = math.floor((now - nxt) / interval + _EPS) + 1
+                metrics.event("scheduler.overrun", label=job.overrun, job=job.name, missed=missed)
+                if job.overrun == "skip":
+                    job.missed += missed
+                    nxt += missed * interval
+                elif job.overrun == "coalesce":
+                    job.missed += missed - 1
+                    nxt = now
+                # catch_up: keep nxt, the loop runs each missed slot in turn
+            job.next_run = nxt
+        self._push(job)
+
+    def _install_signal_handlers(self) -> Callable[[], None]:
+        if not self.handle_signals or threading.current_thread() is not threading.main_thread():
+            return lambda: None
+
+        def _handler(signum, frame) -> None:
+            if self._stopping:  # second signal: stop waiting for the running job
+                raise KeyboardInterrupt
+            self.shutdown()
+
+        previous = {sig: signal.signal(sig, _handler) for sig in (signal.SIGINT, signal.SIGTERM)}
+
+        def _restore() -> None:
+            for sig, handler in previous.items():
+                signal.signal(sig, handler)
+
+        return _restore
+
+
+def _name_of(fn: Callable[..., object]) -> str:
+    return getattr(fn, "__name__", type(fn).__name__)
 
 
 def delay_then(delay_seconds: float, fn: Callable[[], None]) -> None:
-    if delay_seconds > 0:
-        time.sleep(delay_seconds)
-    fn()
-
-
-def repeat_every(interval_seconds: float, fn: Callable[[], None], *, stop_after: float | None = None) -> None:
-    start = time.time()
-    while True:
-        fn()
-        if stop_after is not None and (time.time() - start) >= stop_after:
-            break
-        time.sleep(max(0.0, interval_seconds))
+    sched = Scheduler()
+    sched.once(delay_seconds, fn)
+    sched.run()
+
+
+def repeat_every(
+    interval_seconds: float,
+    fn: Callable[[], None],
+    *,
+    stop_after: float | None = None,
+    first_delay: float = 0.0,
+    mode: str = FIXED_RATE,
+    overrun: str = "skip",
+) -> None:
+    sched = Scheduler()
+    sched.every(interval_seconds, fn, mode=mode, overrun=overrun, first_delay=first_delay)
+    sched.run(stop_after=stop_after)
@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+=================================================================== 
+Project: Instagram Bot – Automate Instagram Messages 
+File: testing/__init__.py 
+Author: Mobin Yousefi (GitHub: github.com/mobinyousefi) 
+Created: 2026-10-18 
+Updated: 2026-10-18 
+License: MIT License (see LICENSE file for details)
+=================================================================== 
+
+Description: 
+Test and benchmark helpers that never touch the real Instagram.
+
+Usage: 
+from instagram_bot.testing.site import FixtureSite
+
+Notes: 
+- Not imported by the bot itself; safe to ignore in production.
+
+===================================================================
+"""
+from __future__ import annotations
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+=================================================================== 
+Project: Instagram Bot – Automate Instagram Messages 
+File: testing/bench.py 
+Author: Mobin Yousefi (GitHub: github.com/mobinyousefi) 
+Created: 2026-10-18 
+Updated: 2026-10-18 
+License: MIT License (see LICENSE file for details)
+=================================================================== 
+
+Description: 
+Per-phase latency benchmark of the login and DM pipeline against the
+offline fixture site, with p50/p95/p99 reporting, JSON output and
+baseline comparison.
+
+Usage: 
+python -m instagram_bot.testing.bench --iterations 10 --out bench.json
+python -m instagram_bot.testing.bench --baseline bench.json --threshold 0.2
+
+Notes: 
+- Needs a local Chrome; no network access is used.
+- Exit status 1 means at least one phase regressed past the threshold.
+
+===================================================================
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import platform
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+# Pipeline phases in execution order
+PHASES = (
+    "make_driver",
+    "cookie_restore",
+    "session_validation",
+    "thread_open",
+    "text_entry",
+    "send_confirm",
+)
+
+STATS = ("p50", "p95", "p99")
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Linear-interpolated percentile (``q`` in 0..100) of ``values``."""
+    if not values:
+        return math.nan
+    ordered = sorted(values)
+    pos = (len(ordered) - 1) * q / 100.0
+    lo = math.floor(pos)
+    hi = math.ceil(pos)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+
+def summarize(samples: Dict[str, List[float]]) -> Dict[str, Dict[str, float]]:
+    return {
+        name: {
+            "n": len(vals),
+            "mean": sum(vals) / len(vals) if vals else math.nan,
+            "max": max(vals) if vals else math.nan,
+            **{s: percentile(vals, float(s[1:])) for s in STATS},
+        }
+        for name, vals in samples.items()
+    }
+
+
+def compare(
+    current: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    threshold: float,
+    stat: str = "p95",
+) -> List[str]:
+    """Return one message per phase whose ``stat`` grew more than ``threshold`` (a fraction)."""
+    regressions = []
+    for name, base in baseline.items():
+        cur = current.get(name)
+        if cur is None or not base.get(stat) or math.isnan(cur.get(stat, math.nan)):
+            continue
+        limit = base[stat] * (1.0 + threshold)
+        if cur[stat] > limit:
+            regressions.append(
+                f"{name}: {stat} {cur[stat] * 1000:.1f} ms > {limit * 1000:.1f} ms "
+                f"(baseline {base[stat] * 1000:.1f} ms + {threshold:.0%})"
+            )
+    return regressions
+
+
+class PhaseTimer:
+    """Collects wall-clock samples per phase."""
+
+    def __init__(self) -> None:
+        self.samples: Dict[str, List[float]] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.samples.setdefault(name, []).append(time.perf_counter() - start)
+
+
+def run_pipeline(
+    iterations: int,
+    *,
+    typing: str = "keys",
+    reuse_threads: bool = False,
+    latency: float = 0.0,
+    headless: bool = True,
+    blocking: str = "safe",
+) -> Dict[str, List[float]]:
+    """Run the pipeline ``iterations`` times, one fresh driver each, and return raw samples."""
+    from ..auth import _restore_cookies, _session_valid, login_and_persist
+    from ..automation.driver import make_driver
+    from ..config import Settings
+    from ..messaging import _open_dm_thread, _submit, _type_text
+    from ..retry import RetryPolicy
+    from ..thread_index import ThreadIndex
+    from .site import ROUTES, FixtureSite, SiteConfig
+
+    timer = PhaseTimer()
+    site_cfg = SiteConfig(latency={r: latency for r in ROUTES} if latency else {})
+    with FixtureSite(site_cfg) as site, tempfile.TemporaryDirectory() as tmp:
+        cfg = Settings(
+            username=site_cfg.username,
+            password=site_cfg.password,
+            base_url=site.base_url,
+            headless=headless,
+            cookie_path=Path(tmp) / "session.json",
+        )
+        index = ThreadIndex(Path(tmp) / "threads.json") if reuse_threads else None
+        users = site_cfg.users
+
+        # Warm-up: one real login produces the cookie file every iteration restores
+        driver = make_driver(headless=headless, blocking=blocking)
+        try:
+            login_and_persist(driver, cfg)
+        finally:
+            driver.quit()
+
+        for i in range(iterations):
+            with timer.phase("make_driver"):
+                driver = make_driver(headless=headless, blocking=blocking)
+            try:
+                with timer.phase("cookie_restore"):
+                    _restore_cookies(driver, cfg.base_url, cfg.cookie_path)
+                with timer.phase("session_validation"):
+                    if not _session_valid(driver, cfg.base_url):
+                        raise RuntimeError("Restored session was rejected by the fixture site.")
+                with timer.phase("thread_open"):
+                    page = _open_dm_thread(driver, cfg.base_url, users[i % len(users)], index)
+                with timer.phase("text_entry"):
+                    _type_text(page, f"Benchmark message #{i}", 0.0, 0.0, typing)
+                with timer.phase("send_confirm"):
+                    _submit(page, RetryPolicy(transient=0), cfg.send_confirm_timeout)
+            finally:
+                driver.quit()
+    return timer.samples
+
+
+def _parse_args(argv: List[str]) -> argparse.Namespace:
+    p = argparse.ArgumentParser(prog="instagram-bot-bench")
+    p.add_argument("--iterations", type=int, default=5)
+    p.add_argument("--typing", choices=("keys", "insert"), default="keys")
+    p.add_argument("--reuse-threads", action="store_true", help="Open threads via the index")
+    p.add_argument("--latency", type=float, default=0.0, help="Fixture latency per request (s)")
+    p.add_argument("--headed", action="store_true", help="Show the browser")
+    p.add_argument(
+        "--block-profile",
+        choices=("off", "safe", "strict"),
+        default="safe",
+        help="Resources the browser does not load",
+    )
+    p.add_argument("--out", type=Path, help="Write the JSON report here")
+    p.add_argument("--baseline", type=Path, help="Compare against a saved JSON report")
+    p.add_argument("--threshold", type=float, default=0.2, help="Allowed growth (0.2 = +20%%)")
+    p.add_argument("--stat", choices=STATS, default="p95", help="Statistic compared to baseline")
+    return p.parse_args(argv)
+
+
+def main(argv: List[str] | None = None) -> int:
+    ns = _parse_args(sys.argv[1:] if argv is None else argv)
+    samples = run_pipeline(
+        ns.iterations,
+        typing=ns.typing,
+        reuse_threads=ns.reuse_threads,
+        latency=ns.latency,
+        headless=not ns.headed,
+        blocking=ns.block_profile,
+    )
+    phases = summarize({name: samples.get(name, []) for name in PHASES})
+    report = {
+        "meta": {
+            "iterations": ns.iterations,
+            "typing": ns.typing,
+            "reuse_threads": ns.reuse_threads,
+            "latency": ns.latency,
+            "block_profile": ns.block_profile,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.time(),
+        },
+        "phases": phases,
+    }
+
+    print(f"{'phase':<20}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, st in phases.items():
+        print(f"{name:<20}" + "".join(f"{st[s] * 1000:>10.1f}" for s in STATS))
+
+    if ns.out:
+        ns.out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    if ns.baseline:
+        baseline = json.loads(ns.baseline.read_text(encoding="utf-8"))["phases"]
+        regressions = compare(phases, baseline, ns.threshold, ns.stat)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
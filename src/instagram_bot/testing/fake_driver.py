@@ -0,0 +1,689 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+=================================================================== 
+Project: Instagram Bot – Automate Instagram Messages 
+File: testing/fake_driver.py 
+Author: Mobin Yousefi (GitHub: github.com/mobinyousefi) 
+Created: 2026-10-18 
+Updated: 2026-10-18 
+License: MIT License (see LICENSE file for details)
+=================================================================== 
+
+Description: 
+In-process stand-in for the part of the Selenium WebDriver API that auth,
+messaging and pages use, running on a virtual clock. Pages are scripted
+as "selector name -> element" states, so the real selectors, waits and
+page objects run unchanged, and every command is recorded as a trace
+that ReplayDriver can check a later run against.
+
+Usage: 
+clock = VirtualClock()
+driver = FakeDriver(clock)
+site = FakeInstagram(driver, latency=0.3)
+with clock.patch():
+    send_dm(driver, site.base_url, "alice", "hi")
+assert site.sent == [("alice", "hi")] and driver.counts()["find_elements"] < 40
+
+Notes: 
+- clock.patch() replaces time.sleep/monotonic/time/perf_counter for the
+  duration of the block (WebDriverWait included); it is not thread-safe.
+- Seed `random` before recording a trace that has typing delays in it.
+- Traces are JSON lines: {"t", "cmd", "args", "result" | "error"};
+  elements appear as {"element": id}.
+
+===================================================================
+"""
+from __future__ import annotations
+
+import abc
+import heapq
+import itertools
+import json
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from selenium.common import exceptions as selenium_errors
+
+from ..utils import selectors as sel
+
+ENTER = "\ue007"  # selenium Keys.ENTER
+
+Handler = Callable[["FakeDriver", str], None]
+
+
+class VirtualClock:
+    """Time that only moves when someone sleeps or advances it; timers fire on the way."""
+
+    def __init__(self, epoch: float | None = None) -> None:
+        self.now = 0.0
+        self._epoch = time.time() if epoch is None else epoch
+        self._timers: List[Tuple[float, int, Callable[[], None]]] = []
+        self._seq = itertools.count()
+        self.slept = 0.0
+        self.listeners: List[Callable[[float], None]] = []  # called with each sleep()
+
+    def monotonic(self) -> float:
+        return self.now
+
+    perf_counter = monotonic
+
+    def time(self) -> float:
+        return self._epoch + self.now
+
+    def sleep(self, seconds: float) -> None:
+        for listener in self.listeners:
+            listener(seconds)
+        self.slept += max(0.0, seconds)
+        self.advance(seconds)
+
+    def advance(self, seconds: float) -> None:
+        target = self.now + max(0.0, seconds)
+        while self._timers and self._timers[0][0] <= target:
+            at, _, fn = heapq.heappop(self._timers)
+            self.now = max(self.now, at)
+            fn()
+        self.now = target
+
+    def call_later(self, delay: float, fn: Callable[[], None]) -> None:
+        heapq.heappush(self._timers, (self.now + max(0.0, delay), next(self._seq), fn))
+
+    @contextmanager
+    def patch(self) -> Iterator["VirtualClock"]:
+        names = ("sleep", "monotonic", "time", "perf_counter")
+        saved = {name: getattr(time, name) for name in names}
+        for name in names:
+            setattr(time, name, getattr(self, name))
+        try:
+            yield self
+        finally:
+            for name, fn in saved.items():
+                setattr(time, name, fn)
+
+
+class TraceMismatch(AssertionError):
+    """A replayed run issued a command the recorded trace does not have at that point."""
+
+
+# -- command surface shared by the fake and the replaying driver ----------------
+class _Element:
+    def __init__(self) -> None:
+        self._driver: Any = None
+        self.id = ""
+
+    def click(self) -> None:
+        self._driver._execute("click", self)
+
+    def clear(self) -> None:
+        self._driver._execute("clear", self)
+
+    def send_keys(self, *value: str) -> None:
+        self._driver._execute("send_keys", self, "".join(value))
+
+    def is_displayed(self) -> bool:
+        return self._driver._execute("is_displayed", self)
+
+    def is_enabled(self) -> bool:
+        return self._driver._execute("is_enabled", self)
+
+    def get_attribute(self, name: str) -> Optional[str]:
+        return self._driver._execute("get_attribute", self, name)
+
+    @property
+    def text(self) -> str:
+        return self._driver._execute("text", self)
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} {self.id}>"
+
+
+class _Driver(abc.ABC):
+    """The WebDriver surface the bot uses, as commands for ``_execute``."""
+
+    @abc.abstractmethod
+    def _execute(self, cmd: str, *args: Any) -> Any:
+        """Run one driver command and return its result."""
+
+    def get(self, url: str) -> None:
+        self._execute("get", url)
+
+    def refresh(self) -> None:
+        self._execute("refresh")
+
+    @property
+    def current_url(self) -> str:
+        return self._execute("current_url")
+
+    @property
+    def title(self) -> str:
+        return self._execute("title")
+
+    def find_element(self, by: str, value: str) -> _Element:
+        return self._execute("find_element", by, value)
+
+    def find_elements(self, by: str, value: str) -> List[_Element]:
+        return self._execute("find_elements", by, value)
+
+    def get_cookies(self) -> List[dict]:
+        return self._execute("get_cookies")
+
+    def get_cookie(self, name: str) -> Optional[dict]:
+        return self._execute("get_cookie", name)
+
+    def add_cookie(self, cookie: dict) -> None:
+        self._execute("add_cookie", cookie)
+
+    def delete_all_cookies(self) -> None:
+        self._execute("delete_all_cookies")
+
+    def execute_cdp_cmd(self, cmd: str, params: dict) -> dict:
+        return self._execute("execute_cdp_cmd", cmd, params)
+
+    def execute_script(self, script: str, *args: Any) -> Any:
+        return self._execute("execute_script", script, *args)
+
+    def quit(self) -> None:
+        self._execute("quit")
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, _Element):
+        return {"element": value.id}
+    if isinstance(value, (list, tuple)):
+        return [_encode(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _encode(v) for k, v in value.items()}
+    return value
+
+
+# -- scripted fake --------------------------------------------------------------
+class FakeElement(_Element):
+    """An element on a scripted page; ``params`` fill templated selectors (e.g. username)."""
+
+    def __init__(
+        self,
+        tag: str = "div",
+        text: str = "",
+        *,
+        value: str = "",
+        displayed: bool = True,
+        enabled: bool = True,
+        on_click: Optional[Callable[["FakeElement"], None]] = None,
+        on_keys: Optional[Callable[["FakeElement", str], None]] = None,
+        params: Optional[Dict[str, str]] = None,
+        attrs: Optional[Dict[str, str]] = None,
+    ) -> None:
+        super().__init__()
+        self.tag = tag
+        self.content = text
+        self.value = value
+        self.displayed = displayed
+        self.enabled = enabled
+        self.on_click = on_click
+        self.on_keys = on_keys
+        self.params = params or {}
+        self.attrs = attrs or {}
+        self.stale = False
+
+
+class FakeDriver(_Driver):
+    """WebDriver stand-in whose pages are set by route handlers (see show/add/route)."""
+
+    def __init__(
+        self,
+        clock: VirtualClock | None = None,
+        *,
+        latency: float = 0.0,
+        command_latency: float = 0.0,
+    ) -> None:
+        self.clock = clock or VirtualClock()
+        self.latency = latency  # per get(), before the new page is shown
+        self.command_latency = command_latency  # per command: the chromedriver round-trip
+        self.url = "about:blank"
+        self.page_title = ""
+        self.cookies: Dict[str, dict] = {}
+        self.focused: FakeElement | None = None
+        self.cdp: Dict[str, Callable[[dict], Any]] = {}  # CDP method -> handler
+        self.scripts: List[Tuple[str, Callable[..., Any]]] = []  # script substring -> handler
+        self.trace: List[Dict[str, Any]] = []
+        self.quit_called = False
+        self._page: List[Tuple[str, FakeElement]] = []
+        self._routes: List[Tuple[str, Handler]] = []
+        self._ids = itertools.count(1)
+        self.command_executor = _FakeExecutor(self)
+        self.clock.listeners.append(self._record_sleep)
+
+    # -- scripting ---------------------------------------------------------------
+    def route(self, path_prefix: str, handler: Handler) -> None:
+        """``handler(driver, url)`` renders gets whose path starts with ``path_prefix``."""
+        self._routes.append((path_prefix, handler))
+        self._routes.sort(key=lambda r: -len(r[0]))  # longest prefix wins
+
+    def show(self, url: str, title: str = "", **elements: FakeElement | List[FakeElement]) -> None:
+        """Replace the page: the old elements go stale, ``elements`` are keyed by selector name."""
+        for _, el in self._page:
+            el.stale = True
+        self._page = []
+        self.url, self.page_title = url, title
+        self.focused = None
+        for name, els in elements.items():
+            self.add(name, *(els if isinstance(els, list) else [els]))
+
+    def add(self, name: str, *elements: FakeElement) -> None:
+        """Put ``elements`` on the page as matches of selector ``name`` (e.g. "DM_TEXTBOX")."""
+        getattr(sel, name)  # fail early on a typo
+        for el in elements:
+            el._driver, el.id, el.stale = self, el.id or f"e{next(self._ids)}", False
+            self._page.append((name, el))
+
+    def remove(self, name: str) -> None:
+        for _, el in [entry for entry in self._page if entry[0] == name]:
+            el.stale = True
+        self._page = [entry for entry in self._page if entry[0] != name]
+
+    def elements(self, name: str) -> List[FakeElement]:
+        return [el for n, el in self._page if n == name]
+
+    def counts(self) -> Dict[str, int]:
+        """Commands issued so far by type ("sleep" included)."""
+        out: Dict[str, int] = {}
+        for entry in self.trace:
+            out[entry["cmd"]] = out.get(entry["cmd"], 0) + 1
+        return out
+
+    # -- command execution -------------------------------------------------------
+    def _execute(self, cmd: str, *args: Any) -> Any:
+        # Through command_executor, like selenium's WebDriver.execute, so it can be wrapped
+        return self.command_executor.execute(cmd, {"args": args})
+
+    def _run(self, cmd: str, args: Tuple[Any, ...]) -> Any:
+        entry: Dict[str, Any] = {"t": round(self.clock.now, 6), "cmd": cmd, "args": _encode(args)}
+        self.trace.append(entry)
+        if self.command_latency:
+            self.clock.advance(self.command_latency)
+        try:
+            result = getattr(self, f"_do_{cmd}")(*args)
+        except Exception as e:
+            entry["error"] = type(e).__name__
+            raise
+        entry["result"] = _encode(result)
+        return result
+
+    def _record_sleep(self, seconds: float) -> None:
+        self.trace.append({"t": round(self.clock.now, 6), "cmd": "sleep", "args": [seconds]})
+
+    def _do_get(self, url: str) -> None:
+        self.clock.advance(self.latency)
+        path = urlparse(url).path or "/"
+        for prefix, handler in self._routes:
+            if path.startswith(prefix):
+                handler(self, url)
+                return
+        self.show(url)
+
+    def _do_refresh(self) -> None:
+        self._do_get(self.url)
+
+    def _do_current_url(self) -> str:
+        return self.url
+
+    def _do_title(self) -> str:
+        return self.page_title
+
+    def _do_find_elements(self, by: str, value: str) -> List[FakeElement]:
+        found = []
+        for name, el in self._page:
+            for alt_by, template in getattr(sel, name).alternatives:
+                if el.params:
+                    template = template.format(**el.params)
+                if alt_by == by and template == value:
+                    found.append(el)
+                    break
+        return found
+
+    def _do_find_element(self, by: str, value: str) -> FakeElement:
+        found = self._do_find_elements(by, value)
+        if not found:
+            raise selenium_errors.NoSuchElementException(f"{by}={value}")
+        return found[0]
+
+    def _live(self, el: FakeElement) -> FakeElement:
+        if el.stale:
+            raise selenium_errors.StaleElementReferenceException(f"{el.id} is gone")
+        return el
+
+    def _do_click(self, el: FakeElement) -> None:
+        self.focused = self._live(el)
+        if el.enabled and el.on_click:  # a disabled button swallows the click
+            el.on_click(el)
+
+    def _do_clear(self, el: FakeElement) -> None:
+        self._live(el).value = ""
+
+    def _do_send_keys(self, el: FakeElement, text: str) -> None:
+        self.focused = self._live(el)
+        el.value += text.replace(ENTER, "")
+        if el.on_keys:
+            el.on_keys(el, text)
+
+    def _do_is_displayed(self, el: FakeElement) -> bool:
+        return self._live(el).displayed
+
+    def _do_is_enabled(self, el: FakeElement) -> bool:
+        return self._live(el).enabled
+
+    def _do_get_attribute(self, el: FakeElement, name: str) -> Optional[str]:
+        self._live(el)
+        if name == "value" and el.tag in ("input", "textarea"):
+            return el.value
+        return el.attrs.get(name)
+
+    def _do_text(self, el: FakeElement) -> str:
+        return self._live(el).content if el.tag not in ("input", "textarea") else ""
+
+    def _do_get_cookies(self) -> List[dict]:
+        return [dict(c) for c in self.cookies.values()]
+
+    def _do_get_cookie(self, name: str) -> Optional[dict]:
+        c = self.cookies.get(name)
+        return dict(c) if c else None
+
+    def _do_add_cookie(self, cookie: dict) -> None:
+        if self.url == "about:blank":
+            raise selenium_errors.InvalidCookieDomainException("no document to set cookies on")
+        self.cookies[cookie["name"]] = dict(cookie)
+
+    def _do_delete_all_cookies(self) -> None:
+        self.cookies.clear()
+
+    def _do_execute_cdp_cmd(self, cmd: str, params: dict) -> dict:
+        if cmd in self.cdp:
+            return self.cdp[cmd](params)
+        if cmd == "Network.setCookies":
+            for c in params.get("cookies", []):
+                cookie = {k: v for k, v in c.items() if k != "url"}
+                if "expires" in cookie:
+                    cookie["expiry"] = cookie.pop("expires")
+                self.cookies[c["name"]] = cookie
+        elif cmd == "Network.getAllCookies":
+            return {"cookies": self._do_get_cookies()}
+        elif cmd == "Input.insertText":
+            if self.focused is not None and not self.focused.stale:
+                self.focused.value += params.get("text", "")
+                if self.focused.on_keys:
+                    self.focused.on_keys(self.focused, params.get("text", ""))
+        return {}
+
+    def _do_execute_script(self, script: str, *args: Any) -> Any:
+        for needle, handler in self.scripts:
+            if needle in script:
+                return handler(*args)
+        return None
+
+    def _do_quit(self) -> None:
+        self.quit_called = True
+
+
+class _FakeExecutor:
+    """Stands where selenium's RemoteConnection would: one execute() per command."""
+
+    def __init__(self, driver: FakeDriver) -> None:
+        self._driver = driver
+
+    def execute(self, command: str, params: Dict[str, Any]) -> Any:
+        return self._driver._run(command, params["args"])
+
+
+class FakeInstagram:
+    """Scripted login form, compose dialog and threads on a FakeDriver.
+
+    ``latency`` delays each page, ``search_latency`` the compose results,
+    ``send_latency`` the bubble after a send and ``dismiss_latency`` the
+    close of the post-login dialog; all in virtual seconds. ``flash_not_found``
+    shows "No account found." until the search results arrive.
+    """
+
+    base_url = "https://ig.test"
+
+    def __init__(
+        self,
+        driver: FakeDriver,
+        users: Tuple[str, ...] = ("alice", "bob", "carol"),
+        *,
+        username: str = "tester",
+        password: str = "secret",
+        latency: float = 0.0,
+        search_latency: float = 0.3,
+        send_latency: float = 0.2,
+        dismiss_latency: float = 0.0,
+        drop_sends: int = 0,
+        blocked: bool = False,
+        flash_not_found: bool = False,
+    ) -> None:
+        self.driver = driver
+        self.users = users
+        self.username, self.password = username, password
+        self.search_latency, self.send_latency = search_latency, send_latency
+        self.dismiss_latency = dismiss_latency
+        self.drop_sends = drop_sends
+        self.blocked = blocked
+        self.flash_not_found = flash_not_found
+        self.sent: List[Tuple[str, str]] = []
+        self.threads: Dict[str, str] = {}  # thread id -> username
+        self._session = "s3ss10n"
+        driver.latency = latency
+        driver.route("/accounts/login/", self._login)
+        driver.route("/challenge/", lambda d, url: d.show(url, "Confirm it's you"))
+        driver.route("/direct/inbox/", self._authed(lambda d, url: d.show(url, "Inbox")))
+        driver.scripts.append(("img[alt]", self._inbox_links))
+        driver.route("/direct/new/", self._authed(self._compose))
+        driver.route("/direct/t/", self._authed(self._thread))
+        driver.route("/", self._authed(lambda d, url: d.show(url, "Instagram")))
+
+    def log_in(self) -> None:
+        """Start from a logged-in browser, as after a cookie restore."""
+        self.driver.cookies["sessionid"] = {
+            "name": "sessionid",
+            "value": self._session,
+            "domain": ".ig.test",
+            "path": "/",
+        }
+
+    def logged_in(self) -> bool:
+        return self.driver.cookies.get("sessionid", {}).get("value") == self._session
+
+    def _authed(self, handler: Handler) -> Handler:
+        def guarded(d: FakeDriver, url: str) -> None:
+            if self.logged_in():
+                handler(d, url)
+            else:
+                self._login(d, f"{self.base_url}/accounts/login/?next={urlparse(url).path}")
+
+        return guarded
+
+    def _login(self, d: FakeDriver, url: str) -> None:
+        fields = {
+            "USERNAME_INPUT": FakeElement("input"),
+            "PASSWORD_INPUT": FakeElement("input"),
+        }
+
+        def submit(_: FakeElement) -> None:
+            if (fields["USERNAME_INPUT"].value, fields["PASSWORD_INPUT"].value) != (
+                self.username,
+                self.password,
+            ):
+                d.add("LOGIN_ERROR", FakeElement(text="Sorry, your password was incorrect."))
+                return
+            self.log_in()
+            d.show(
+                f"{self.base_url}/accounts/onetap/",
+                "Instagram",
+                NOT_NOW=FakeElement("button", on_click=lambda _: self._dismiss(d)),
+            )
+
+        button = FakeElement("button", on_click=submit)
+        d.show(url, "Login • Instagram", **fields, LOGIN_BUTTON=button)
+
+    def _inbox_links(self, xpath: str) -> List[List[str]]:
+        # What thread_index's inbox script reads off /direct/inbox/: [href, avatar alt]
+        if urlparse(self.driver.url).path != "/direct/inbox/":
+            return []
+        return [
+            [f"{self.base_url}/direct/t/{tid}/", f"{user}'s profile picture"]
+            for tid, user in self.threads.items()
+        ]
+
+    def _dismiss(self, d: FakeDriver) -> None:
+        home = lambda: d.show(f"{self.base_url}/")  # noqa: E731
+        if self.dismiss_latency:
+            d.clock.call_later(self.dismiss_latency, home)
+        else:
+            home()
+
+    def _compose(self, d: FakeDriver, url: str) -> None:
+        next_button = FakeElement("button", enabled=False)
+
+        def pick(row: FakeElement) -> None:
+            next_button.enabled = True
+            next_button.on_click = lambda _: self._open(row.params["username"])
+
+        def results(box: FakeElement, _: str) -> None:
+            d.remove("RECIPIENT_EXACT")
+            d.remove("RECIPIENT_NONE")
+            query = box.value.strip().lstrip("@").lower()
+            if self.flash_not_found:
+                d.add("RECIPIENT_NONE", FakeElement(text="No account found."))
+
+            def show_results() -> None:
+                if box.stale or box.value.strip().lstrip("@").lower() != query:
+                    return  # typed on or navigated away meanwhile
+                d.remove("RECIPIENT_NONE")
+                matches = [u for u in self.users if query and u.startswith(query)]
+                if not matches:
+                    d.add("RECIPIENT_NONE", FakeElement(text="No account found."))
+                for user in matches:
+                    d.add("RECIPIENT_EXACT", FakeElement(params={"username": user}, on_click=pick))
+
+            d.clock.call_later(self.search_latency, show_results)
+
+        d.show(
+            url,
+            "New message • Direct",
+            RECIPIENT_INPUT=FakeElement("input", on_keys=results),
+            NEXT_BUTTON=next_button,
+        )
+
+    def _open(self, username: str) -> None:
+        tid = next((t for t, u in self.threads.items() if u == username), None)
+        if tid is None:
+            tid = str(340282366841710300 + len(self.threads))
+            self.threads[tid] = username
+        self._thread(self.driver, f"{self.base_url}/direct/t/{tid}/")
+
+    def _thread(self, d: FakeDriver, url: str) -> None:
+        tid = urlparse(url).path[len("/direct/t/"):].strip("/")
+        user = self.threads.get(tid)
+        if user is None:
+            d.show(f"{self.base_url}/direct/inbox/", "Inbox")
+            return
+        box = FakeElement("textarea")
+
+        def send(_: FakeElement) -> None:
+            text = box.value.strip()
+            if not text:
+                return
+            if self.blocked:
+                d.add("ACTION_BLOCKED", FakeElement(text="Try Again Later"))
+                return
+            if self.drop_sends > 0:
+                self.drop_sends -= 1
+                return
+
+            def land() -> None:
+                self.sent.append((user, text))
+                box.value = ""
+                d.add("MESSAGE_ROW", FakeElement(text=text))
+
+            d.clock.call_later(self.send_latency, land)
+
+        box.on_keys = lambda el, keys: send(el) if ENTER in keys else None
+        rows = [FakeElement(text=t) for u, t in self.sent if u == user]
+        d.show(
+            url,
+            f"{user} • Direct",
+            THREAD_PEER=FakeElement("a", user, params={"username": user}),
+            DM_TEXTBOX=box,
+            SEND_BUTTON=FakeElement("button", on_click=send),
+            MESSAGE_ROW=rows,
+        )
+
+
+# -- replay ----------------------------------------------------------------------
+class _ReplayElement(_Element):
+    def __init__(self, driver: "ReplayDriver", element_id: str) -> None:
+        super().__init__()
+        self._driver, self.id = driver, element_id
+
+
+class ReplayDriver(_Driver):
+    """Answers each command from a recorded trace and fails on the first divergence.
+
+    Sleeps are part of the trace, so a change that adds a sleep, a wait poll
+    or a round-trip raises TraceMismatch at the point where it happens.
+    """
+
+    def __init__(self, trace: List[Dict[str, Any]], clock: VirtualClock | None = None) -> None:
+        self.clock = clock or VirtualClock()
+        self._trace = trace
+        self._pos = 0
+        self._elements: Dict[str, _ReplayElement] = {}
+        self.clock.listeners.append(lambda seconds: self._next("sleep", [seconds]))
+
+    def done(self) -> bool:
+        return self._pos == len(self._trace)
+
+    def _next(self, cmd: str, args: Any) -> Dict[str, Any]:
+        if self._pos >= len(self._trace):
+            raise TraceMismatch(f"command {self._pos} ({cmd} {args!r}) is past the trace's end")
+        entry = self._trace[self._pos]
+        if entry["cmd"] != cmd or json.loads(json.dumps(args)) != entry["args"]:
+            raise TraceMismatch(
+                f"command {self._pos}: expected {entry['cmd']} {entry['args']!r}, "
+                f"got {cmd} {args!r}"
+            )
+        self._pos += 1
+        return entry
+
+    def _execute(self, cmd: str, *args: Any) -> Any:
+        entry = self._next(cmd, _encode(args))
+        self.clock.advance(max(0.0, entry["t"] - self.clock.now))
+        if "error" in entry:
+            exc = getattr(selenium_errors, entry["error"], None)
+            raise (exc or RuntimeError)(f"replayed {entry['error']}")
+        return self._decode(entry.get("result"))
+
+    def _decode(self, value: Any) -> Any:
+        if isinstance(value, dict) and set(value) == {"element"}:
+            el_id = value["element"]
+            if el_id not in self._elements:
+                self._elements[el_id] = _ReplayElement(self, el_id)
+            return self._elements[el_id]
+        if isinstance(value, list):
+            return [self._decode(v) for v in value]
+        if isinstance(value, dict):
+            return {k: self._decode(v) for k, v in value.items()}
+        return value
+
+
+def save_trace(trace: List[Dict[str, Any]], path: Path) -> None:
+    with Path(path).open("w", encoding="utf-8") as f:
+        for entry in trace:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+def load_trace(path: Path) -> List[Dict[str, Any]]:
+    with Path(path).open(encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
@@ -0,0 +1,530 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+=================================================================== 
+Project: Instagram Bot – Automate Instagram Messages 
+File: testing/site.py 
+Author: Mobin Yousefi (GitHub: github.com/mobinyousefi) 
+Created: 2026-10-18 
+Updated: 2026-10-18 
+License: MIT License (see LICENSE file for details)
+=================================================================== 
+
+Description: 
+Offline stand-in for the parts of Instagram Web the bot drives: login
+form, cookie banner, "Not Now" dialogs, the /direct/new/ compose dialog,
+/direct/t/<id>/ threads and a challenge page. Pages follow the DOM
+contract in utils/selectors.py so the real code paths run unchanged.
+
+Usage: 
+with FixtureSite(SiteConfig(latency={"thread": 0.2})) as site:
+    cfg = Settings(username="tester", password="secret", base_url=site.base_url)
+python -m instagram_bot.testing.site --port 8000
+
+Notes: 
+- Standard library only; one ThreadingHTTPServer on 127.0.0.1.
+- Latencies are per route (see ROUTES) and applied before responding.
+- Every page pulls an image, a font and a video from /static/, like the
+  real one; FixtureSite.static lists what the browser actually fetched.
+
+===================================================================
+"""
+from __future__ import annotations
+
+import argparse
+import html
+import json
+import secrets
+import threading
+import time
+from dataclasses import dataclass, field
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+# Route names accepted in SiteConfig.latency / SiteConfig.fail
+ROUTES = (
+    "home",
+    "login",
+    "onetap",
+    "challenge",
+    "inbox",
+    "compose",
+    "thread",
+    "search",
+    "send",
+    "static",
+)
+
+_SESSION_COOKIE = "sessionid"
+_BANNER_COOKIE = "ig_cb"
+
+
+@dataclass
+class SiteConfig:
+    username: str = "tester"
+    password: str = "secret"
+    users: Tuple[str, ...] = ("alice", "bob", "carol", "dave")
+    cookie_banner: bool = True
+    save_info_dialog: bool = True
+    notifications_dialog: bool = True
+    challenge: bool = False  # successful logins land on /challenge/
+    latency: Dict[str, float] = field(default_factory=dict)  # route -> seconds
+    fail: Dict[str, int] = field(default_factory=dict)  # route -> HTTP status to answer with
+    drop_sends: int = 0  # number of sends to swallow (composer keeps the text)
+
+
+@dataclass
+class SentMessage:
+    username: str
+    text: str
+    at: float
+
+
+class _State:
+    def __init__(self, cfg: SiteConfig) -> None:
+        self.cfg = cfg
+        self.lock = threading.Lock()
+        self.sessions: set[str] = set()
+        self.threads: Dict[str, str] = {}  # thread id -> username
+        self.sent: List[SentMessage] = []
+        self.hits: Dict[str, int] = {}
+        self.static: List[str] = []  # asset names, in request order
+        self._next_id = 340282366841710300
+
+    def thread_for(self, username: str) -> str:
+        with self.lock:
+            for tid, user in self.threads.items():
+                if user == username:
+                    return tid
+            self._next_id += 1
+            tid = str(self._next_id)
+            self.threads[tid] = username
+            return tid
+
+
+# The heavy parts of a real page, none of which the bot needs (see BLOCK_PROFILES)
+_STATIC = {
+    "avatar.jpg": ("image/gif", b"GIF89a\x01\x00\x01\x00\x00\x00\x00;"),
+    "font.woff2": ("font/woff2", b"wOF2" + bytes(2048)),
+    "clip.mp4": ("video/mp4", bytes(64 * 1024)),
+}
+
+_PAGE = """<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8"><title>{title}</title>
+<link rel="preload" href="/static/font.woff2" as="font" type="font/woff2" crossorigin>
+<style>div[role=dialog]{{border:1px solid #ccc;padding:8px;margin:8px}}</style>
+</head><body>{body}<img src="/static/avatar.jpg" alt="" width="1" height="1">
+<video src="/static/clip.mp4" preload="auto" muted width="1" height="1"></video>
+<script>{script}</script></body></html>"""
+
+_DISMISS_JS = """
+document.querySelectorAll('button[data-dismiss]').forEach(function (b) {
+  b.addEventListener('click', function () {
+    var go = b.getAttribute('data-dismiss');
+    if (go) { location.href = go; } else { b.closest('[role=dialog]').remove(); }
+  });
+});
+"""
+
+_BANNER_JS = """
+var cb = document.getElementById('cookie-banner');
+if (cb) cb.querySelector('button').addEventListener('click', function () {
+  document.cookie = 'ig_cb=1; path=/'; cb.remove();
+});
+"""
+
+_COMPOSE_JS = """
+var box = document.querySelector('input[name=queryBox]');
+var list = document.getElementById('results');
+var next = document.getElementById('next');
+var picked = null, timer = null;
+box.addEventListener('input', function () {
+  clearTimeout(timer);
+  timer = setTimeout(function () {
+    fetch('/api/search?q=' + encodeURIComponent(box.value)).then(function (r) { return r.json(); })
+      .then(function (users) {
+        list.innerHTML = users.length ? '' : '<div>No account found.</div>';
+        users.forEach(function (u) {
+          var row = document.createElement('div');
+          row.setAttribute('style', 'cursor: pointer;');
+          row.innerHTML = '<div>' + u + '</div><button type="button">Select</button>';
+          row.addEventListener('click', function () { picked = u; next.disabled = false; });
+          list.appendChild(row);
+        });
+      });
+  }, 150);
+});
+next.addEventListener('click', function () {
+  if (picked) location.href = '/direct/open/?u=' + encodeURIComponent(picked);
+});
+"""
+
+_THREAD_JS = """
+var box = document.querySelector('textarea');
+var rows = document.getElementById('rows');
+function send() {
+  var text = box.value;
+  if (!text) return;
+  fetch('/api/send', {method: 'POST', headers: {'Content-Type': 'application/json'},
+                      body: JSON.stringify({thread: THREAD_ID, text: text})})
+    .then(function (r) {
+      if (!r.ok) return;
+      var row = document.createElement('div');
+      row.setAttribute('role', 'row');
+      row.textContent = text;
+      rows.appendChild(row);
+      box.value = '';
+    });
+}
+box.addEventListener('keydown', function (e) {
+  if (e.key === 'Enter' && !e.shiftKey) { e.preventDefault(); send(); }
+});
+document.getElementById('send').addEventListener('click', function (e) {
+  e.preventDefault(); send();
+});
+"""
+
+
+def _not_now_dialog(title: str, go: str = "") -> str:
+    return (
+        f'<div role="dialog"><h2>{title}</h2>'
+        f'<button type="button" data-dismiss="{go}">Not Now</button></div>'
+    )
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "FixtureSite/1.0"
+    state: _State  # set on the per-site subclass
+
+    def log_message(self, fmt: str, *args) -> None:  # keep test output quiet
+        pass
+
+    # -- helpers -----------------------------------------------------------
+    def _cookies(self) -> SimpleCookie:
+        return SimpleCookie(self.headers.get("Cookie", ""))
+
+    def _logged_in(self) -> bool:
+        c = self._cookies().get(_SESSION_COOKIE)
+        return c is not None and c.value in self.state.sessions
+
+    def _enter(self, route: str) -> bool:
+        """Count the hit, apply latency; False if a failure was injected (already answered)."""
+        st = self.state
+        with st.lock:
+            st.hits[route] = st.hits.get(route, 0) + 1
+        delay = st.cfg.latency.get(route, 0.0)
+        if delay > 0:
+            time.sleep(delay)
+        status = st.cfg.fail.get(route)
+        if status:
+            self._send(status, f"Injected failure on {route}", "text/plain")
+            return False
+        return True
+
+    def _send(
+        self,
+        status: int,
+        body: str,
+        ctype: str = "text/html; charset=utf-8",
+        headers: Optional[Dict[str, str]] = None,
+    ) -> None:
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _redirect(self, location: str, headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(302)
+        self.send_header("Location", location)
+        self.send_header("Content-Length", "0")
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+
+    def _page(self, title: str, body: str, script: str = "") -> None:
+        self._send(200, _PAGE.format(title=html.escape(title), body=body, script=script))
+
+    def _require_login(self) -> bool:
+        if self._logged_in():
+            return True
+        self._redirect(f"/accounts/login/?next={self.path}")
+        return False
+
+    # -- routes ------------------------------------------------------------
+    def do_GET(self) -> None:  # noqa: N802
+        url = urlparse(self.path)
+        path = url.path
+        if path == "/":
+            self._home()
+        elif path == "/accounts/login/":
+            self._login_form()
+        elif path == "/accounts/onetap/":
+            self._onetap()
+        elif path.startswith("/challenge/"):
+            if self._enter("challenge"):
+                self._page("Confirm it's you", "<main><h1>Help us confirm it's you</h1></main>")
+        elif path == "/direct/inbox/":
+            self._inbox()
+        elif path == "/direct/new/":
+            self._compose()
+        elif path == "/direct/open/":
+            self._open(parse_qs(url.query).get("u", [""])[0])
+        elif path.startswith("/direct/t/"):
+            self._thread(path[len("/direct/t/"):].strip("/"))
+        elif path == "/api/search":
+            self._search(parse_qs(url.query).get("q", [""])[0])
+        elif path.startswith("/static/"):
+            self._static(path[len("/static/"):])
+        else:
+            self._send(404, "<h1>Page not found</h1>")
+
+    def do_POST(self) -> None:  # noqa: N802
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length).decode("utf-8") if length else ""
+        path = urlparse(self.path).path
+        if path == "/accounts/login/":
+            self._login_submit(parse_qs(raw))
+        elif path == "/api/send":
+            self._api_send(raw)
+        else:
+            self._send(404, "not found", "text/plain")
+
+    def _home(self) -> None:
+        if not self._enter("home") or not self._require_login():
+            return
+        dialog = ""
+        if self.state.cfg.notifications_dialog:
+            dialog = _not_now_dialog("Turn on Notifications")
+        self._page("Instagram", f"<main><h1>Feed</h1></main>{dialog}", _DISMISS_JS)
+
+    def _login_form(self, error: str = "") -> None:
+        if not self._enter("login"):
+            return
+        banner = ""
+        if self.state.cfg.cookie_banner and _BANNER_COOKIE not in self._cookies():
+            banner = (
+                '<div id="cookie-banner" role="dialog"><p>Allow the use of cookies?</p>'
+                '<button type="button">Allow all cookies</button></div>'
+            )
+        alert = f'<p id="slfErrorAlert" role="alert">{html.escape(error)}</p>' if error else ""
+        form = (
+            '<form method="post" action="/accounts/login/">'
+            '<input name="username" type="text" aria-label="Username">'
+            '<input name="password" type="password" aria-label="Password">'
+            '<button type="submit"><div>Log in</div></button>'
+            f"</form>{alert}"
+        )
+        self._page("Login • Instagram", f"{banner}<main>{form}</main>", _BANNER_JS)
+
+    def _login_submit(self, form: Dict[str, List[str]]) -> None:
+        cfg = self.state.cfg
+        user = form.get("username", [""])[0]
+        password = form.get("password", [""])[0]
+        if user != cfg.username or password != cfg.password:
+            self._login_form(error="Sorry, your password was incorrect.")
+            return
+        if not self._enter("login"):
+            return
+        if cfg.challenge:
+            self._redirect("/challenge/action/")
+            return
+        token = secrets.token_hex(16)
+        with self.state.lock:
+            self.state.sessions.add(token)
+        cookie = f"{_SESSION_COOKIE}={token}; Path=/; Max-Age=31536000; HttpOnly"
+        go = "/accounts/onetap/" if cfg.save_info_dialog else "/"
+        self._redirect(go, {"Set-Cookie": cookie})
+
+    def _onetap(self) -> None:
+        if not self._enter("onetap") or not self._require_login():
+            return
+        self._page(
+            "Instagram", _not_now_dialog("Save your login info?", go="/"), _DISMISS_JS
+        )
+
+    def _inbox(self) -> None:
+        if not self._enter("inbox") or not self._require_login():
+            return
+        with self.state.lock:
+            threads = list(self.state.threads.items())
+        links = "".join(
+            f'<a href="/direct/t/{tid}/"><img alt="{html.escape(user)}\'s profile picture">'
+            f"<span>{html.escape(user)}</span><span>Active now</span></a>"
+            for tid, user in threads
+        )
+        self._page("Inbox • Direct", f'<main role="main"><h1>Messages</h1>{links}</main>')
+
+    def _compose(self) -> None:
+        if not self._enter("compose") or not self._require_login():
+            return
+        body = (
+            '<div role="dialog"><h2>New message</h2>'
+            '<input name="queryBox" placeholder="Search..." autocomplete="off">'
+            '<div id="results"></div>'
+            '<button id="next" type="button" disabled><div>Next</div></button></div>'
+        )
+        self._page("New message • Direct", body, _COMPOSE_JS)
+
+    def _search(self, q: str) -> None:
+        if not self._enter("search"):
+            return
+        q = q.strip().lstrip("@").lower()
+        users = [u for u in self.state.cfg.users if q and u.startswith(q)]
+        self._send(200, json.dumps(users), "application/json")
+
+    def _static(self, name: str) -> None:
+        if not self._enter("static"):
+            return
+        with self.state.lock:
+            self.state.static.append(name)
+        ctype, data = _STATIC.get(name, ("text/plain", b""))
+        self.send_response(200 if data else 404)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _open(self, username: str) -> None:
+        if not self._require_login():
+            return
+        if username not in self.state.cfg.users:
+            self._redirect("/direct/inbox/")
+            return
+        self._redirect(f"/direct/t/{self.state.thread_for(username)}/")
+
+    def _thread(self, tid: str) -> None:
+        if not self._enter("thread") or not self._require_login():
+            return
+        with self.state.lock:
+            user = self.state.threads.get(tid)
+            rows = [m.text for m in self.state.sent if m.username == user]
+        if user is None:
+            self._redirect("/direct/inbox/")
+            return
+        bubbles = "".join(f'<div role="row">{html.escape(t)}</div>' for t in rows)
+        body = (
+            f'<div role="main"><header><a href="/{html.escape(user)}/">{html.escape(user)}</a>'
+            "</header>"
+            f'<div id="rows">{bubbles}</div>'
+            '<form><textarea placeholder="Message..."></textarea>'
+            '<button id="send" type="submit">Send</button></form></div>'
+        )
+        self._page(f"{user} • Direct", body, f"var THREAD_ID = {json.dumps(tid)};{_THREAD_JS}")
+
+    def _api_send(self, raw: str) -> None:
+        if not self._enter("send"):
+            return
+        if not self._logged_in():
+            self._send(401, "{}", "application/json")
+            return
+        try:
+            payload = json.loads(raw)
+        except ValueError:
+            self._send(400, "{}", "application/json")
+            return
+        st = self.state
+        with st.lock:
+            user = st.threads.get(str(payload.get("thread")))
+            if user is None:
+                self._send(404, "{}", "application/json")
+                return
+            if st.cfg.drop_sends > 0:
+                st.cfg.drop_sends -= 1
+                self._send(503, "{}", "application/json")
+                return
+            st.sent.append(SentMessage(user, str(payload.get("text", "")), time.time()))
+        self._send(200, '{"status": "ok"}', "application/json")
+
+
+class FixtureSite:
+    """Run the stand-in site on a background thread (context manager)."""
+
+    def __init__(self, cfg: SiteConfig | None = None, host: str = "127.0.0.1", port: int = 0):
+        self.cfg = cfg or SiteConfig()
+        self._state = _State(self.cfg)
+        handler = type("_SiteHandler", (_Handler,), {"state": self._state})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def sent(self) -> List[SentMessage]:
+        with self._state.lock:
+            return list(self._state.sent)
+
+    @property
+    def hits(self) -> Dict[str, int]:
+        with self._state.lock:
+            return dict(self._state.hits)
+
+    @property
+    def static(self) -> List[str]:
+        """Names of the /static/ assets the browser has fetched."""
+        with self._state.lock:
+            return list(self._state.static)
+
+    def forget_thread(self, username: str) -> None:
+        """Invalidate a user's thread id so stored thread URLs go stale."""
+        with self._state.lock:
+            for tid, user in list(self._state.threads.items()):
+                if user == username:
+                    del self._state.threads[tid]
+
+    def expire_sessions(self) -> None:
+        with self._state.lock:
+            self._state.sessions.clear()
+
+    def start(self) -> "FixtureSite":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> "FixtureSite":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def _parse_args(argv: List[str] | None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(prog="instagram-bot-fixture-site")
+    p.add_argument("--port", type=int, default=8000)
+    p.add_argument("--latency", type=float, default=0.0, help="Latency applied to every route")
+    p.add_argument("--challenge", action="store_true", help="Send logins to /challenge/")
+    return p.parse_args(argv)
+
+
+def main(argv: List[str] | None = None) -> int:
+    ns = _parse_args(argv)
+    cfg = SiteConfig(latency={r: ns.latency for r in ROUTES}, challenge=ns.challenge)
+    site = FixtureSite(cfg, port=ns.port).start()
+    print(f"Fixture site on {site.base_url} (login {cfg.username}/{cfg.password}); Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        site.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
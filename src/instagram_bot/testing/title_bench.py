@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+=================================================================== 
+Project: Instagram Bot – Automate Instagram Messages 
+File: testing/title_bench.py 
+Author: Mobin Yousefi (GitHub: github.com/mobinyousefi) 
+Created: 2026-10-18 
+Updated: 2026-10-18 
+License: MIT License (see LICENSE file for details)
+=================================================================== 
+
+Description: 
+Benchmark of profile title extraction: the old full download plus
+BeautifulSoup parse against the streaming, stop-at-</title> scan,
+served from a local HTTP server. Both must return the same titles.
+
+Usage: 
+python -m instagram_bot.testing.title_bench --iterations 50
+python -m instagram_bot.testing.title_bench --pages saved_profiles/ --out title.json
+
+Notes: 
+- Without --pages, profile-sized pages are generated (see fixture_page).
+- Exit status 1 means the two paths disagreed on some page's title.
+
+===================================================================
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import requests
+from bs4 import BeautifulSoup
+
+from ..utils.profile_scrape import _CHUNK_BYTES, MAX_PAGE_BYTES, _release, _scan
+from .bench import STATS, summarize
+
+_TITLES = (
+    "Alice Example (@alice) • Instagram photos and videos",
+    "Café &amp; Co (@cafe.co) • Instagram photos and videos",
+    "Ünïcødé 🌙 (@moon_child) • Instagram photos and videos",
+)
+
+
+def fixture_page(title: str, size: int = 600_000, seed: int = 0) -> bytes:
+    """Deterministic page shaped like a profile: a script-heavy head, then a large body."""
+    rng = random.Random(seed)
+
+    def blob(n: int) -> str:
+        return "".join(rng.choice("abcdefghijklmnopqrstuvwxyz0123456789") for _ in range(n))
+
+    head = ['<!DOCTYPE html><html lang="en"><head><meta charset="utf-8">']
+    head += [f'<link rel="preload" href="/static/{blob(24)}.js" as="script">' for _ in range(40)]
+    head += [f'<script type="application/json">{{"k":"{blob(2000)}"}}</script>' for _ in range(8)]
+    head.append(f"<title>{title}</title></head><body>")
+    page = "".join(head)
+    body = []
+    while len(page) + sum(map(len, body)) < size:
+        body.append(f'<script type="application/json">{{"data":"{blob(4000)}"}}</script>')
+    return (page + "".join(body) + "</body></html>").encode("utf-8")
+
+
+def legacy_title(session: requests.Session, url: str) -> Tuple[Optional[str], int]:
+    """What fetch_profile_title used to do: whole page, then a full soup."""
+    r = session.get(url, timeout=10)
+    title = BeautifulSoup(r.text, "html.parser").find("title")
+    return (title.text.strip() if title else None), len(r.content)
+
+
+def streaming_title(session: requests.Session, url: str) -> Tuple[Optional[str], int]:
+    with session.get(url, timeout=10, stream=True) as r:
+        chunks = r.iter_content(_CHUNK_BYTES)
+        scan = _scan(chunks, r.encoding or "utf-8", MAX_PAGE_BYTES)
+        _release(r, chunks)
+    return scan.title, scan.bytes_read
+
+
+def _serve(pages: Dict[str, bytes]) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, fmt: str, *args) -> None:
+            pass
+
+        def handle(self) -> None:
+            try:
+                super().handle()
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # the streaming client hung up after </title>
+
+        def do_GET(self) -> None:  # noqa: N802
+            body = pages.get(self.path.strip("/"), b"")
+            self.send_response(200 if body else 404)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    return server
+
+
+def run(pages: Dict[str, bytes], iterations: int) -> Dict[str, object]:
+    """Time both paths over every page; returns samples, bytes read and any mismatches."""
+    paths: Dict[str, Callable] = {"legacy": legacy_title, "streaming": streaming_title}
+    samples: Dict[str, List[float]] = {name: [] for name in paths}
+    read: Dict[str, int] = {name: 0 for name in paths}
+    mismatches: List[str] = []
+    server = _serve(pages)
+    base = f"http://127.0.0.1:{server.server_port}"
+    try:
+        with requests.Session() as session:
+            for _ in range(iterations):
+                for name in pages:
+                    titles = {}
+                    for path, fn in paths.items():
+                        start = time.perf_counter()
+                        titles[path], n = fn(session, f"{base}/{name}/")
+                        samples[path].append(time.perf_counter() - start)
+                        read[path] += n
+                    if titles["legacy"] != titles["streaming"] and name not in mismatches:
+                        mismatches.append(name)
+    finally:
+        server.shutdown()
+        server.server_close()
+    return {"samples": samples, "bytes": read, "mismatches": mismatches}
+
+
+def _load_pages(directory: Path | None, size: int) -> Dict[str, bytes]:
+    if directory is None:
+        return {f"page{i}": fixture_page(t, size, seed=i) for i, t in enumerate(_TITLES)}
+    return {p.stem: p.read_bytes() for p in sorted(directory.glob("*.html"))}
+
+
+def _parse_args(argv: List[str]) -> argparse.Namespace:
+    p = argparse.ArgumentParser(prog="instagram-bot-title-bench")
+    p.add_argument("--iterations", type=int, default=20)
+    p.add_argument("--pages", type=Path, help="Directory of saved profile pages (*.html)")
+    p.add_argument("--size", type=int, default=600_000, help="Generated page size in bytes")
+    p.add_argument("--out", type=Path, help="Write the JSON report here")
+    return p.parse_args(argv)
+
+
+def main(argv: List[str] | None = None) -> int:
+    ns = _parse_args(sys.argv[1:] if argv is None else argv)
+    pages = _load_pages(ns.pages, ns.size)
+    if not pages:
+        print("No pages to benchmark.", file=sys.stderr)
+        return 2
+    result = run(pages, ns.iterations)
+    stats = summarize(result["samples"])
+    report = {
+        "meta": {"iterations": ns.iterations, "pages": sorted(pages), "timestamp": time.time()},
+        "paths": stats,
+        "bytes": result["bytes"],
+        "mismatches": result["mismatches"],
+    }
+
+    print(f"{'path':<12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'KiB/page':>12}")
+    for name, st in stats.items():
+        kib = result["bytes"][name] / st["n"] / 1024
+        print(f"{name:<12}" + "".join(f"{st[s] * 1000:>10.2f}" for s in STATS) + f"{kib:>12.1f}")
+
+    if ns.out:
+        ns.out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    for name in result["mismatches"]:
+        print(f"MISMATCH {name}: legacy and streaming titles differ", file=sys.stderr)
+    return 1 if result["mismatches"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+=================================================================== 
+Project: Instagram Bot – Automate Instagram Messages 
+File: thread_index.py 
+Author: Mobin Yousefi (GitHub: github.com/mobinyousefi) 
+Created: 2026-10-18 
+Updated: 2026-10-18 
+License: MIT License (see LICENSE file for details)
+=================================================================== 
+
+Description: 
+On-disk index mapping usernames to their /direct/t/<id>/ thread URLs so
+repeat sends can navigate straight to the thread instead of composing.
+
+Usage: 
+from instagram_bot.thread_index import ThreadIndex
+index = ThreadIndex(Path(".ig_threads.json"))
+
+Notes: 
+- Filled after each successful compose, or in bulk via harvest_inbox().
+- Entries that no longer open a thread are dropped by the caller.
+
+===================================================================
+"""
+from __future__ import annotations
+
+import json
+import re
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Optional
+
+from .automation.waits import navigate
+from .utils.atomicfile import write_text_atomic
+from .utils.selectors import SX
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
+
+_THREAD_URL_RE = re.compile(r"/direct/t/([^/?#]+)/?")
+
+# Returns [[href, avatar alt text], ...] for every node matching arguments[0]
+_JS_INBOX_LINKS = """
+const snap = document.evaluate(arguments[0], document, null,
+    XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+const out = [];
+for (let i = 0; i < snap.snapshotLength; i++) {
+    const a = snap.snapshotItem(i);
+    const img = a.querySelector('img[alt]');
+    out.push([a.href, img ? img.alt : '']);
+}
+return out;
+"""
+# The avatar of a 1:1 thread names the username; the visible label is the display name
+_AVATAR_ALT_RE = re.compile(r"^([A-Za-z0-9._]{1,30})'s profile picture$")
+
+
+def _key(username: str) -> str:
+    return username.strip().lstrip("@").lower()
+
+
+def thread_url_from(url: str) -> Optional[str]:
+    """Return the canonical thread URL contained in ``url``, if any."""
+    m = _THREAD_URL_RE.search(url)
+    if not m:
+        return None
+    return url[: m.start()] + f"/direct/t/{m.group(1)}/"
+
+
+class ThreadIndex:
+    """Persistent username → thread URL map."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._threads: Dict[str, str] = {}
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except Exception:
+            return  # unreadable index is just a cold cache
+        if isinstance(data, dict):
+            self._threads = {_key(k): str(v) for k, v in data.items()}
+
+    def save(self) -> None:
+        write_text_atomic(self.path, json.dumps(self._threads, ensure_ascii=False))
+
+    def __len__(self) -> int:
+        return len(self._threads)
+
+    def __contains__(self, username: str) -> bool:
+        return _key(username) in self._threads
+
+    def get(self, username: str) -> Optional[str]:
+        return self._threads.get(_key(username))
+
+    def put(self, username: str, url: str) -> None:
+        thread_url = thread_url_from(url)
+        if thread_url is None or self._threads.get(_key(username)) == thread_url:
+            return
+        self._threads[_key(username)] = thread_url
+        self.save()
+
+    def drop(self, username: str) -> None:
+        if self._threads.pop(_key(username), None) is not None:
+            self.save()
+
+    def harvest_inbox(self, driver: WebDriver, base_url: str) -> int:
+        """Record every 1:1 thread listed on /direct/inbox/ in one pass.
+
+        Threads are keyed by the username in their avatar's alt text; entries
+        without one (groups, changed markup) are skipped. Returns the number
+        of entries added.
+        """
+        navigate(driver, f"{base_url}/direct/inbox/")
+        # One script call instead of a find + two property reads per link
+        links = driver.execute_script(_JS_INBOX_LINKS, SX.INBOX_THREAD_LINK) or []
+        added = 0
+        for href, alt in links:
+            thread_url = thread_url_from(href or "")
+            m = _AVATAR_ALT_RE.match((alt or "").strip())
+            if not thread_url or not m:
+                continue
+            name = _key(m.group(1))
+            if self._threads.get(name) != thread_url:
+                self._threads[name] = thread_url
+                added += 1
+        if added:
+            self.save()
+        return added
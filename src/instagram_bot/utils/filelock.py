@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+=================================================================== 
+Project: Instagram Bot – Automate Instagram Messages 
+File: utils/filelock.py 
+Author: Mobin Yousefi (GitHub: github.com/mobinyousefi) 
+Created: 2026-10-18 
+Updated: 2026-10-18 
+License: MIT License (see LICENSE file for details)
+=================================================================== 
+
+Description: 
+Minimal advisory inter-process file lock (fcntl on POSIX, msvcrt on
+Windows).
+
+Usage: 
+from instagram_bot.utils.filelock import FileLock
+with FileLock(Path("profile.lock"), timeout=10):
+    ...
+
+Notes: 
+- Advisory only: cooperating bot processes respect it, other programs don't.
+- The OS drops the lock if the holding process dies.
+
+===================================================================
+"""
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+from typing import IO, Optional
+
+if os.name == "nt":  # pragma: no cover
+    import msvcrt
+
+    def _try_lock(fh: IO[str]) -> bool:
+        try:
+            fh.seek(0)
+            msvcrt.locking(fh.fileno(), msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+
+    def _unlock(fh: IO[str]) -> None:
+        fh.seek(0)
+        msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+
+else:
+    import fcntl
+
+    def _try_lock(fh: IO[str]) -> bool:
+        try:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            return False
+
+    def _unlock(fh: IO[str]) -> None:
+        fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+
+
+class FileLock:
+    """Exclusive lock on ``path``; ``timeout=None`` waits forever, 0 never waits."""
+
+    def __init__(self, path: Path, timeout: Optional[float] = None, poll: float = 0.05) -> None:
+        self.path = path
+        self.timeout = timeout
+        self.poll = poll
+        self._fh: Optional[IO[str]] = None
+
+    @property
+    def locked(self) -> bool:
+        return self._fh is not None
+
+    def acquire(self) -> bool:
+        """Return True once the lock is held, False if the timeout ran out."""
+        if self._fh is not None:
+            return True
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fh = open(self.path, "a+", encoding="utf-8")
+        while not _try_lock(fh):
+            if deadline is not None and time.monotonic() >= deadline:
+                fh.close()
+                return False
+            time.sleep(self.poll)
+        # Holder's pid, for humans debugging a stuck lock
+        fh.seek(0)
+        fh.truncate()
+        fh.write(str(os.getpid()))
+        fh.flush()
+        self._fh = fh
+        return True
+
+    def release(self) -> None:
+        fh, self._fh = self._fh, None
+        if fh is None:
+            return
+        try:
+            _unlock(fh)
+        finally:
+            fh.close()
+
+    def __enter__(self) -> "FileLock":
+        if not self.acquire():
+            raise TimeoutError(f"Could not lock {self.path} within {self.timeout}s.")
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
@@ -6,42 +6,435 @@ Project: Instagram Bot – Automate Instagram Messages
 File: utils/profile_scrape.py 
 Author: Mobin Yousefi (GitHub: github.com/mobinyousefi) 
 Created: 2025-10-20 
-Updated: 2025-10-20 
+Updated: 2026-10-18 
 License: MIT License (see LICENSE file for details)
 =================================================================== 
 
 Description: 
-Lightweight helper using requests + BeautifulSoup to fetch basic
+Lightweight helper using requests to fetch basic
 public profile info (if available) to sanity-check target usernames
 before attempting a DM.
 
+ProfileLookup keeps one pooled HTTP session, caches results (including
+"no such user" and private profiles) with a TTL and an LRU bound,
+revalidates stale entries with conditional requests and stops at a
+request budget. Pages are streamed and only read up to </title>.
+
 Usage: 
-from instagram_bot.utils.profile_scrape import fetch_profile_title
+from instagram_bot.utils.profile_scrape import ProfileLookup, fetch_profile_title
+with ProfileLookup("https://www.instagram.com", Path(".ig_profiles.json")) as lookup:
+    info = lookup.lookup("some_user")
 
 Notes: 
 - Instagram heavily rate-limits and may block requests. Use sparingly.
 - Many profiles are private; treat this as a best-effort check.
+- The cache file is only written by save() / close(); a persisted budget
+  is written on every request it allows.
+- Private profiles are recognised only from text before </title>.
 
 ===================================================================
 """
 from __future__ import annotations
 
-from typing import Optional
+import codecs
+import json
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from html.parser import HTMLParser
+from typing import TYPE_CHECKING, Callable, Deque, Dict, Iterable, Iterator, List, Optional
+
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
 
+from .. import metrics
+from ..exceptions import LookupBudgetError
+from .atomicfile import write_text_atomic
+from .filelock import FileLock
 
-def fetch_profile_title(base_url: str, username: str, timeout: float = 8.0) -> Optional[str]:
-    url = f"{base_url.rstrip('/')}/{username.strip('/')}/"
-    try:
-        r = requests.get(url, timeout=timeout, headers={
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            "Accept-Language": "en-US,en;q=0.9",
-        })
-        if r.status_code != 200:
+if TYPE_CHECKING:
+    from ..config import Settings
+
+PROFILE_OK = "ok"
+PROFILE_PRIVATE = "private"
+PROFILE_MISSING = "missing"
+
+_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+_PRIVATE_MARKER = "this account is private"
+
+# Stop reading a page after this much without a complete <title>
+MAX_PAGE_BYTES = 512 * 1024
+_CHUNK_BYTES = 16 * 1024
+# After an early stop, a tail this short is read out so the connection goes back to the pool
+_DRAIN_BYTES = 32 * 1024
+# Cache and budget files are rewritten in milliseconds; a longer wait means a stuck holder
+_LOCK_TIMEOUT = 10.0
+
+
+@dataclass
+class ProfileInfo:
+    username: str
+    status: str  # PROFILE_OK / PROFILE_PRIVATE / PROFILE_MISSING
+    title: Optional[str] = None
+    etag: str = ""
+    last_modified: str = ""
+    fetched_at: float = 0.0
+
+    @property
+    def exists(self) -> bool:
+        return self.status != PROFILE_MISSING
+
+
+class RequestBudget:
+    """At most ``limit`` requests per sliding ``window`` seconds, shared by its users.
+
+    With a ``path`` the spent requests are kept in that file and re-read under
+    a file lock on every check, so the window holds across runs and processes;
+    ``clock`` must then be wall time.
+    """
+
+    def __init__(
+        self,
+        limit: int,
+        window: float = 3600.0,
+        clock: Callable[[], float] = time.monotonic,
+        path: Path | None = None,
+        lock_path: Path | None = None,
+    ) -> None:
+        self.limit = limit
+        self.window = window
+        self.path = path
+        self._clock = clock
+        self._stamps: Deque[float] = deque()
+        self._lock = threading.Lock()
+        self._file_lock: Optional[FileLock] = None
+        if path is not None:
+            self._file_lock = FileLock(lock_path or _lock_path(path), timeout=_LOCK_TIMEOUT)
+
+    def _trim(self, now: float) -> None:
+        while self._stamps and now - self._stamps[0] >= self.window:
+            self._stamps.popleft()
+
+    @contextmanager
+    def _synced(self) -> Iterator[None]:
+        with self._lock:
+            if self._file_lock is None:
+                yield
+                return
+            with self._file_lock:
+                self._stamps = deque(self._read())
+                yield
+
+    def _read(self) -> List[float]:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))  # type: ignore[union-attr]
+            return sorted(float(t) for t in data["spent"])
+        except Exception:
+            return []  # missing or unreadable budget file: a fresh window
+
+    def _write(self) -> None:
+        if self.path is None:
+            return
+        payload = json.dumps({"window": self.window, "spent": list(self._stamps)})
+        write_text_atomic(self.path, payload)
+
+    def remaining(self) -> int:
+        with self._synced():
+            self._trim(self._clock())
+            return max(0, self.limit - len(self._stamps))
+
+    def take(self) -> bool:
+        """Spend one request; False (and nothing spent) once the window is full."""
+        with self._synced():
+            now = self._clock()
+            self._trim(now)
+            if len(self._stamps) >= self.limit:
+                return False
+            self._stamps.append(now)
+            self._write()
+            return True
+
+
+def _lock_path(path: Path) -> Path:
+    return path.with_name(f"{path.name}.lock")
+
+
+def _key(username: str) -> str:
+    return username.strip().strip("/").lower()
+
+
+class _TitleScan(HTMLParser):
+    """Incremental parser that records the first <title> and then reports done."""
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.title: Optional[str] = None
+        self.private = False
+        self.done = False
+        self.bytes_read = 0
+        self._in_title = False
+        self._parts: List[str] = []
+
+    def handle_starttag(self, tag: str, attrs) -> None:
+        if tag == "title" and self.title is None:
+            self._in_title = True
+        elif tag == "meta":
+            content = dict(attrs).get("content") or ""
+            self.private = self.private or _PRIVATE_MARKER in content.lower()
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "title" and self._in_title:
+            self._finish_title()
+            self.done = True
+
+    def handle_data(self, data: str) -> None:
+        if self._in_title:
+            self._parts.append(data)
+        self.private = self.private or _PRIVATE_MARKER in data.lower()
+
+    def close(self) -> None:
+        super().close()
+        if self._in_title:  # unterminated <title> runs to the end of the page
+            self._finish_title()
+
+    def _finish_title(self) -> None:
+        self._in_title = False
+        self.title = "".join(self._parts).strip()
+
+
+def _scan(chunks: Iterable[bytes], encoding: str, max_bytes: int) -> _TitleScan:
+    """Feed ``chunks`` to a _TitleScan until </title>, the end, or ``max_bytes``."""
+    scan = _TitleScan()
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    for chunk in chunks:
+        chunk = chunk[: max_bytes - scan.bytes_read]
+        scan.bytes_read += len(chunk)
+        scan.feed(decoder.decode(chunk))
+        if scan.done or scan.bytes_read >= max_bytes:
+            break
+    else:
+        scan.feed(decoder.decode(b"", final=True))
+    scan.close()
+    return scan
+
+
+def extract_title(
+    chunks: Iterable[bytes], encoding: str = "utf-8", max_bytes: int = MAX_PAGE_BYTES
+) -> Optional[str]:
+    """Text of the first <title> in a page given as byte chunks, reading no further than it."""
+    return _scan(chunks, encoding, max_bytes).title
+
+
+def _release(r: requests.Response, rest: Iterator[bytes]) -> None:
+    """Return the connection to the pool if the unread tail is short; else drop it."""
+    remaining = getattr(r.raw, "length_remaining", None)
+    if remaining is not None and remaining <= _DRAIN_BYTES:
+        for _ in rest:
+            pass
+    r.close()
+
+
+class ProfileLookup:
+    """Cached, connection-pooled profile page lookups."""
+
+    def __init__(
+        self,
+        base_url: str,
+        cache_path: Path | None = None,
+        *,
+        ttl: float = 86400.0,
+        negative_ttl: float = 6 * 3600.0,
+        max_entries: int = 2048,
+        max_bytes: int = MAX_PAGE_BYTES,
+        budget: RequestBudget | None = None,
+        timeout: float = 8.0,
+        session: requests.Session | None = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.budget = budget
+        self.timeout = timeout
+        self._clock = clock
+        self._cache: "OrderedDict[str, ProfileInfo]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.session = session or self._new_session()
+        self._load()
+
+    @staticmethod
+    def _new_session() -> requests.Session:
+        s = requests.Session()
+        s.headers.update(_HEADERS)
+        # One host: a single pool, sized for a few concurrent checks
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4)
+        s.mount("https://", adapter)
+        s.mount("http://", adapter)
+        return s
+
+    # -- cache ---------------------------------------------------------------
+    def _load(self) -> None:
+        if self.cache_path is None or not self.cache_path.exists():
+            return
+        try:
+            data = json.loads(self.cache_path.read_text(encoding="utf-8"))
+            entries = [ProfileInfo(**v) for v in data.values()]
+        except Exception:
+            return  # unreadable cache is just a cold cache
+        for info in sorted(entries, key=lambda i: i.fetched_at)[-self.max_entries:]:
+            self._cache[_key(info.username)] = info
+
+    def save(self) -> None:
+        if self.cache_path is None or not self._dirty:
+            return
+        with self._lock:
+            payload = json.dumps({k: asdict(v) for k, v in self._cache.items()}, ensure_ascii=False)
+            self._dirty = False
+        with FileLock(_lock_path(self.cache_path), timeout=_LOCK_TIMEOUT):
+            write_text_atomic(self.cache_path, payload)
+
+    def close(self) -> None:
+        self.save()
+        self.session.close()
+
+    def __enter__(self) -> "ProfileLookup":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _fresh(self, info: ProfileInfo) -> bool:
+        ttl = self.negative_ttl if info.status == PROFILE_MISSING else self.ttl
+        return self._clock() - info.fetched_at < ttl
+
+    def _store(self, info: ProfileInfo) -> None:
+        with self._lock:
+            key = _key(info.username)
+            self._cache[key] = info
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+            self._dirty = True
+
+    def cached(self, username: str) -> Optional[ProfileInfo]:
+        with self._lock:
+            info = self._cache.get(_key(username))
+            if info is not None:
+                self._cache.move_to_end(_key(username))
+            return info
+
+    # -- lookups -------------------------------------------------------------
+    def lookup(self, username: str) -> Optional[ProfileInfo]:
+        """Profile status for ``username``, or None if Instagram gave no usable answer.
+
+        Raises LookupBudgetError when a request is needed but the budget is spent
+        and nothing (not even a stale entry) is cached.
+        """
+        cached = self.cached(username)
+        if cached is not None and self._fresh(cached):
+            metrics.event("profile.cache", label="hit")
+            return cached
+        if self.budget is not None and not self.budget.take():
+            metrics.event("profile.cache", label="over_budget")
+            if cached is not None:
+                return cached
+            raise LookupBudgetError(f"Profile lookup budget spent; {username!r} not checked.")
+        return self._fetch(username, cached)
+
+    def _fetch(self, username: str, cached: Optional[ProfileInfo]) -> Optional[ProfileInfo]:
+        url = f"{self.base_url}/{username.strip('/')}/"
+        headers: Dict[str, str] = {}
+        if cached is not None and cached.status != PROFILE_MISSING:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+        with metrics.span("profile.fetch", label="conditional" if headers else "full") as attrs:
+            try:
+                r = self.session.get(url, timeout=self.timeout, headers=headers, stream=True)
+            except Exception:
+                attrs["status"] = "error"
+                return None
+            attrs["status"] = r.status_code
+            scan = None
+            try:
+                chunks = r.iter_content(_CHUNK_BYTES)
+                if r.status_code == 200:
+                    scan = _scan(chunks, r.encoding or "utf-8", self.max_bytes)
+                    attrs["bytes"] = scan.bytes_read
+                _release(r, chunks)
+            except Exception:
+                attrs["status"] = "error"
+                return None
+            finally:
+                r.close()
+        now = self._clock()
+        if r.status_code == 304 and cached is not None:
+            info = ProfileInfo(**{**asdict(cached), "fetched_at": now})
+        elif r.status_code == 404:
+            info = ProfileInfo(username, PROFILE_MISSING, fetched_at=now)
+        elif scan is not None:
+            info = ProfileInfo(
+                username,
+                PROFILE_PRIVATE if scan.private else PROFILE_OK,
+                title=scan.title,
+                etag=r.headers.get("ETag", ""),
+                last_modified=r.headers.get("Last-Modified", ""),
+                fetched_at=now,
+            )
+        else:
+            # 429s, login walls, 5xx: say nothing rather than cache a guess
+            return None
+        self._store(info)
+        return info
+
+    def title(self, username: str) -> Optional[str]:
+        try:
+            info = self.lookup(username)
+        except LookupBudgetError:
             return None
-        soup = BeautifulSoup(r.text, "html.parser")
-        title = soup.find("title")
-        return title.text.strip() if title else None
-    except Exception:
-        return None
+        return info.title if info is not None and info.exists else None
+
+
+def lookup_client(cfg: Settings) -> ProfileLookup:
+    """ProfileLookup configured from IG_PROFILE_CACHE_* / IG_PROFILE_LOOKUP_BUDGET.
+
+    With a cache file the budget is kept next to it (``<cache>.budget``), under
+    the cache's lock, so every run draws from the same hourly allowance.
+    """
+    cache = cfg.profile_cache_path
+    budget = None
+    if cfg.profile_lookup_budget > 0 and cache is None:
+        budget = RequestBudget(cfg.profile_lookup_budget)
+    elif cfg.profile_lookup_budget > 0 and cache is not None:
+        budget = RequestBudget(
+            cfg.profile_lookup_budget,
+            clock=time.time,
+            path=cache.with_name(f"{cache.name}.budget"),
+            lock_path=_lock_path(cache),
+        )
+    return ProfileLookup(cfg.base_url, cache, ttl=cfg.profile_cache_ttl, budget=budget)
+
+
+_clients: Dict[str, ProfileLookup] = {}
+_clients_lock = threading.Lock()
+
+
+def fetch_profile_title(base_url: str, username: str, timeout: float = 8.0) -> Optional[str]:
+    # One in-memory client per site, so repeated calls share a connection and a cache
+    with _clients_lock:
+        client = _clients.get(base_url)
+        if client is None:
+            client = _clients[base_url] = ProfileLookup(base_url)
+    client.timeout = timeout
+    return client.title(username)
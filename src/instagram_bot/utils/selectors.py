@@ -6,7 +6,7 @@ Project: Instagram Bot – Automate Instagram Messages
 File: utils/selectors.py 
 Author: Mobin Yousefi (GitHub: github.com/mobinyousefi) 
 Created: 2025-10-20 
-Updated: 2025-10-20 
+Updated: 2026-10-18 
 License: MIT License (see LICENSE file for details)
 =================================================================== 
 
@@ -15,16 +15,32 @@ Centralized selectors (XPaths/CSS) used by the bot. Instagram’s DOM
 changes often—update these in one place.
 
 Usage: 
-from instagram_bot.utils.selectors import SX
+from instagram_bot.utils.selectors import SX, DM_TEXTBOX
+wait_for(driver, 10, DM_TEXTBOX.visible(), "dm_textbox")
+python -m instagram_bot.utils.selectors report .ig_selectors.json
 
 Notes: 
 - Prefer robust XPaths and data-testid when available.
 - Keep names semantic.
+- Registry selectors list cheapest/most likely alternatives first; the
+  order is then adjusted from what actually matches.
 
 ===================================================================
 """
 from __future__ import annotations
 
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException
+
+from .. import metrics
+
 
 class SX:
     # Login page
@@ -38,8 +54,253 @@ class SX:
 
     # Messaging (DM)
     # Open chat compose or navigate to thread: we'll use a direct URL to /direct/t/ or /direct/new/
+    INBOX_THREAD_LINK = "//a[contains(@href,'/direct/t/')]"
     TEXTAREA_DM = "//textarea|//div[@role='textbox']"
     SEND_BUTTON = "//button//*[name()='svg' and @aria-label='Send']|//button[@type='submit' and contains(., 'Send')]"
+    # Rows of the open thread's message list; a new row appears once a send is accepted
+    MESSAGE_ROW = "//div[@role='main']//div[@role='row']"
 
     # Generic
     ANY_SPINNER = "//*[self::div or self::span][contains(@class,'spinner') or contains(@class,'loading')]"
+
+
+# -- ranked selector registry -------------------------------------------------
+# Values of selenium's By.CSS_SELECTOR / By.XPATH, without importing Selenium here
+CSS = "css selector"
+XPATH = "xpath"
+
+STATES = ("present", "visible", "clickable")
+
+_DECAY = 0.8  # weight of history in an alternative's score; the rest is the latest result
+
+
+@dataclass
+class AltStats:
+    attempts: int = 0
+    hits: int = 0
+    seconds: float = 0.0  # total lookup time, hits and misses
+    score: float = 0.0  # decayed recent hit rate; ranks the alternatives
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "attempts": self.attempts,
+            "hits": self.hits,
+            "hit_rate": self.hits / self.attempts if self.attempts else 0.0,
+            "mean_ms": 1000 * self.seconds / self.attempts if self.attempts else 0.0,
+        }
+
+
+class Selector:
+    """One logical element with ordered CSS/XPath alternatives.
+
+    Lookups try the alternative that has been matching lately first (ties keep
+    the declared order) and record attempts, hits and latency per alternative.
+    Values may contain ``{placeholders}`` filled from ``find(..., **params)``.
+    """
+
+    def __init__(self, name: str, *alternatives: Tuple[str, str]) -> None:
+        if not alternatives:
+            raise ValueError(f"Selector {name!r} needs at least one alternative.")
+        self.name = name
+        self.alternatives = alternatives
+        self.stats = [AltStats() for _ in alternatives]
+
+    def ranked(self) -> List[int]:
+        return sorted(range(len(self.alternatives)), key=lambda i: -self.stats[i].score)
+
+    def find(self, driver: Any, state: str = "present", **params: str) -> Any:
+        """First element matching any alternative in ``state``, or None."""
+        for i in self.ranked():
+            by, value = self.alternatives[i]
+            if params:
+                value = value.format(**params)
+            start = time.perf_counter()
+            try:
+                el = _pick(driver.find_elements(by, value), state)
+            except (StaleElementReferenceException, NoSuchElementException):
+                el = None  # page re-rendered mid-lookup; a dead browser still raises
+            self._record(i, el is not None, time.perf_counter() - start)
+            if el is not None:
+                return el
+        return None
+
+    def find_all(self, driver: Any, **params: str) -> List[Any]:
+        """All matches of the best alternative that matches at all."""
+        for i in self.ranked():
+            by, value = self.alternatives[i]
+            if params:
+                value = value.format(**params)
+            start = time.perf_counter()
+            els = driver.find_elements(by, value)
+            self._record(i, bool(els), time.perf_counter() - start)
+            if els:
+                return els
+        return []
+
+    # Conditions for automation.waits.wait_for
+    def present(self, **params: str) -> Callable[[Any], Any]:
+        return lambda d: self.find(d, "present", **params) or False
+
+    def visible(self, **params: str) -> Callable[[Any], Any]:
+        return lambda d: self.find(d, "visible", **params) or False
+
+    def clickable(self, **params: str) -> Callable[[Any], Any]:
+        return lambda d: self.find(d, "clickable", **params) or False
+
+    def _record(self, i: int, hit: bool, seconds: float) -> None:
+        st = self.stats[i]
+        st.attempts += 1
+        st.hits += hit
+        st.seconds += seconds
+        st.score = _DECAY * st.score + (1.0 - _DECAY) * hit
+
+    def __repr__(self) -> str:
+        return f"Selector({self.name!r}, {len(self.alternatives)} alternatives)"
+
+
+def _pick(elements: List[Any], state: str) -> Any:
+    # Like selenium's expected_conditions, only the first match is checked
+    if not elements:
+        return None
+    el = elements[0]
+    if state == "present":
+        return el
+    if not el.is_displayed():
+        return None
+    if state == "clickable" and not el.is_enabled():
+        return None
+    return el
+
+
+class SelectorRegistry:
+    def __init__(self) -> None:
+        self._selectors: Dict[str, Selector] = {}
+
+    def register(self, name: str, *alternatives: Tuple[str, str]) -> Selector:
+        sel = Selector(name, *alternatives)
+        self._selectors[name] = sel
+        return sel
+
+    def __getitem__(self, name: str) -> Selector:
+        return self._selectors[name]
+
+    def __iter__(self) -> Iterator[Selector]:
+        return iter(list(self._selectors.values()))
+
+    def stats(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Per selector, per alternative (declared order): what it is and how it does."""
+        return {
+            sel.name: [
+                {"by": by, "value": value, **st.to_dict()}
+                for (by, value), st in zip(sel.alternatives, sel.stats)
+            ]
+            for sel in self
+        }
+
+    def emit_metrics(self) -> None:
+        """One ``selector.stats`` event per alternative that was tried."""
+        for sel in self:
+            for i, st in enumerate(sel.stats):
+                if st.attempts:
+                    metrics.event("selector.stats", label=f"{sel.name}#{i}", **st.to_dict())
+
+    def save(self, path: Path) -> None:
+        data = {
+            sel.name: {
+                value: [st.attempts, st.hits, st.seconds, st.score]
+                for (_, value), st in zip(sel.alternatives, sel.stats)
+            }
+            for sel in self
+        }
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def load(self, path: Path) -> None:
+        """Restore learned ranking; alternatives that changed since are ignored."""
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        for name, saved in data.items() if isinstance(data, dict) else ():
+            sel = self._selectors.get(name)
+            if sel is None or not isinstance(saved, dict):
+                continue
+            for (_, value), st in zip(sel.alternatives, sel.stats):
+                row = saved.get(value)
+                if isinstance(row, list) and len(row) == 4:
+                    st.attempts, st.hits = int(row[0]), int(row[1])
+                    st.seconds, st.score = float(row[2]), float(row[3])
+
+
+REGISTRY = SelectorRegistry()
+_reg = REGISTRY.register
+
+ACCEPT_COOKIES = _reg("accept_cookies", (XPATH, SX.ACCEPT_COOKIES_BTN))
+USERNAME_INPUT = _reg("username_input", (CSS, "input[name='username']"), (XPATH, SX.USERNAME_INPUT))
+PASSWORD_INPUT = _reg("password_input", (CSS, "input[name='password']"), (XPATH, SX.PASSWORD_INPUT))
+LOGIN_BUTTON = _reg("login_button", (XPATH, SX.LOGIN_BUTTON), (CSS, "form button[type='submit']"))
+NOT_NOW = _reg("not_now", (XPATH, SX.NOT_NOW_BUTTON))
+# "Sorry, your password was incorrect." and friends, under the login form
+LOGIN_ERROR = _reg("login_error", (CSS, "#slfErrorAlert"), (CSS, "form ~ [role='alert']"))
+
+RECIPIENT_INPUT = _reg("recipient_input", (CSS, "input[name='queryBox']"))
+# Result row for {username}; scoped to the dialog rather than the whole document
+RECIPIENT_EXACT = _reg(
+    "recipient_exact",
+    (XPATH, "//div[@role='dialog']//div[contains(@style,'cursor')]"
+            "[div[text()='{username}' or text()='@{username}']]"),
+    (XPATH, "//div[@role='dialog']//div[contains(@style,'cursor')]"
+            "[.//div[text()='{username}' or text()='@{username}']]"),
+)
+# Shown instead of result rows when the search matches nobody
+RECIPIENT_NONE = _reg(
+    "recipient_none",
+    (XPATH, "//div[@role='dialog']//*[normalize-space(text())='No account found.']"),
+    (XPATH, "//div[@role='dialog']//*[contains(text(),'No account found')]"),
+)
+NEXT_BUTTON = _reg(
+    "next_button",
+    (XPATH, "//div[@role='dialog']//div[text()='Next']/parent::button"),
+    (XPATH, "//div[@role='dialog']//button[normalize-space()='Next']"),
+)
+# Instagram's rate-limit notice after a send ("Try Again Later ... We restrict certain activity")
+ACTION_BLOCKED = _reg(
+    "action_blocked",
+    (XPATH, "//div[@role='dialog']//*[contains(text(),'Try Again Later')]"),
+    (XPATH, "//div[@role='dialog']//*[contains(text(),'restrict certain activity')]"),
+)
+# Profile link of {username} in an open thread's header
+THREAD_PEER = _reg(
+    "thread_peer",
+    (XPATH, "//header//a[@href='/{username}/']"),
+    (CSS, "div[role='main'] a[href='/{username}/']"),
+)
+DM_TEXTBOX = _reg("dm_textbox", (CSS, "textarea"), (CSS, "div[role='textbox']"))
+SEND_BUTTON = _reg(
+    "send_button",
+    (CSS, "button svg[aria-label='Send']"),
+    (XPATH, "//button[@type='submit' and contains(., 'Send')]"),
+)
+MESSAGE_ROW = _reg("message_row", (CSS, "div[role='main'] div[role='row']"))
+
+
+def main(argv: List[str] | None = None) -> int:
+    args = sys.argv[1:] if argv is None else argv
+    if len(args) != 2 or args[0] != "report":
+        print("usage: python -m instagram_bot.utils.selectors report <file>", file=sys.stderr)
+        return 2
+    REGISTRY.load(Path(args[1]))
+    print(f"{'selector':<18}{'#':>2}  {'tries':>7}{'hit %':>7}{'ms':>8}  alternative")
+    for name, alts in REGISTRY.stats().items():
+        for i, a in enumerate(alts):
+            dead = "  (never matched)" if a["attempts"] and not a["hits"] else ""
+            print(
+                f"{name:<18}{i:>2}  {a['attempts']:>7}{100 * a['hit_rate']:>6.0f}%"
+                f"{a['mean_ms']:>8.1f}  {a['by']}: {a['value']}{dead}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+=================================================================== 
+Project: Instagram Bot – Automate Instagram Messages 
+File: tests/conftest.py 
+Author: Mobin Yousefi (GitHub: github.com/mobinyousefi) 
+Created: 2026-10-18 
+Updated: 2026-10-18 
+License: MIT License (see LICENSE file for details)
+=================================================================== 
+
+Description: 
+Shared fixtures: the offline fixture site and a headless Chrome for it.
+
+Usage: 
+pytest -q
+
+Notes: 
+- Browser tests are skipped when no Chrome/Chromium binary is on PATH.
+
+===================================================================
+"""
+from __future__ import annotations
+
+import shutil
+
+import pytest
+
+from instagram_bot.config import Settings
+from instagram_bot.testing.site import FixtureSite, SiteConfig
+
+_CHROME_BINARIES = ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser")
+
+
+@pytest.fixture
+def site_config() -> SiteConfig:
+    return SiteConfig()
+
+
+@pytest.fixture
+def site(site_config):
+    with FixtureSite(site_config) as s:
+        yield s
+
+
+@pytest.fixture
+def site_settings(site, tmp_path) -> Settings:
+    return Settings(
+        username=site.cfg.username,
+        password=site.cfg.password,
+        base_url=site.base_url,
+        headless=True,
+        cookie_path=tmp_path / "session.json",
+        thread_index_path=tmp_path / "threads.json",
+    )
+
+
+@pytest.fixture
+def chrome(request):
+    """Headless Chrome; parametrize indirectly with a block profile name (default "safe")."""
+    if not any(shutil.which(b) for b in _CHROME_BINARIES):
+        pytest.skip("Chrome/Chromium not installed")
+    from instagram_bot.automation.driver import make_driver
+
+    driver = make_driver(headless=True, blocking=getattr(request, "param", "safe"))
+    try:
+        yield driver
+    finally:
+        driver.quit()
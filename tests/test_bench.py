@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+=================================================================== 
+Project: Instagram Bot – Automate Instagram Messages 
+File: tests/test_bench.py 
+Author: Mobin Yousefi (GitHub: github.com/mobinyousefi) 
+Created: 2026-10-18 
+Updated: 2026-10-18 
+License: MIT License (see LICENSE file for details)
+=================================================================== 
+
+Description: 
+Tests for the benchmark statistics and baseline comparison.
+
+Usage: 
+pytest -q tests/test_bench.py
+
+Notes: 
+- The pipeline run itself needs Chrome and is not exercised here.
+
+===================================================================
+"""
+from __future__ import annotations
+
+import pytest
+
+from instagram_bot.testing.bench import compare, percentile, summarize
+
+
+def test_percentile_interpolates():
+    vals = [4.0, 1.0, 3.0, 2.0]
+    assert percentile(vals, 0) == 1.0
+    assert percentile(vals, 50) == pytest.approx(2.5)
+    assert percentile(vals, 100) == 4.0
+
+
+def test_compare_flags_only_regressed_phases():
+    base = summarize({"thread_open": [1.0, 1.0], "text_entry": [0.5, 0.5]})
+    cur = summarize({"thread_open": [1.3, 1.3], "text_entry": [0.55, 0.55]})
+    regressions = compare(cur, base, threshold=0.2, stat="p95")
+    assert len(regressions) == 1
+    assert regressions[0].startswith("thread_open")
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+=================================================================== 
+Project: Instagram Bot – Automate Instagram Messages 
+File: tests/test_commands.py 
+Author: Mobin Yousefi (GitHub: github.com/mobinyousefi) 
+Created: 2026-10-18 
+Updated: 2026-10-18 
+License: MIT License (see LICENSE file for details)
+=================================================================== 
+
+Description: 
+WebDriver command accounting, and the round-trip budgets of send_dm
+against the in-process fake driver.
+
+Usage: 
+pytest -q tests/test_commands.py
+
+Notes: 
+- A budget failure here means a change added chromedriver round-trips
+  to every send; raise the number only on purpose.
+
+===================================================================
+"""
+from __future__ import annotations
+
+import pytest
+
+from instagram_bot.auth import login_and_persist
+from instagram_bot.automation.commands import CommandAccounting, CommandBudgetExceeded
+from instagram_bot.config import Settings
+from instagram_bot.messaging import send_dm
+from instagram_bot.testing.fake_driver import FakeDriver, FakeInstagram, VirtualClock
+from instagram_bot.thread_index import ThreadIndex
+
+# Commands per send_dm with typing="insert" (measured: 32 and 19)
+COMPOSE_BUDGET = 40
+KNOWN_THREAD_BUDGET = 25
+
+
+@pytest.fixture
+def fake():
+    clock = VirtualClock()
+    with clock.patch():
+        driver = FakeDriver(clock, command_latency=0.002)
+        site = FakeInstagram(driver)
+        acc = CommandAccounting()
+        acc.attach(driver)
+        yield driver, site, acc
+
+
+def test_send_dm_stays_within_round_trip_budget(fake, tmp_path) -> None:
+    driver, site, acc = fake
+    site.log_in()
+    index = ThreadIndex(tmp_path / "threads.json")
+    with acc.budget(COMPOSE_BUDGET):
+        send_dm(driver, site.base_url, "alice", "hello", typing="insert", thread_index=index)
+    with acc.budget(KNOWN_THREAD_BUDGET):
+        send_dm(driver, site.base_url, "alice", "again", typing="insert", thread_index=index)
+    assert len(site.sent) == 2
+
+
+def test_commands_are_charged_to_their_operation(fake, tmp_path) -> None:
+    driver, site, acc = fake
+    cfg = Settings(
+        username="tester",
+        password="secret",
+        base_url=site.base_url,
+        cookie_path=tmp_path / "session.json",
+    )
+    login_and_persist(driver, cfg)
+    send_dm(driver, site.base_url, "bob", "hey you", type_delay_min=0.0, type_delay_max=0.0)
+
+    assert set(acc.stats) == {"login", "open_thread", "type", "send"}
+    # One send_keys round-trip per character is the price of typing="keys"
+    assert acc.stats["type"]["send_keys"].count == len("hey you")
+    assert acc.by_command()["get"].count == 3  # inbox probe, login page, compose
+    assert acc.stats["send"]["find_elements"].seconds == pytest.approx(
+        acc.stats["send"]["find_elements"].count * 0.002
+    )
+    report = acc.report()
+    assert "open_thread" in report and report.splitlines()[-1].split()[-1] == str(acc.total())
+
+
+def test_budget_overrun_and_detach(fake) -> None:
+    driver, site, acc = fake
+    site.log_in()
+    with pytest.raises(CommandBudgetExceeded, match="'type'"):
+        with acc.budget(3, operation="type"):
+            send_dm(driver, site.base_url, "carol", "12345", type_delay_min=0.0, type_delay_max=0.0)
+
+    acc.detach()
+    before = acc.total()
+    driver.get(f"{site.base_url}/direct/inbox/")
+    assert acc.total() == before and driver.trace[-1]["cmd"] == "get"
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+=================================================================== 
+Project: Instagram Bot – Automate Instagram Messages 
+File: tests/test_cookie_store.py 
+Author: Mobin Yousefi (GitHub: github.com/mobinyousefi) 
+Created: 2026-10-18 
+Updated: 2026-10-18 
+License: MIT License (see LICENSE file for details)
+=================================================================== 
+
+Description: 
+Tests for the versioned, atomically written session cookie store.
+
+Usage: 
+pytest -q tests/test_cookie_store.py
+
+Notes: 
+- Covers legacy formats, truncated files and concurrent writers.
+
+===================================================================
+"""
+from __future__ import annotations
+
+import json
+import threading
+
+from instagram_bot.cookie_store import FORMAT_VERSION, CookieStore, SessionRecord
+
+COOKIES = [
+    {"name": "sessionid", "value": "abc", "domain": ".instagram.com", "expiry": 2_000_000_000},
+    {"name": "csrftoken", "value": "tok", "domain": ".instagram.com"},
+]
+
+
+def test_roundtrip_is_compact_and_versioned(tmp_path):
+    store = CookieStore(tmp_path / "s.json")
+    store.save(SessionRecord(cookies=COOKIES, validated_at=123.0))
+
+    raw = json.loads(store.path.read_text())
+    assert raw["v"] == FORMAT_VERSION and raw["expires"] == 2_000_000_000
+    assert "\n" not in store.path.read_text()
+    record = store.load()
+    assert record.cookies == COOKIES and record.validated_at == 123.0
+    assert list(tmp_path.glob(".*.tmp")) == []
+
+
+def test_legacy_list_is_read_and_migrated(tmp_path):
+    path = tmp_path / ".ig_session.json"
+    path.write_text(json.dumps(COOKIES, indent=2), encoding="utf-8")
+    store = CookieStore(path)
+    assert store.load().validated_at is None
+
+    assert store.migrate() is True
+    assert json.loads(path.read_text())["v"] == FORMAT_VERSION
+    assert store.migrate() is False
+
+
+def test_truncated_file_loads_as_missing(tmp_path):
+    path = tmp_path / "s.json"
+    path.write_text('{"v":2,"cookies":[{"name":"sessi', encoding="utf-8")
+    assert CookieStore(path).load() is None
+
+
+def test_concurrent_writers_never_leave_partial_file(tmp_path):
+    path = tmp_path / "s.json"
+
+    def writer(n: int) -> None:
+        store = CookieStore(path)
+        for i in range(20):
+            store.save(SessionRecord(cookies=COOKIES, validated_at=float(n * 100 + i)))
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert CookieStore(path).load().cookies == COOKIES
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+=================================================================== 
+Project: Instagram Bot – Automate Instagram Messages 
+File: tests/test_daemon.py 
+Author: Mobin Yousefi (GitHub: github.com/mobinyousefi) 
+Created: 2026-10-18 
+Updated: 2026-10-18 
+License: MIT License (see LICENSE file for details)
+=================================================================== 
+
+Description: 
+Tests for daemon mode: job queue, HTTP API and the CLI-side client.
+
+Usage: 
+pytest -q tests/test_daemon.py
+
+Notes: 
+- send_dm and login are patched out; no browser is started.
+
+===================================================================
+"""
+from __future__ import annotations
+
+import dataclasses
+import json
+import os
+import socket
+import threading
+import urllib.error
+import urllib.request
+from typing import List
+
+import pytest
+
+from instagram_bot import daemon as daemon_mod
+from instagram_bot.config import Settings
+from instagram_bot.exceptions import DaemonError, MessageSendError
+
+
+class _Driver:
+    current_url = "about:blank"
+
+    def __init__(self) -> None:
+        self.quit_called = False
+
+    def quit(self) -> None:
+        self.quit_called = True
+
+
+@pytest.fixture
+def bot(monkeypatch, tmp_path):
+    sent: List[str] = []
+    drivers: List[_Driver] = []
+
+    def fake_deliver(driver, cfg, user, message, **kw) -> None:
+        if user == "slow":
+            d.entered.set()
+            d.release.wait(5)
+        if user == "ghost":
+            raise MessageSendError("no such user")
+        sent.append(f"{user}:{message}")
+
+    monkeypatch.setattr(daemon_mod, "deliver", fake_deliver)
+    monkeypatch.setattr(daemon_mod, "login_and_persist", lambda driver, cfg: None)
+    cfg = Settings(cookie_path=tmp_path / "session.json", daemon_url="http://127.0.0.1:0")
+    d = daemon_mod.Daemon(cfg, driver_factory=lambda: drivers.append(_Driver()) or drivers[-1])
+    d.sent, d.drivers = sent, drivers
+    d.entered, d.release = threading.Event(), threading.Event()
+    yield d.start()
+    d.stop()
+
+
+def test_jobs_run_in_order_on_one_driver(bot) -> None:
+    first = bot.submit(["alice", "bob"], "hi")
+    second = bot.submit(["ghost", "carol"], "yo")
+    assert second.done.wait(5)
+    assert first.state == "done"
+    assert second.state == "failed"
+    assert second.results == {"ghost": "MessageSendError: no such user", "carol": "sent"}
+    assert bot.sent == ["alice:hi", "bob:hi", "carol:yo"]
+    assert len(bot.drivers) == 1
+    assert bot.status()["messages"] == {"sent": 3, "failed": 1, "driver_starts": 1}
+
+
+def test_stop_quits_driver(bot) -> None:
+    assert bot.submit(["alice"], "hi").done.wait(5)
+    bot.stop()
+    assert bot.drivers[0].quit_called
+    assert not bot.health()["ok"]
+
+
+def test_stop_fails_queued_jobs_after_the_current_send(bot) -> None:
+    running = bot.submit(["slow", "alice"], "hi")
+    queued = bot.submit(["bob"], "yo")
+    assert bot.entered.wait(5)
+    stopper = threading.Thread(target=bot.stop)
+    stopper.start()
+    assert queued.done.wait(5)
+    assert queued.state == "failed" and queued.results == {"bob": "daemon stopped"}
+    assert not bot.drivers[0].quit_called  # "slow" is still being sent
+
+    bot.release.set()
+    stopper.join(5)
+    assert running.results == {"slow": "sent", "alice": "daemon stopped"}
+    assert bot.sent == ["slow:hi"]
+    assert bot.drivers[0].quit_called
+
+
+def test_http_api_and_client(bot) -> None:
+    server = daemon_mod._Server(("127.0.0.1", 0), bot, token="s3cret")
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+        cfg = dataclasses.replace(bot.cfg, daemon_url=url, daemon_token="s3cret")
+
+        job = daemon_mod.submit(cfg, ["alice"], "hello", typing="insert")
+        assert job["state"] == "done" and job["results"] == {"alice": "sent"}
+
+        with pytest.raises(DaemonError, match="401"):
+            daemon_mod.submit(dataclasses.replace(cfg, daemon_token="wrong"), ["bob"], "x")
+        with pytest.raises(DaemonError, match="400"):
+            daemon_mod.submit(cfg, ["bob"], "x", typing="shout")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_client_reports_missing_daemon(tmp_path) -> None:
+    cfg = Settings(daemon_url="http://127.0.0.1:9", daemon_token_path=tmp_path / "token")
+    with pytest.raises(DaemonError, match="No daemon token"):
+        daemon_mod.submit(cfg, ["alice"], "hi", timeout=1)
+    cfg = dataclasses.replace(cfg, daemon_token="s3cret")
+    with pytest.raises(DaemonError, match="No daemon reachable"):
+        daemon_mod.submit(cfg, ["alice"], "hi", timeout=1)
+
+
+def test_token_file_is_private_and_reused(tmp_path) -> None:
+    cfg = Settings(daemon_token_path=tmp_path / "token")
+    token = daemon_mod.daemon_token(cfg, create=True)
+    assert len(token) > 20
+    assert os.stat(cfg.daemon_token_path).st_mode & 0o777 == 0o600
+    assert daemon_mod.daemon_token(cfg) == daemon_mod.daemon_token(cfg, create=True) == token
+    with pytest.raises(ValueError, match="token"):
+        daemon_mod._Server(("127.0.0.1", 0), None, token="")
+
+
+def test_browser_style_requests_are_refused(bot) -> None:
+    server = daemon_mod._Server(("127.0.0.1", 0), bot, token="s3cret")
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+    auth = {"Authorization": "Bearer s3cret"}
+
+    def call(method: str, headers: dict, body: bytes | None = None) -> int:
+        req = urllib.request.Request(
+            f"http://127.0.0.1:{port}/{'send' if body else 'status'}",
+            data=body,
+            headers={**auth, **headers},
+            method=method,
+        )
+        try:
+            with urllib.request.urlopen(req, timeout=5) as resp:
+                return resp.status
+        except urllib.error.HTTPError as e:
+            return e.code
+
+    try:
+        assert call("GET", {}) == 200
+        assert call("GET", {"Origin": "https://evil.example"}) == 403
+        assert call("GET", {"Host": f"evil.example:{port}"}) == 403
+        body = json.dumps({"to": "alice", "message": "hi"}).encode()
+        assert call("POST", {"Content-Type": "text/plain"}, body) == 415
+        assert not bot.sent
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_job_dict_is_a_snapshot(bot) -> None:
+    job = bot.submit(["alice"], "hi")
+    assert job.done.wait(5)
+    snapshot = job.to_dict()
+    job.results["bob"] = "sent"
+    assert snapshot["results"] == {"alice": "sent"}
+
+
+def test_taken_port_starts_no_browser(monkeypatch, tmp_path) -> None:
+    started: List[str] = []
+    monkeypatch.setattr(daemon_mod.Daemon, "start", lambda self: started.append("worker"))
+    with socket.socket() as taken:
+        taken.bind(("127.0.0.1", 0))
+        taken.listen()
+        cfg = Settings(
+            daemon_url=f"http://127.0.0.1:{taken.getsockname()[1]}",
+            daemon_token="s3cret",
+            cookie_path=tmp_path / "session.json",
+        )
+        with pytest.raises(OSError):
+            daemon_mod.serve(cfg)
+    assert started == []
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+=================================================================== 
+Project: Instagram Bot – Automate Instagram Messages 
+File: tests/test_driver.py 
+Author: Mobin Yousefi (GitHub: github.com/mobinyousefi) 
+Created: 2026-10-18 
+Updated: 2026-10-18 
+License: MIT License (see LICENSE file for details)
+=================================================================== 
+
+Description: 
+Tests for the resource-blocking profiles of make_driver: Chrome options
+and the CDP commands sent to a new driver, and how a failed launch on a
+persistent profile is handled.
+
+Usage: 
+pytest -q tests/test_driver.py
+
+Notes: 
+- A recording stand-in replaces webdriver.Chrome; no browser is started.
+
+===================================================================
+"""
+from __future__ import annotations
+
+import pytest
+from selenium.common.exceptions import SessionNotCreatedException, WebDriverException
+
+from instagram_bot.automation import driver as driver_mod
+from instagram_bot.automation.driver import BLOCK_PROFILES, block_profile
+
+
+class _RecordingChrome:
+    def __init__(self, service, options) -> None:
+        self.options = options
+        self.cdp = []
+        self.quit_calls = 0
+
+    def execute_cdp_cmd(self, cmd: str, params: dict) -> dict:
+        self.cdp.append((cmd, params))
+        return {}
+
+    def quit(self) -> None:
+        self.quit_calls += 1
+
+
+def test_safe_profile_blocks_media_and_loads_eagerly() -> None:
+    safe = block_profile("safe")
+    opts = driver_mod._options(True, safe)
+    assert opts.page_load_strategy == "eager"
+    assert opts.experimental_options["prefs"] == {
+        "profile.managed_default_content_settings.images": 2
+    }
+    assert "*.mp4*" in safe.urls and "*.woff*" in safe.urls
+
+
+def test_off_profile_changes_nothing() -> None:
+    opts = driver_mod._options(True, BLOCK_PROFILES["off"])
+    assert opts.page_load_strategy == "normal"
+    assert "prefs" not in opts.experimental_options
+
+    chrome = driver_mod._start(opts, BLOCK_PROFILES["off"], _RecordingChrome)
+    assert [cmd for cmd, _ in chrome.cdp] == ["Page.addScriptToEvaluateOnNewDocument"]
+
+
+def test_blocked_urls_are_sent_over_cdp() -> None:
+    profile = block_profile("safe", ["*example.net/*"])
+    chrome = driver_mod._start(driver_mod._options(True, profile), profile, _RecordingChrome)
+    cmds = dict(chrome.cdp)
+    assert "Network.enable" in cmds
+    assert cmds["Network.setBlockedURLs"]["urls"][-1] == "*example.net/*"
+    assert set(BLOCK_PROFILES["safe"].urls) <= set(cmds["Network.setBlockedURLs"]["urls"])
+
+
+def test_unknown_profile_is_rejected() -> None:
+    with pytest.raises(ValueError, match="safe"):
+        block_profile("everything")
+
+
+def test_failed_cdp_setup_quits_the_browser() -> None:
+    started = []
+
+    class _NoCdpChrome(_RecordingChrome):
+        def __init__(self, service, options) -> None:
+            super().__init__(service, options)
+            started.append(self)
+
+        def execute_cdp_cmd(self, cmd: str, params: dict) -> dict:
+            raise WebDriverException("disconnected: not connected to DevTools")
+
+    profile = BLOCK_PROFILES["off"]
+    with pytest.raises(WebDriverException):
+        driver_mod._start(driver_mod._options(True, profile), profile, _NoCdpChrome)
+    assert started[0].quit_calls == 1
+
+
+def _launch_failing(monkeypatch, message: str) -> list:
+    """Make the profile launch fail with ``message``; throwaway launches work."""
+    launches = []
+
+    def start(opts, blocking, cls=None):
+        launches.append(cls)
+        if cls is driver_mod._ProfileChrome:
+            raise SessionNotCreatedException(message)
+        return _RecordingChrome(None, opts)
+
+    monkeypatch.setattr(driver_mod, "_start", start)
+    return launches
+
+
+def test_profile_is_moved_aside_only_when_chrome_blames_it(monkeypatch, tmp_path) -> None:
+    profile_dir = tmp_path / "profile"
+    profile_dir.mkdir()
+    _launch_failing(monkeypatch, "chrome not reachable")
+    with pytest.raises(SessionNotCreatedException):
+        driver_mod._start_with_profile(True, profile_dir, BLOCK_PROFILES["off"])
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["profile", "profile.lock"]
+
+    launches = _launch_failing(monkeypatch, "user data directory is already in use")
+    driver = driver_mod._start_with_profile(True, profile_dir, BLOCK_PROFILES["off"])
+    assert isinstance(driver, _RecordingChrome) and len(launches) == 2
+    assert not profile_dir.exists()
+    assert any(p.name.startswith("profile.corrupt-") for p in tmp_path.iterdir())
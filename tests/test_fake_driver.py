@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+=================================================================== 
+Project: Instagram Bot – Automate Instagram Messages 
+File: tests/test_fake_driver.py 
+Author: Mobin Yousefi (GitHub: github.com/mobinyousefi) 
+Created: 2026-10-18 
+Updated: 2026-10-18 
+License: MIT License (see LICENSE file for details)
+=================================================================== 
+
+Description: 
+Login, send, retry and timeout paths run against the in-process fake
+WebDriver on a virtual clock, plus trace record/replay.
+
+Usage: 
+pytest -q tests/test_fake_driver.py
+
+Notes: 
+- Every test finishes in milliseconds of wall time, whatever the
+  virtual timeouts add up to.
+
+===================================================================
+"""
+from __future__ import annotations
+
+import random
+import time
+
+import pytest
+from selenium.common.exceptions import InvalidSessionIdException, WebDriverException
+
+from instagram_bot import messaging
+from instagram_bot.auth import login_and_persist
+from instagram_bot.config import Settings
+from instagram_bot.exceptions import (
+    RESTART,
+    ActionBlockedError,
+    MessageSendError,
+    RecipientNotFoundError,
+)
+from instagram_bot.messaging import _confirm_sent, _submit, send_dm
+from instagram_bot.pages import ThreadPage
+from instagram_bot.recipients import RecipientCache
+from instagram_bot.retry import RetryPolicy, classify
+from instagram_bot.testing.fake_driver import (
+    ENTER,
+    FakeDriver,
+    FakeInstagram,
+    ReplayDriver,
+    TraceMismatch,
+    VirtualClock,
+    load_trace,
+    save_trace,
+)
+from instagram_bot.utils import selectors as sel
+
+_NO_JITTER = RetryPolicy(transient=1, base_delay=1.0, jitter=0.0)
+
+
+@pytest.fixture
+def clock():
+    c = VirtualClock()
+    wall = time.perf_counter()
+    with c.patch():
+        yield c
+    assert time.perf_counter() - wall < 2.0
+
+
+@pytest.fixture
+def driver(clock):
+    return FakeDriver(clock)
+
+
+def test_cookie_less_login_then_send(driver, clock, tmp_path) -> None:
+    site = FakeInstagram(driver, latency=0.5)
+    cfg = Settings(
+        username="tester",
+        password="secret",
+        base_url=site.base_url,
+        cookie_path=tmp_path / "session.json",
+    )
+    login_and_persist(driver, cfg)
+    assert site.logged_in() and cfg.cookie_path.exists()
+
+    send_dm(driver, site.base_url, "bob", "hello", type_delay_min=0.0, type_delay_max=0.0)
+    assert site.sent == [("bob", "hello")]
+    assert 3.0 < clock.now < 20.0  # inbox probe, login, compose, search and confirm
+
+
+@pytest.mark.parametrize("dismiss_latency", [0.1, 0.3, 2.0])
+def test_slow_closing_dialog_is_not_a_revisit(driver, dismiss_latency, tmp_path) -> None:
+    site = FakeInstagram(driver, dismiss_latency=dismiss_latency)
+    cfg = Settings(
+        username="tester",
+        password="secret",
+        base_url=site.base_url,
+        cookie_path=tmp_path / "session.json",
+    )
+    login_and_persist(driver, cfg)
+    assert site.logged_in() and driver.current_url == f"{site.base_url}/"
+    clicks = [e for e in driver.trace if e["cmd"] == "click"]
+    assert len(clicks) == 2  # log in, then "Not Now" once
+
+
+def test_unconfirmed_enter_falls_back_to_send_button(driver, clock) -> None:
+    site = FakeInstagram(driver, drop_sends=1)
+    site.log_in()
+    send_dm(
+        driver,
+        site.base_url,
+        "alice",
+        "again",
+        typing="insert",
+        confirm_timeout=10.0,
+        retry_policy=_NO_JITTER,
+    )
+    assert site.sent == [("alice", "again")]
+    # Enter is swallowed and waited out for half the 10 s budget; the Send button then works
+    assert 5.0 < clock.now < 10.0
+    assert [e["cmd"] for e in driver.trace].count("sleep") > 50  # 0.1 s confirm polls
+    clicks = [e for e in driver.trace if e["cmd"] == "click"]
+    assert clicks[-1]["args"] == [{"element": driver.elements("SEND_BUTTON")[0].id}]
+
+
+def _send_button_clicks(driver) -> int:
+    button = {"element": driver.elements("SEND_BUTTON")[0].id}
+    return sum(1 for e in driver.trace if e["cmd"] == "click" and e["args"] == [button])
+
+
+def test_enter_landing_late_is_not_sent_again(driver, clock) -> None:
+    site = FakeInstagram(driver)
+    site.log_in()
+    page = _thread_with(driver, site, "", drop=0)
+    site.send_latency = 5.05  # just past Enter's half of the 10 s budget
+    page.use(sel.DM_TEXTBOX, lambda box: box.send_keys("slow"))
+    _submit(page, _NO_JITTER, confirm_timeout=10.0)
+    assert site.sent == [("alice", "first"), ("alice", "slow")]
+    assert _send_button_clicks(driver) == 0
+
+
+def test_send_retries_share_one_deadline(driver, clock) -> None:
+    site = FakeInstagram(driver)
+    site.log_in()
+    page = _thread_with(driver, site, "", drop=10)
+    page.use(sel.DM_TEXTBOX, lambda box: box.send_keys("lost"))
+    start = clock.now
+    with pytest.raises(MessageSendError, match="within 10.0s"):
+        _submit(page, RetryPolicy(transient=5, base_delay=1.0, jitter=0.0), 10.0)
+    assert clock.now - start <= 10.5  # not 6 attempts x (Enter + button) x 10 s
+    assert site.sent == [("alice", "first")]
+
+
+def test_unknown_recipient_costs_no_timeout(driver, clock) -> None:
+    site = FakeInstagram(driver)
+    site.log_in()
+    with pytest.raises(RecipientNotFoundError):
+        send_dm(driver, site.base_url, "nobody", "hi")
+    assert clock.now < 3.0
+
+
+def test_partial_match_is_never_messaged(driver, clock, tmp_path) -> None:
+    site = FakeInstagram(driver)
+    site.log_in()
+    recipients = RecipientCache(tmp_path / "recipients.json", ttl=3600)
+    with pytest.raises(RecipientNotFoundError):
+        send_dm(driver, site.base_url, "ali", "secret for ali", recipients=recipients)
+    assert site.sent == [] and site.threads == {}  # "alice" was listed, never picked
+    assert recipients.missing("ali") is not None
+
+
+def test_browser_death_after_search_is_a_restart(driver, clock, monkeypatch) -> None:
+    site = FakeInstagram(driver)
+    site.log_in()
+
+    def gone(*args) -> None:
+        raise InvalidSessionIdException("browser has closed the connection")
+
+    def die(min_s: float, max_s: float) -> None:
+        driver._do_find_elements = gone  # dies in the pause between search and pick
+
+    monkeypatch.setattr(messaging, "_human_delay", die)
+    start = clock.now
+    with pytest.raises(Exception) as info:
+        send_dm(driver, site.base_url, "alice", "hi", typing="insert")
+    assert classify(info.value) == RESTART
+    assert clock.now - start < 5.0  # no transient retries, no waiting out the pick timeout
+    assert site.sent == []
+
+
+def test_not_found_of_the_previous_query_is_not_believed(driver, clock) -> None:
+    site = FakeInstagram(driver, search_latency=1.4, flash_not_found=True)
+    site.log_in()
+    send_dm(driver, site.base_url, "bob", "hi", typing="insert")
+    assert site.sent == [("bob", "hi")]
+
+
+EMOJI = "hi 👋🏽 🎉 𝒳"  # none of these are in the Basic Multilingual Plane
+
+
+def test_insert_typing_sends_emoji_in_one_command(driver) -> None:
+    site = FakeInstagram(driver)
+    site.log_in()
+    send_dm(driver, site.base_url, "alice", EMOJI, typing="insert")
+    assert site.sent == [("alice", EMOJI)]
+    inserts = [e for e in driver.trace if e["cmd"] == "execute_cdp_cmd"]
+    assert [e["args"] for e in inserts] == [["Input.insertText", {"text": EMOJI}]]
+    typed = [e["args"][1] for e in driver.trace if e["cmd"] == "send_keys"]
+    assert all(keys == ENTER for keys in typed if keys != "alice")  # only the recipient search
+
+
+def test_insert_typing_falls_back_to_exec_command(driver) -> None:
+    site = FakeInstagram(driver)
+    site.log_in()
+
+    def no_cdp(params: dict) -> dict:
+        raise WebDriverException("unknown command: Input.insertText")
+
+    def exec_command(box, text: str) -> None:
+        box.value += text
+
+    driver.cdp["Input.insertText"] = no_cdp
+    driver.scripts.append(("execCommand('insertText'", exec_command))
+    send_dm(driver, site.base_url, "alice", EMOJI, typing="insert")
+    assert site.sent == [("alice", EMOJI)]
+    with pytest.raises(ValueError, match="typing mode"):
+        send_dm(driver, site.base_url, "alice", EMOJI, typing="paste")
+
+
+def _thread_with(driver, site: FakeInstagram, text: str, drop: int = 0) -> ThreadPage:
+    send_dm(driver, site.base_url, "alice", "first", typing="insert")
+    site.drop_sends = drop
+    driver.elements("DM_TEXTBOX")[0].send_keys(text + ENTER)
+    return ThreadPage(driver)
+
+
+def test_confirm_sent_returns_when_the_bubble_lands(driver, clock) -> None:
+    site = FakeInstagram(driver, send_latency=0.5)
+    site.log_in()
+    page = _thread_with(driver, site, "second")
+    start = clock.now
+    _confirm_sent(page, 1, timeout=10.0)
+    assert site.sent[-1] == ("alice", "second")
+    assert 0.5 <= clock.now - start < 0.7  # 0.1 s polls, not the deadline
+
+
+def test_confirm_sent_gives_up_at_its_deadline(driver, clock) -> None:
+    site = FakeInstagram(driver)
+    site.log_in()
+    page = _thread_with(driver, site, "lost", drop=1)
+    start = clock.now
+    with pytest.raises(MessageSendError, match="within 3.0s"):
+        _confirm_sent(page, 1, timeout=3.0)
+    assert 3.0 <= clock.now - start < 3.2
+    assert site.sent == [("alice", "first")]
+
+
+def test_action_block_is_not_retried(driver) -> None:
+    site = FakeInstagram(driver, blocked=True)
+    site.log_in()
+    with pytest.raises(ActionBlockedError):
+        send_dm(driver, site.base_url, "carol", "hi", typing="insert", retry_policy=_NO_JITTER)
+    enters = [e for e in driver.trace if e["cmd"] == "send_keys" and ENTER in e["args"][1]]
+    assert len(enters) == 1 and not site.sent
+
+
+def test_send_failure_keeps_its_class(driver) -> None:
+    site = FakeInstagram(driver)
+    site.log_in()
+    send_dm(driver, site.base_url, "alice", "first", typing="insert")
+
+    def crash(el, keys) -> None:
+        raise InvalidSessionIdException("browser has closed the connection")
+
+    driver.elements("DM_TEXTBOX")[0].on_keys = crash
+    with pytest.raises(MessageSendError) as info:
+        _submit(ThreadPage(driver), _NO_JITTER, confirm_timeout=5.0)
+    assert info.value.failure_class == RESTART
+    assert classify(info.value) == RESTART
+
+
+def _record(typing: str):
+    with VirtualClock().patch() as clock:
+        driver = FakeDriver(clock)
+        site = FakeInstagram(driver)
+        site.log_in()
+        random.seed(7)
+        send_dm(driver, site.base_url, "alice", "hi there", typing=typing)
+    return driver.trace
+
+
+def _replay(trace, typing: str) -> ReplayDriver:
+    with VirtualClock().patch() as clock:
+        replay = ReplayDriver(trace, clock)
+        random.seed(7)
+        send_dm(replay, FakeInstagram.base_url, "alice", "hi there", typing=typing)
+    return replay
+
+
+def test_replay_accepts_the_same_run_and_rejects_a_changed_one(tmp_path) -> None:
+    save_trace(_record("insert"), tmp_path / "send.jsonl")
+    trace = load_trace(tmp_path / "send.jsonl")
+
+    assert _replay(trace, "insert").done()
+
+    # Per-character typing issues other commands (and sleeps): caught at the first one
+    with pytest.raises(TraceMismatch, match="send_keys"):
+        _replay(trace, "keys")
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+=================================================================== 
+Project: Instagram Bot – Automate Instagram Messages 
+File: tests/test_filelock.py 
+Author: Mobin Yousefi (GitHub: github.com/mobinyousefi) 
+Created: 2026-10-18 
+Updated: 2026-10-18 
+License: MIT License (see LICENSE file for details)
+=================================================================== 
+
+Description: 
+Tests for the advisory file lock guarding profiles and state files.
+
+Usage: 
+pytest -q tests/test_filelock.py
+
+Notes: 
+- flock is per open file, so two FileLocks in one process contend.
+
+===================================================================
+"""
+from __future__ import annotations
+
+import pytest
+
+from instagram_bot.automation.driver import make_driver
+from instagram_bot.exceptions import ProfileLockedError
+from instagram_bot.utils.filelock import FileLock
+
+
+def test_second_holder_is_refused_until_release(tmp_path):
+    path = tmp_path / "x.lock"
+    first = FileLock(path, timeout=0)
+    second = FileLock(path, timeout=0.1)
+    assert first.acquire()
+    assert not second.acquire()
+    first.release()
+    assert second.acquire()
+    second.release()
+
+
+def test_make_driver_refuses_locked_profile(tmp_path):
+    profile = tmp_path / "profile"
+    with FileLock(profile.with_name("profile.lock")):
+        with pytest.raises(ProfileLockedError):
+            make_driver(profile_dir=profile)
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+=================================================================== 
+Project: Instagram Bot – Automate Instagram Messages 
+File: tests/test_fixture_site.py 
+Author: Mobin Yousefi (GitHub: github.com/mobinyousefi) 
+Created: 2026-10-18 
+Updated: 2026-10-18 
+License: MIT License (see LICENSE file for details)
+=================================================================== 
+
+Description: 
+End-to-end tests of login and DM sending against the offline fixture
+site, plus plain-HTTP checks of the site itself.
+
+Usage: 
+pytest -q tests/test_fixture_site.py
+
+Notes: 
+- Browser tests need a local Chrome; HTTP tests always run.
+
+===================================================================
+"""
+from __future__ import annotations
+
+import json
+import urllib.error
+import urllib.request
+from http.cookiejar import CookieJar
+from urllib.parse import urlencode
+
+import pytest
+
+from instagram_bot.auth import login_and_persist
+from instagram_bot.exceptions import LoginError, SessionExpiredError
+from instagram_bot.messaging import send_dm
+from instagram_bot.testing.site import SiteConfig
+from instagram_bot.thread_index import ThreadIndex
+
+
+def _opener():
+    return urllib.request.build_opener(urllib.request.HTTPCookieProcessor(CookieJar()))
+
+
+def _login(site, opener) -> str:
+    form = urlencode({"username": site.cfg.username, "password": site.cfg.password}).encode()
+    with opener.open(f"{site.base_url}/accounts/login/", data=form) as r:
+        return r.geturl()
+
+
+def test_inbox_requires_login(site):
+    with _opener().open(f"{site.base_url}/direct/inbox/") as r:
+        assert "/accounts/login/" in r.geturl()
+        assert "name=\"username\"" in r.read().decode()
+
+
+def test_login_compose_and_send_over_http(site):
+    opener = _opener()
+    assert _login(site, opener).endswith("/accounts/onetap/")
+
+    with opener.open(f"{site.base_url}/api/search?q=al") as r:
+        assert json.loads(r.read()) == ["alice"]
+
+    with opener.open(f"{site.base_url}/direct/open/?u=alice") as r:
+        tid = r.geturl().rstrip("/").rsplit("/", 1)[-1]
+
+    req = urllib.request.Request(
+        f"{site.base_url}/api/send",
+        data=json.dumps({"thread": tid, "text": "hi 🤖"}).encode(),
+        headers={"Content-Type": "application/json"},
+    )
+    opener.open(req).close()
+    assert [(m.username, m.text) for m in site.sent] == [("alice", "hi 🤖")]
+
+
+def test_static_assets_are_served_and_recorded(site):
+    with _opener().open(f"{site.base_url}/static/avatar.jpg") as r:
+        assert r.headers["Content-Type"] == "image/gif" and r.read().startswith(b"GIF89a")
+    assert site.static == ["avatar.jpg"]
+
+
+@pytest.mark.parametrize("site_config", [SiteConfig(fail={"inbox": 500})])
+def test_injected_failure(site):
+    opener = _opener()
+    _login(site, opener)
+    with pytest.raises(urllib.error.HTTPError) as ei:
+        opener.open(f"{site.base_url}/direct/inbox/")
+    assert ei.value.code == 500
+
+
+def test_browser_login_and_send(chrome, site, site_settings):
+    login_and_persist(chrome, site_settings)
+    assert site_settings.cookie_path.exists()
+
+    index = ThreadIndex(site_settings.thread_index_path)
+    send_dm(chrome, site.base_url, "bob", "Hello 🤖", typing="insert", thread_index=index)
+    assert [(m.username, m.text) for m in site.sent] == [("bob", "Hello 🤖")]
+    assert index.get("bob")
+
+    # Second send goes straight to the indexed thread
+    compose_hits = site.hits.get("compose", 0)
+    send_dm(chrome, site.base_url, "bob", "again", thread_index=index)
+    assert site.hits.get("compose", 0) == compose_hits
+    assert len(site.sent) == 2
+
+
+def test_browser_safe_profile_skips_heavy_assets(chrome, site, site_settings):
+    # `chrome` runs the default "safe" blocking profile
+    login_and_persist(chrome, site_settings)
+    send_dm(chrome, site.base_url, "alice", "light", typing="insert")
+    assert [m.text for m in site.sent] == ["light"]
+    assert site.static == []
+
+
+@pytest.mark.parametrize("chrome", ["off"], indirect=True)
+def test_browser_without_blocking_fetches_assets(chrome, site):
+    chrome.get(f"{site.base_url}/accounts/login/")
+    assert "avatar.jpg" in site.static
+
+
+def test_browser_fresh_session_skips_probe(chrome, site, site_settings):
+    login_and_persist(chrome, site_settings)
+    inbox_hits = site.hits.get("inbox", 0)
+
+    login_and_persist(chrome, site_settings)
+    assert site.hits.get("inbox", 0) == inbox_hits
+
+    # Server-side logout is caught lazily by the first real navigation
+    site.expire_sessions()
+    with pytest.raises(SessionExpiredError):
+        send_dm(chrome, site.base_url, "alice", "hi")
+
+
+@pytest.mark.parametrize("site_config", [SiteConfig(challenge=True)])
+def test_browser_login_challenge(chrome, site, site_settings):
+    with pytest.raises(LoginError):
+        login_and_persist(chrome, site_settings)
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+=================================================================== 
+Project: Instagram Bot – Automate Instagram Messages 
+File: tests/test_login_flow.py 
+Author: Mobin Yousefi (GitHub: github.com/mobinyousefi) 
+Created: 2026-10-18 
+Updated: 2026-10-18 
+License: MIT License (see LICENSE file for details)
+=================================================================== 
+
+Description: 
+Tests for the fresh-login state machine: each page state is handled as
+it appears, missing dialogs cost nothing, and rejections or challenges
+fail at once with LoginError.
+
+Usage: 
+pytest -q tests/test_login_flow.py
+
+Notes: 
+- A scripted stub driver plays the login pages; nothing starts Chrome.
+
+===================================================================
+"""
+from __future__ import annotations
+
+import time
+from typing import Callable, Dict, List, Optional
+
+import pytest
+from selenium.common.exceptions import StaleElementReferenceException
+
+from instagram_bot.auth import _fresh_login
+from instagram_bot.config import Settings
+from instagram_bot.exceptions import LoginError
+from instagram_bot.utils import selectors as sel
+from instagram_bot.utils.selectors import Selector
+
+BASE = "https://ig.test"
+
+
+class _El:
+    def __init__(self, on_click: Optional[Callable[[], None]] = None, text: str = "") -> None:
+        self.on_click = on_click
+        self.text = text
+        self.value = ""
+        self.stale = False
+
+    def is_displayed(self) -> bool:
+        if self.stale:
+            raise StaleElementReferenceException("page replaced")
+        return True
+
+    def is_enabled(self) -> bool:
+        return True
+
+    def clear(self) -> None:
+        self.value = ""
+
+    def send_keys(self, text: str) -> None:
+        self.value += text
+
+    def click(self) -> None:
+        if self.on_click:
+            self.on_click()
+
+
+class _Site:
+    """Login pages as a URL plus the selectors currently on screen."""
+
+    def __init__(self, banner: bool = True, after_submit: str = "onetap") -> None:
+        self.current_url = "about:blank"
+        self.banner = banner
+        self.after_submit = after_submit
+        self.dom: Dict[str, _El] = {}
+        self.actions: List[str] = []
+        self.cookies: Dict[str, dict] = {}
+        self.cookie_at: Optional[float] = None
+
+    def show(self, url: str, **elements: _El) -> None:
+        self.current_url = f"{BASE}{url}"
+        for el in self.dom.values():
+            el.stale = True
+        self.dom = {}
+        for name, el in elements.items():
+            selector: Selector = getattr(sel, name)
+            for _, value in selector.alternatives:
+                self.dom[value] = el
+
+    def find_elements(self, by: str, value: str) -> List[_El]:
+        return [self.dom[value]] if value in self.dom else []
+
+    def get_cookie(self, name: str) -> Optional[dict]:
+        if self.cookie_at is not None and time.monotonic() >= self.cookie_at:
+            self._logged_in()
+        return self.cookies.get(name)
+
+    def _logged_in(self) -> None:
+        self.cookies["sessionid"] = {"name": "sessionid", "value": "s3ss10n"}
+
+    def get(self, url: str) -> None:
+        form = dict(
+            USERNAME_INPUT=_El(),
+            PASSWORD_INPUT=_El(),
+            LOGIN_BUTTON=_El(self._submit),
+        )
+        if self.banner:
+            form["ACCEPT_COOKIES"] = _El(self._accept)
+        self.show("/accounts/login/", **form)
+
+    def _accept(self) -> None:
+        self.actions.append("banner")
+        self.banner = False
+        self.get("")
+
+    def _submit(self) -> None:
+        self.actions.append("submit")
+        if self.after_submit == "onetap":
+            self._logged_in()
+            self.show("/accounts/onetap/", NOT_NOW=_El(self._not_now))
+        elif self.after_submit == "home":
+            self._logged_in()
+            self.show("/")
+        elif self.after_submit == "redirect":
+            self.show("/")  # the session cookie only lands a moment later
+            self.cookie_at = time.monotonic() + 0.5
+        elif self.after_submit == "wrong_password":
+            self.show(
+                "/accounts/login/",
+                USERNAME_INPUT=_El(),
+                LOGIN_ERROR=_El(text="Sorry, your password was incorrect."),
+            )
+        else:
+            self.show("/challenge/action/")
+
+    def _not_now(self) -> None:
+        self.actions.append("not_now")
+        self.show("/")
+
+
+def _login(site: _Site) -> float:
+    start = time.monotonic()
+    _fresh_login(site, Settings(username="u", password="p", base_url=BASE))
+    return time.monotonic() - start
+
+
+def test_states_are_handled_as_they_appear() -> None:
+    site = _Site()
+    assert _login(site) < 1.0
+    assert site.actions == ["banner", "submit", "not_now"]
+
+
+def test_absent_dialogs_cost_nothing() -> None:
+    site = _Site(banner=False, after_submit="home")
+    assert _login(site) < 1.0  # used to be ~12 s of "Not Now" probing
+    assert site.actions == ["submit"]
+
+
+def test_done_waits_for_the_session_cookie() -> None:
+    site = _Site(banner=False, after_submit="redirect")
+    assert 0.5 <= _login(site) < 1.5  # not DONE on the bare redirect to "/"
+    assert site.get_cookie("sessionid") is not None
+
+
+@pytest.mark.parametrize(
+    "outcome, message",
+    [("wrong_password", "password was incorrect"), ("challenge", "challenge")],
+)
+def test_rejection_and_challenge_fail_fast(outcome: str, message: str) -> None:
+    site = _Site(banner=False, after_submit=outcome)
+    start = time.monotonic()
+    with pytest.raises(LoginError, match=message):
+        _login(site)
+    assert time.monotonic() - start < 1.0
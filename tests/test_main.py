@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+=================================================================== 
+Project: Instagram Bot – Automate Instagram Messages 
+File: tests/test_main.py 
+Author: Mobin Yousefi (GitHub: github.com/mobinyousefi) 
+Created: 2026-10-18 
+Updated: 2026-10-18 
+License: MIT License (see LICENSE file for details)
+=================================================================== 
+
+Description: 
+Tests for the CLI send loop of main(), driven against the in-process
+fake driver.
+
+Usage: 
+pytest -q tests/test_main.py
+
+Notes: 
+- make_driver is replaced by a FakeDriver factory; no browser is started.
+
+===================================================================
+"""
+from __future__ import annotations
+
+from typing import List
+
+import pytest
+
+from instagram_bot import main as main_mod
+from instagram_bot.automation import driver as driver_mod
+from instagram_bot.testing.fake_driver import FakeDriver, FakeInstagram, VirtualClock
+
+
+@pytest.fixture
+def cli(monkeypatch, tmp_path):
+    for name, value in {
+        "IG_USERNAME": "tester",
+        "IG_PASSWORD": "secret",
+        "IG_BASE_URL": FakeInstagram.base_url,
+        "IG_COOKIE_PATH": str(tmp_path / "session.json"),
+        "IG_THREAD_INDEX_PATH": str(tmp_path / "threads.json"),
+        "IG_RECIPIENT_CACHE_PATH": str(tmp_path / "recipients.json"),
+        "IG_SELECTOR_STATS_PATH": "",
+        "IG_OUTBOX_PATH": "",
+        "IG_PROFILE_DIR": "",
+    }.items():
+        monkeypatch.setenv(name, value)
+    stamps: List[int] = []
+    monkeypatch.setattr(main_mod, "mark_session_valid", lambda cfg: stamps.append(1))
+    with VirtualClock().patch() as clock:
+        sites: List[FakeInstagram] = []
+
+        def make_driver(**kw) -> FakeDriver:
+            driver = FakeDriver(clock)
+            sites.append(FakeInstagram(driver))
+            return driver
+
+        monkeypatch.setattr(driver_mod, "make_driver", make_driver)
+        yield lambda *to: main_mod.main(["--to", *to, "--message", "hi"]), sites, stamps
+
+
+def test_session_is_stamped_only_after_a_send(cli) -> None:
+    run, sites, stamps = cli
+    assert run("nobody") == 1
+    assert stamps == [] and sites[0].sent == []
+
+    assert run("alice", "nobody") == 1
+    assert stamps == [1] and sites[1].sent == [("alice", "hi")]
+
+
+def test_unwritable_session_stamp_does_not_fail_the_run(cli, monkeypatch, capsys) -> None:
+    run, sites, _ = cli
+
+    def read_only(cfg) -> None:
+        raise PermissionError("session.json is read-only")
+
+    monkeypatch.setattr(main_mod, "mark_session_valid", read_only)
+    assert run("alice") == 0
+    assert sites[0].sent == [("alice", "hi")]
+    assert "Could not stamp the session file" in capsys.readouterr().err
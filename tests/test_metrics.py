@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+=================================================================== 
+Project: Instagram Bot – Automate Instagram Messages 
+File: tests/test_metrics.py 
+Author: Mobin Yousefi (GitHub: github.com/mobinyousefi) 
+Created: 2026-10-18 
+Updated: 2026-10-18 
+License: MIT License (see LICENSE file for details)
+=================================================================== 
+
+Description: 
+Tests for timing spans and the metrics sinks.
+
+Usage: 
+pytest -q tests/test_metrics.py
+
+Notes: 
+- Sinks are registered per test and always cleared afterwards.
+
+===================================================================
+"""
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from instagram_bot import metrics
+
+
+@pytest.fixture(autouse=True)
+def _no_leftover_sinks():
+    yield
+    metrics.clear_sinks()
+
+
+def test_span_reports_errors_to_callback():
+    seen = []
+    metrics.add_sink(metrics.CallbackSink(seen.append))
+    with metrics.span("wait", label="dm_textbox"):
+        pass
+    with pytest.raises(TimeoutError):
+        with metrics.span("wait", label="send_button"):
+            raise TimeoutError
+    metrics.event("messaging.fallback", label="first_result")
+
+    assert [(s.name, s.label, s.ok, s.error) for s in seen] == [
+        ("wait", "dm_textbox", True, None),
+        ("wait", "send_button", False, "TimeoutError"),
+        ("messaging.fallback", "first_result", True, None),
+    ]
+
+
+def test_open_spans_track_nesting_without_sinks():
+    with metrics.span("messaging.send_dm"):
+        with pytest.raises(ValueError):
+            with metrics.span("messaging.submit"):
+                assert metrics.open_spans() == ("messaging.send_dm", "messaging.submit")
+                raise ValueError
+        assert metrics.open_spans() == ("messaging.send_dm",)
+    assert metrics.open_spans() == ()
+
+
+def test_jsonl_and_prometheus_sinks(tmp_path):
+    jsonl = tmp_path / "spans.jsonl"
+    prom = tmp_path / "bot.prom"
+    metrics.add_sink(metrics.JsonLinesSink(jsonl))
+    metrics.add_sink(metrics.PrometheusTextSink(prom, min_interval=3600))
+    for _ in range(3):
+        with metrics.span("navigate", label="/direct/new/"):
+            pass
+    metrics.clear_sinks()
+
+    rows = [json.loads(line) for line in jsonl.read_text().splitlines()]
+    assert len(rows) == 3 and rows[0]["attrs"]["label"] == "/direct/new/"
+    text = prom.read_text()
+    assert 'instagram_bot_span_seconds_count{span="navigate",label="/direct/new/"} 3' in text
+    assert 'instagram_bot_span_errors_total{span="navigate",label="/direct/new/"} 0' in text
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+=================================================================== 
+Project: Instagram Bot – Automate Instagram Messages 
+File: tests/test_outbox.py 
+Author: Mobin Yousefi (GitHub: github.com/mobinyousefi) 
+Created: 2026-10-18 
+Updated: 2026-10-18 
+License: MIT License (see LICENSE file for details)
+=================================================================== 
+
+Description: 
+Tests for the durable send queue: idempotent enqueue, crash recovery
+and attempt accounting.
+
+Usage: 
+pytest -q tests/test_outbox.py
+
+Notes: 
+- A "crash" is simulated by dropping the connection mid-drain.
+
+===================================================================
+"""
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from instagram_bot.exceptions import OutboxLockedError
+from instagram_bot.outbox import FAILED, IN_FLIGHT, PENDING, SENT, Outbox, drain
+from instagram_bot.testing.fake_driver import VirtualClock
+
+
+def test_enqueue_is_idempotent_per_batch(tmp_path: Path) -> None:
+    with Outbox(tmp_path / "q.db") as box:
+        assert box.enqueue_many(["alice", "bob"], "hi") == 2
+        assert box.enqueue_many(["alice", "@Bob", "carol"], "hi") == 1
+        assert box.enqueue("alice", "hi", batch="tomorrow")
+        assert box.counts()[PENDING] == 4
+
+
+def test_restart_resumes_only_unfinished_work(tmp_path: Path) -> None:
+    path = tmp_path / "q.db"
+    sent = []
+
+    box = Outbox(path)
+    box.enqueue_many(["alice", "bob", "carol"], "hi")
+
+    def crash_on_bob(item) -> None:
+        if item.username == "bob":
+            raise KeyboardInterrupt  # process killed mid-send
+        sent.append(item.username)
+
+    try:
+        drain(box, crash_on_bob)
+    except KeyboardInterrupt:
+        pass
+    box.close()
+
+    # Same command again after the crash: nothing is re-sent to alice
+    box = Outbox(path)
+    box.recover()
+    box.enqueue_many(["alice", "bob", "carol"], "hi")
+    done = drain(box, lambda item: sent.append(item.username))
+    assert sent == ["alice", "bob", "carol"]
+    assert done[SENT] == 2
+    assert box.counts() == {PENDING: 0, IN_FLIGHT: 0, SENT: 3, FAILED: 0}
+    box.close()
+
+
+def test_recover_requeues_in_flight(tmp_path: Path) -> None:
+    with Outbox(tmp_path / "q.db") as box:
+        box.enqueue("alice", "hi")
+        item = box.claim()
+        assert item is not None and item.attempts == 1
+        assert box.counts()[IN_FLIGHT] == 1
+        assert box.recover() == 1
+        assert box.claim().attempts == 2
+
+
+def test_failures_retry_then_stick(tmp_path: Path) -> None:
+    with Outbox(tmp_path / "q.db", max_attempts=2, retry_delay=0) as box:
+        box.enqueue("alice", "hi")
+
+        def boom(item) -> None:
+            raise RuntimeError("no textbox")
+
+        done = drain(box, boom)
+        assert done == {SENT: 0, FAILED: 1, PENDING: 1}
+        assert box.counts()[FAILED] == 1
+        rows = box._db.execute("SELECT ok, error, duration >= 0 FROM attempts").fetchall()
+        assert rows == [(0, "RuntimeError: no textbox", 1)] * 2
+
+        assert box.retry_failed() == 1
+        drain(box, lambda item: None)
+        assert box.counts()[SENT] == 1
+
+
+def test_only_one_run_consumes_an_outbox(tmp_path: Path) -> None:
+    path = tmp_path / "q.db"
+    with Outbox(path) as first:
+        first.enqueue("alice", "hi")
+        first.recover()
+        assert first.claim() is not None  # a send in progress...
+        with Outbox(path) as second:
+            assert second.enqueue("bob", "hi")  # producers are not locked out
+            with pytest.raises(OutboxLockedError):
+                second.recover()  # ...must not be requeued by a second run
+            with pytest.raises(OutboxLockedError):
+                drain(second, lambda item: None)
+        assert first.counts()[IN_FLIGHT] == 1
+    with Outbox(path) as third:
+        assert third.recover() == 1
+
+
+def test_failed_rows_wait_before_retrying(tmp_path: Path) -> None:
+    starts = []
+
+    def flaky(item) -> None:
+        starts.append(clock.now)
+        if len(starts) < 3:
+            raise RuntimeError("no textbox")
+
+    with VirtualClock().patch() as clock, Outbox(tmp_path / "q.db", retry_delay=10) as box:
+        box.enqueue("alice", "hi")
+        done = drain(box, flaky, sleep=clock.sleep)
+    assert done == {SENT: 1, FAILED: 0, PENDING: 2}
+    assert [round(b - a) for a, b in zip(starts, starts[1:])] == [10, 20]
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+=================================================================== 
+Project: Instagram Bot – Automate Instagram Messages 
+File: tests/test_pages.py 
+Author: Mobin Yousefi (GitHub: github.com/mobinyousefi) 
+Created: 2026-10-18 
+Updated: 2026-10-18 
+License: MIT License (see LICENSE file for details)
+=================================================================== 
+
+Description: 
+Tests for the page-object handle cache: one lookup per element, a
+re-resolve after staleness, and a clean slate after navigation.
+
+Usage: 
+pytest -q tests/test_pages.py
+
+Notes: 
+- Elements go stale when the fake driver "re-renders" the textbox.
+
+===================================================================
+"""
+from __future__ import annotations
+
+from typing import List
+
+from selenium.common.exceptions import StaleElementReferenceException
+
+from instagram_bot.automation.waits import navigate
+from instagram_bot.pages import ThreadPage
+from instagram_bot.utils.selectors import DM_TEXTBOX
+
+
+class _El:
+    def __init__(self) -> None:
+        self.stale = False
+        self.typed: List[str] = []
+
+    def is_displayed(self) -> bool:
+        return True
+
+    def send_keys(self, text: str) -> None:
+        if self.stale:
+            raise StaleElementReferenceException("gone")
+        self.typed.append(text)
+
+
+class _Driver:
+    current_url = "https://www.instagram.com/direct/t/1/"
+
+    def __init__(self) -> None:
+        self.box = _El()
+        self.lookups = 0
+
+    def find_elements(self, by: str, value: str) -> List[_El]:
+        self.lookups += 1
+        return [self.box]
+
+    def get(self, url: str) -> None:
+        self.current_url = url
+
+    def rerender(self) -> None:
+        self.box.stale = True
+        self.box = _El()
+
+
+def _type(page: ThreadPage, text: str) -> None:
+    page.use(DM_TEXTBOX, lambda el: el.send_keys(text))
+
+
+def test_handle_is_resolved_once_and_reused() -> None:
+    driver = _Driver()
+    page = ThreadPage(driver)
+    for ch in "hey":
+        _type(page, ch)
+    assert driver.lookups == 1
+    assert driver.box.typed == ["h", "e", "y"]
+
+
+def test_stale_handle_is_resolved_again() -> None:
+    driver = _Driver()
+    page = ThreadPage(driver)
+    _type(page, "a")
+    old = driver.box
+    driver.rerender()
+
+    _type(page, "b")
+    assert old.typed == ["a"]
+    assert driver.box.typed == ["b"]
+    assert driver.lookups == 2
+
+
+def test_navigation_clears_the_cache() -> None:
+    driver = _Driver()
+    page = ThreadPage(driver)
+    first = page.textbox()
+    navigate(driver, "https://www.instagram.com/direct/t/2/")
+    driver.box = _El()  # new document, new element; the old one never raised
+
+    assert page.textbox() is driver.box is not first
+    assert driver.lookups == 2
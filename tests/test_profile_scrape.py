@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+=================================================================== 
+Project: Instagram Bot – Automate Instagram Messages 
+File: tests/test_profile_scrape.py 
+Author: Mobin Yousefi (GitHub: github.com/mobinyousefi) 
+Created: 2026-10-18 
+Updated: 2026-10-18 
+License: MIT License (see LICENSE file for details)
+=================================================================== 
+
+Description: 
+Tests for ProfileLookup: cached hits and misses, conditional
+revalidation, the request budget, the on-disk cache and streaming
+title extraction (checked against the old BeautifulSoup result).
+
+Usage: 
+pytest -q tests/test_profile_scrape.py
+
+Notes: 
+- Profiles are served by a local http.server; no Instagram traffic.
+
+===================================================================
+"""
+from __future__ import annotations
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Iterator, List, Tuple
+
+import pytest
+
+from bs4 import BeautifulSoup
+
+from instagram_bot.config import Settings
+from instagram_bot.exceptions import LookupBudgetError
+from instagram_bot.testing import title_bench
+from instagram_bot.utils.profile_scrape import (
+    PROFILE_MISSING,
+    PROFILE_OK,
+    PROFILE_PRIVATE,
+    ProfileLookup,
+    RequestBudget,
+    extract_title,
+    lookup_client,
+)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so pooling is observable
+    log: List[Tuple[str, str]] = []
+    ports: set = set()
+
+    def log_message(self, fmt: str, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:  # noqa: N802
+        self.log.append((self.path, self.headers.get("If-None-Match", "")))
+        self.ports.add(self.client_address[1])
+        if self.path == "/alice/" and self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        pages = {
+            "/alice/": "<html><head><title>Alice (@alice)</title></head></html>",
+            "/secret/": "<meta content=\"This Account is Private\"><title>Secret</title>",
+        }
+        body = pages.get(self.path, "<title>Page not found</title>").encode()
+        self.send_response(200 if self.path in pages else 404)
+        self.send_header("ETag", '"v1"')
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def site() -> Iterator[str]:
+    _Handler.log, _Handler.ports = [], set()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_results_are_cached_and_connection_reused(site: str) -> None:
+    with ProfileLookup(site, clock=_Clock()) as lookup:
+        for _ in range(3):
+            assert lookup.lookup("alice").status == PROFILE_OK
+            assert lookup.lookup("Ghost").status == PROFILE_MISSING
+            assert lookup.lookup("secret").status == PROFILE_PRIVATE
+        assert lookup.title("alice") == "Alice (@alice)"
+        assert lookup.title("ghost") is None
+
+    assert [path for path, _ in _Handler.log] == ["/alice/", "/Ghost/", "/secret/"]
+    assert len(_Handler.ports) == 1
+
+
+def test_stale_entries_are_revalidated(site: str) -> None:
+    clock = _Clock()
+    lookup = ProfileLookup(site, ttl=60, negative_ttl=10, clock=clock)
+    lookup.lookup("alice")
+    lookup.lookup("ghost")
+    clock.now += 61
+
+    assert lookup.lookup("alice").fetched_at == clock.now
+    lookup.lookup("ghost")
+    # The 304 kept the cached title; a miss is simply asked again
+    assert lookup.title("alice") == "Alice (@alice)"
+    assert _Handler.log[2:] == [("/alice/", '"v1"'), ("/ghost/", "")]
+
+
+def test_budget_falls_back_to_stale_cache(site: str) -> None:
+    clock = _Clock()
+    lookup = ProfileLookup(site, ttl=60, budget=RequestBudget(1), clock=clock)
+    lookup.lookup("alice")
+    clock.now += 61
+
+    assert lookup.lookup("alice").status == PROFILE_OK  # expired, but better than nothing
+    with pytest.raises(LookupBudgetError):
+        lookup.lookup("bob")
+    assert len(_Handler.log) == 1
+
+
+def test_budget_persists_across_clients(site: str, tmp_path: Path) -> None:
+    cache = tmp_path / "profiles.json"
+    cfg = Settings(base_url=site, profile_cache_path=cache, profile_lookup_budget=1)
+    with lookup_client(cfg) as lookup:
+        assert lookup.lookup("alice").status == PROFILE_OK
+
+    # A new run (a new process, in real use) draws from the same hourly allowance
+    with lookup_client(cfg) as lookup:
+        assert lookup.budget.remaining() == 0
+        with pytest.raises(LookupBudgetError):
+            lookup.lookup("bob")
+    assert len(_Handler.log) == 1
+    assert json.loads((tmp_path / "profiles.json.budget").read_text())["window"] == 3600.0
+
+
+def test_cache_persists_with_lru_bound(site: str, tmp_path: Path) -> None:
+    path = tmp_path / "profiles.json"
+    with ProfileLookup(site, path, max_entries=2, clock=_Clock()) as lookup:
+        for name in ("alice", "ghost", "secret"):
+            lookup.lookup(name)
+
+    again = ProfileLookup(site, path, clock=_Clock())
+    assert again.cached("alice") is None  # evicted as least recently used
+    assert again.lookup("ghost").status == PROFILE_MISSING
+    assert again.lookup("secret").status == PROFILE_PRIVATE
+    assert len(_Handler.log) == 3
+
+
+@pytest.mark.parametrize(
+    "html",
+    [
+        "<html><head><title> Alice (@alice) </title></head><body>x</body></html>",
+        "<TITLE>Caf&eacute; &amp; Co</TITLE>",
+        "<head><title>Ünï 🌙</title><title>second</title>",
+        "<head><title></title></head>",
+        "<head><title>never closed",
+        "<html><body>no title at all</body></html>",
+    ],
+)
+def test_streaming_title_matches_beautifulsoup(html: str) -> None:
+    soup_title = BeautifulSoup(html, "html.parser").find("title")
+    expected = soup_title.text.strip() if soup_title else None
+    data = html.encode("utf-8")
+    for size in (1, 3, len(data)):  # splits land inside tags and multi-byte characters
+        chunks = [data[i : i + size] for i in range(0, len(data), size)]
+        assert extract_title(chunks) == expected
+
+
+def test_streaming_title_stops_early_and_is_capped() -> None:
+    page = title_bench.fixture_page("Bob (@bob)", size=200_000)
+    chunks = [page[i : i + 4096] for i in range(0, len(page), 4096)]
+    it = iter(chunks)
+    assert extract_title(it) == "Bob (@bob)"
+    assert len(list(it)) > len(chunks) // 2  # most of the page was never read
+
+    assert extract_title(chunks, max_bytes=1024) is None
+
+
+def test_title_bench_paths_agree() -> None:
+    pages = {"p": title_bench.fixture_page("Café (@cafe)", size=50_000)}
+    result = title_bench.run(pages, iterations=1)
+    assert result["mismatches"] == []
+    assert result["bytes"]["streaming"] < result["bytes"]["legacy"]
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+=================================================================== 
+Project: Instagram Bot – Automate Instagram Messages 
+File: tests/test_recipients.py 
+Author: Mobin Yousefi (GitHub: github.com/mobinyousefi) 
+Created: 2026-10-18 
+Updated: 2026-10-18 
+License: MIT License (see LICENSE file for details)
+=================================================================== 
+
+Description: 
+Tests for the negative recipient cache: TTL and persistence, send_dm
+skipping known-bad usernames without a browser, and the compose dialog
+failing fast on "No account found.".
+
+Usage: 
+pytest -q tests/test_recipients.py
+
+Notes: 
+- The drivers here are stubs; nothing starts Chrome.
+
+===================================================================
+"""
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from instagram_bot.exceptions import RecipientNotFoundError
+from instagram_bot.messaging import send_dm
+from instagram_bot.pages import _NOT_FOUND_SETTLE, ComposeDialog
+from instagram_bot.recipients import RecipientCache
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_entries_expire_and_persist(tmp_path: Path) -> None:
+    path = tmp_path / "recipients.json"
+    clock = _Clock()
+    cache = RecipientCache(path, ttl=60, clock=clock)
+    cache.mark_missing("@Ghost", "compose search")
+
+    again = RecipientCache(path, ttl=60, clock=clock)
+    assert again.missing("ghost") == "compose search"
+    with pytest.raises(RecipientNotFoundError, match="ghost"):
+        again.check("ghost")
+
+    clock.now += 60
+    assert again.missing("ghost") is None
+    again.check("ghost")
+
+    cache.mark_resolved("ghost")
+    assert RecipientCache(path, ttl=3600, clock=clock).missing("ghost") is None
+
+
+class _NoBrowser:
+    def __getattr__(self, name: str):
+        raise AssertionError(f"driver.{name} used for a known-bad recipient")
+
+
+def test_send_dm_skips_known_bad_recipients() -> None:
+    cache = RecipientCache(None)
+    cache.mark_missing("ghost", "compose search")
+    with pytest.raises(RecipientNotFoundError):
+        send_dm(_NoBrowser(), "https://example.invalid", "ghost", "hi", recipients=cache)
+
+
+class _El:
+    def is_displayed(self) -> bool:
+        return True
+
+
+class _EmptySearch:
+    """Compose dialog whose search came back with nothing."""
+
+    def __init__(self) -> None:
+        self.lookups: List[str] = []
+
+    def find_elements(self, by: str, value: str) -> List[_El]:
+        self.lookups.append(value)
+        return [_El()] if "No account found" in value else []
+
+
+def test_compose_fails_fast_when_nobody_matches() -> None:
+    driver = _EmptySearch()
+    start = time.monotonic()
+    with pytest.raises(RecipientNotFoundError):
+        ComposeDialog(driver).pick("ghost")
+    # Believed once it has stayed up for the settle time; nowhere near the 15 s timeout
+    assert time.monotonic() - start < _NOT_FOUND_SETTLE + 1.0
+    assert not any("role='dialog'] button" in v for v in driver.lookups)  # no first-result click
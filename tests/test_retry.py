@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+=================================================================== 
+Project: Instagram Bot – Automate Instagram Messages 
+File: tests/test_retry.py 
+Author: Mobin Yousefi (GitHub: github.com/mobinyousefi) 
+Created: 2026-10-18 
+Updated: 2026-10-18 
+License: MIT License (see LICENSE file for details)
+=================================================================== 
+
+Description: 
+Tests for failure classification and the retry policy: per-class
+budgets, jittered backoff, re-login on session loss, and the outbox
+giving up on permanent failures at once.
+
+Usage: 
+pytest -q tests/test_retry.py
+
+Notes: 
+- Sleeps are recorded instead of taken.
+
+===================================================================
+"""
+from __future__ import annotations
+
+import random
+from pathlib import Path
+from typing import List
+
+import pytest
+from selenium.common.exceptions import (
+    InvalidSessionIdException,
+    StaleElementReferenceException,
+    TimeoutException,
+)
+
+from instagram_bot.exceptions import (
+    PERMANENT,
+    REAUTH,
+    RESTART,
+    TRANSIENT,
+    ActionBlockedError,
+    ChallengeRequiredError,
+    MessageSendError,
+    RecipientNotFoundError,
+    SessionExpiredError,
+)
+from instagram_bot.outbox import FAILED, PENDING, SENT, Outbox, drain
+from instagram_bot.retry import RetryPolicy, classify, run
+
+
+@pytest.mark.parametrize(
+    "exc, expected",
+    [
+        (StaleElementReferenceException("gone"), TRANSIENT),
+        (TimeoutException("slow"), TRANSIENT),
+        (MessageSendError("not confirmed"), TRANSIENT),
+        (RuntimeError("unknown"), TRANSIENT),
+        (InvalidSessionIdException("browser died"), RESTART),
+        (RecipientNotFoundError("ghost"), PERMANENT),
+        (ActionBlockedError("try again later"), PERMANENT),
+        (ChallengeRequiredError("checkpoint"), PERMANENT),
+        (SessionExpiredError("logged out"), REAUTH),
+    ],
+)
+def test_classify(exc: Exception, expected: str) -> None:
+    assert classify(exc) == expected
+
+
+class _Flaky:
+    def __init__(self, *errors: Exception) -> None:
+        self.errors = list(errors)
+        self.calls = 0
+
+    def __call__(self) -> str:
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+def test_transient_failures_back_off_within_budget() -> None:
+    sleeps: List[float] = []
+    policy = RetryPolicy(transient=3, base_delay=1.0, jitter=0.0)
+    fn = _Flaky(TimeoutException(), TimeoutException(), TimeoutException())
+    assert run(fn, policy, label="t", sleep=sleeps.append) == "ok"
+    assert sleeps == [1.0, 2.0, 4.0]
+
+    fn = _Flaky(*[TimeoutException()] * 4)
+    with pytest.raises(TimeoutException) as info:
+        run(fn, policy, label="t", sleep=sleeps.append)
+    assert fn.calls == 4
+    assert info.value.failure_class == TRANSIENT
+
+
+def test_permanent_failures_are_not_retried() -> None:
+    sleeps: List[float] = []
+    fn = _Flaky(RecipientNotFoundError("ghost"))
+    with pytest.raises(RecipientNotFoundError):
+        run(fn, RetryPolicy(transient=5), label="t", sleep=sleeps.append)
+    assert fn.calls == 1 and sleeps == []
+
+
+def test_reauth_logs_in_again_once() -> None:
+    logins: List[int] = []
+    fn = _Flaky(SessionExpiredError("out"))
+    assert run(fn, RetryPolicy(), label="t", on_reauth=lambda: logins.append(1)) == "ok"
+    assert logins == [1]
+
+    fn = _Flaky(SessionExpiredError("out"), SessionExpiredError("still out"))
+    with pytest.raises(SessionExpiredError):
+        run(fn, RetryPolicy(), label="t", on_reauth=lambda: logins.append(1))
+    with pytest.raises(SessionExpiredError):
+        run(_Flaky(SessionExpiredError("out")), RetryPolicy(), label="t")  # nobody to log in
+
+
+def test_backoff_is_capped_and_jittered() -> None:
+    policy = RetryPolicy(base_delay=1.0, max_delay=5.0, jitter=0.5, rng=random.Random(7))
+    delays = [policy.delay(n) for n in range(6)]
+    caps = [1.0, 2.0, 4.0, 5.0, 5.0, 5.0]
+    assert all(cap / 2 <= d <= cap for d, cap in zip(delays, caps))
+    assert len(set(delays)) == len(delays)
+
+
+def test_outbox_fails_permanent_errors_at_once(tmp_path: Path) -> None:
+    calls: List[str] = []
+
+    def send(item) -> None:
+        calls.append(item.username)
+        if item.username == "ghost":
+            raise RecipientNotFoundError("no such user")
+        raise TimeoutException("slow")
+
+    with Outbox(tmp_path / "outbox.sqlite3", max_attempts=3, retry_delay=0) as box:
+        box.enqueue_many(["ghost", "slow"], "hi")
+        done = drain(box, send)
+    assert done[FAILED] == 2
+    assert calls.count("ghost") == 1
+    assert calls.count("slow") == 3
+
+
+def test_outbox_retries_a_dead_browser(tmp_path: Path) -> None:
+    sends = _Flaky(InvalidSessionIdException("browser died"))
+    with Outbox(tmp_path / "outbox.sqlite3", max_attempts=3, retry_delay=0) as box:
+        box.enqueue("alice", "hi")
+        done = drain(box, lambda item: sends())
+    assert done == {SENT: 1, FAILED: 0, PENDING: 1}
+    assert sends.calls == 2
+    with pytest.raises(InvalidSessionIdException) as info:
+        run(_Flaky(InvalidSessionIdException()), RetryPolicy(transient=5), label="t")
+    assert info.value.failure_class == RESTART
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+=================================================================== 
+Project: Instagram Bot – Automate Instagram Messages 
+File: tests/test_scheduler.py 
+Author: Mobin Yousefi (GitHub: github.com/mobinyousefi) 
+Created: 2026-10-18 
+Updated: 2026-10-18 
+License: MIT License (see LICENSE file for details)
+=================================================================== 
+
+Description: 
+Tests for the heap scheduler, driven by a fake monotonic clock.
+
+Usage: 
+pytest -q tests/test_scheduler.py
+
+Notes: 
+- Jobs "take time" by advancing the fake clock.
+
+===================================================================
+"""
+from __future__ import annotations
+
+import pytest
+
+from instagram_bot.scheduler import FIXED_DELAY, Scheduler
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def _sched(clock: FakeClock) -> Scheduler:
+    return Scheduler(clock=clock, wait=clock.sleep, handle_signals=False)
+
+
+def _job(clock: FakeClock, starts: list, duration: float = 0.0):
+    def fn() -> None:
+        starts.append(clock.now)
+        clock.sleep(duration)
+
+    return fn
+
+
+def test_fixed_rate_does_not_drift() -> None:
+    clock, starts = FakeClock(), []
+    s = _sched(clock)
+    s.every(10, _job(clock, starts, duration=3))
+    s.run(stop_after=45)
+    assert starts == [0, 10, 20, 30, 40]
+
+
+def test_fixed_delay_waits_after_each_run() -> None:
+    clock, starts = FakeClock(), []
+    s = _sched(clock)
+    s.every(10, _job(clock, starts, duration=3), mode=FIXED_DELAY)
+    s.run(stop_after=45)
+    assert starts == [0, 13, 26, 39]
+
+
+@pytest.mark.parametrize(
+    "policy, expected",
+    [
+        ("skip", [0, 30, 40]),
+        ("coalesce", [0, 25, 30, 40]),
+        ("catch_up", [0, 25, 25, 30, 40]),
+    ],
+)
+def test_overrun_policies(policy: str, expected: list) -> None:
+    clock, starts = FakeClock(), []
+    durations = iter([25.0])
+
+    def fn() -> None:
+        starts.append(clock.now)
+        clock.sleep(next(durations, 0.0))
+
+    s = _sched(clock)
+    job = s.every(10, fn, overrun=policy)
+    s.run(stop_after=45)
+    assert starts == expected
+    assert job.runs == len(expected)
+
+
+def test_jobs_interleave_and_cancel() -> None:
+    clock, fast, slow = FakeClock(), [], []
+    s = _sched(clock)
+    s.every(5, _job(clock, fast))
+    slow_job = s.every(7, _job(clock, slow))
+    s.once(8, lambda: s.cancel(slow_job))
+    s.run(stop_after=20)
+    assert fast == [0, 5, 10, 15, 20]
+    assert slow == [0, 7]
+
+
+def test_once_and_shutdown() -> None:
+    clock, starts = FakeClock(), []
+    s = _sched(clock)
+    s.every(1, _job(clock, starts))
+    s.once(3.5, s.shutdown)
+    s.run()
+    assert starts == [0, 1, 2, 3]
+
+
+def test_failed_run_propagates_but_keeps_schedule() -> None:
+    clock = FakeClock()
+    s = _sched(clock)
+
+    def boom() -> None:
+        raise RuntimeError("send failed")
+
+    job = s.every(10, boom)
+    with pytest.raises(RuntimeError):
+        s.run()
+    assert job.runs == 1 and job.next_run == 10
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+=================================================================== 
+Project: Instagram Bot – Automate Instagram Messages 
+File: tests/test_selectors.py 
+Author: Mobin Yousefi (GitHub: github.com/mobinyousefi) 
+Created: 2026-10-18 
+Updated: 2026-10-18 
+License: MIT License (see LICENSE file for details)
+=================================================================== 
+
+Description: 
+Tests for the ranked selector registry: alternative ordering, element
+states, per-alternative stats and persistence.
+
+Usage: 
+pytest -q tests/test_selectors.py
+
+Notes: 
+- The driver stub answers find_elements from a dict and logs every lookup.
+
+===================================================================
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from instagram_bot.utils.selectors import CSS, XPATH, SelectorRegistry
+
+
+class _El:
+    def __init__(self, displayed: bool = True, enabled: bool = True) -> None:
+        self.displayed, self.enabled = displayed, enabled
+
+    def is_displayed(self) -> bool:
+        return self.displayed
+
+    def is_enabled(self) -> bool:
+        return self.enabled
+
+
+class _Driver:
+    def __init__(self, dom: Dict[Tuple[str, str], List[_El]]) -> None:
+        self.dom = dom
+        self.lookups: List[str] = []
+
+    def find_elements(self, by: str, value: str) -> List[_El]:
+        self.lookups.append(value)
+        return self.dom.get((by, value), [])
+
+
+def test_learns_the_alternative_that_matches() -> None:
+    reg = SelectorRegistry()
+    box = reg.register("box", (CSS, "textarea"), (CSS, "div[role='textbox']"))
+    el = _El()
+    driver = _Driver({(CSS, "div[role='textbox']"): [el]})
+
+    assert box.find(driver, "visible") is el
+    assert driver.lookups == ["textarea", "div[role='textbox']"]
+
+    driver.lookups.clear()
+    assert box.find(driver, "visible") is el
+    assert driver.lookups == ["div[role='textbox']"]  # winner tried first now
+
+    stats = reg.stats()["box"]
+    assert [s["attempts"] for s in stats] == [1, 2]
+    assert [s["hit_rate"] for s in stats] == [0.0, 1.0]
+
+
+def test_states_and_params() -> None:
+    reg = SelectorRegistry()
+    row = reg.register("row", (XPATH, "//div[text()='{username}']"))
+    hidden, disabled = _El(displayed=False), _El(enabled=False)
+    driver = _Driver(
+        {(XPATH, "//div[text()='alice']"): [hidden], (XPATH, "//div[text()='bob']"): [disabled]}
+    )
+
+    assert row.find(driver, "present", username="alice") is hidden
+    assert row.find(driver, "visible", username="alice") is None
+    assert row.find(driver, "visible", username="bob") is disabled
+    assert row.clickable(username="bob")(driver) is False
+
+
+def test_stats_survive_a_restart(tmp_path: Path) -> None:
+    path = tmp_path / "selectors.json"
+    reg = SelectorRegistry()
+    btn = reg.register("send", (CSS, "button svg"), (XPATH, "//button[@type='submit']"))
+    driver = _Driver({(XPATH, "//button[@type='submit']"): [_El()]})
+    for _ in range(3):
+        btn.find(driver)
+    reg.save(path)
+
+    fresh = SelectorRegistry()
+    again = fresh.register("send", (CSS, "button svg"), (XPATH, "//button[@type='submit']"))
+    fresh.load(path)
+    assert again.ranked() == [1, 0]
+    assert fresh.stats()["send"][1]["hits"] == 3
+
+    # Unreadable or foreign files leave the defaults alone
+    path.write_text("[1, 2", encoding="utf-8")
+    other = SelectorRegistry()
+    other.register("send", (CSS, "button svg")).find(driver)
+    other.load(path)
+    assert other.stats()["send"][0]["attempts"] == 1
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+=================================================================== 
+Project: Instagram Bot – Automate Instagram Messages 
+File: tests/test_session.py 
+Author: Mobin Yousefi (GitHub: github.com/mobinyousefi) 
+Created: 2026-10-18 
+Updated: 2026-10-18 
+License: MIT License (see LICENSE file for details)
+=================================================================== 
+
+Description: 
+Tests for stored-session freshness (when the login probe may be skipped).
+
+Usage: 
+pytest -q tests/test_session.py
+
+Notes: 
+- Pure file/clock logic; no browser.
+
+===================================================================
+"""
+from __future__ import annotations
+
+import time
+
+from instagram_bot.auth import _session_fresh
+from instagram_bot.cookie_store import SessionRecord
+
+
+def _record(expiry=None, validated_at=None):
+    c = {"name": "sessionid", "value": "x", "domain": ".instagram.com"}
+    if expiry is not None:
+        c["expiry"] = expiry
+    return SessionRecord(cookies=[c], validated_at=validated_at)
+
+
+def test_fresh_only_within_ttl_and_before_expiry():
+    now = time.time()
+    assert _session_fresh(_record(now + 86400, now - 10), ttl=900)
+    assert not _session_fresh(_record(now + 86400, now - 1000), ttl=900)
+    assert not _session_fresh(_record(now + 5, now - 10), ttl=900)
+    assert not _session_fresh(_record(now + 86400, None), ttl=900)
+    assert not _session_fresh(_record(now + 86400, now), ttl=0)
+    assert not _session_fresh(SessionRecord(cookies=[], validated_at=now), ttl=900)
+
+
+class _CdpDriver:
+    """Just enough of a driver for the CDP cookie path; drops 'bad' cookies."""
+
+    def __init__(self):
+        self.calls = []
+        self.jar = []
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.calls.append(cmd)
+        if cmd == "Network.setCookies":
+            self.jar = [c for c in params["cookies"] if c["name"] != "bad"]
+            return {}
+        return {"cookies": self.jar}
+
+
+def test_cdp_restore_is_one_batch_and_reports_rejects(tmp_path, caplog):
+    from instagram_bot.auth import _restore_cookies
+    from instagram_bot.cookie_store import CookieStore
+
+    path = tmp_path / "s.json"
+    CookieStore(path).save(
+        SessionRecord(
+            cookies=[
+                {"name": "sessionid", "value": "1", "domain": ".instagram.com", "sameSite": "Lax"},
+                {"name": "bad", "value": "2", "domain": ".instagram.com"},
+                {"name": "old", "value": "3", "domain": ".instagram.com", "expiry": 1},
+            ]
+        )
+    )
+    driver = _CdpDriver()
+    assert _restore_cookies(driver, "https://www.instagram.com", path)
+    assert driver.calls == ["Network.setCookies", "Network.getAllCookies"]
+    assert [c["name"] for c in driver.jar] == ["sessionid"]
+    assert "'bad'" in caplog.text
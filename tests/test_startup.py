@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+=================================================================== 
+Project: Instagram Bot – Automate Instagram Messages 
+File: tests/test_startup.py 
+Author: Mobin Yousefi (GitHub: github.com/mobinyousefi) 
+Created: 2026-10-18 
+Updated: 2026-10-18 
+License: MIT License (see LICENSE file for details)
+=================================================================== 
+
+Description: 
+Startup cost guards: import-time budget, no WebDriver client on
+--help, and Settings reading the environment when constructed.
+
+Usage: 
+pytest -q tests/test_startup.py
+
+Notes: 
+- Measured in a fresh interpreter so earlier tests' imports don't count.
+
+===================================================================
+"""
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from instagram_bot.config import Settings
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+# Generous on purpose: a cold import with Selenium was ~0.2 s, without it ~0.04 s
+IMPORT_BUDGET = 0.15
+
+_PROBE = """
+import contextlib, io, json, sys, time
+t0 = time.perf_counter()
+import instagram_bot, instagram_bot.main
+elapsed = time.perf_counter() - t0
+with contextlib.redirect_stdout(io.StringIO()):
+    try:
+        instagram_bot.main.main(["--help"])
+    except SystemExit:
+        pass
+heavy = sorted(m for m in sys.modules if m.startswith("selenium.webdriver.remote"))
+print(json.dumps({"elapsed": elapsed, "heavy": heavy}))
+"""
+
+
+def _probe() -> dict:
+    env = dict(os.environ, PYTHONPATH=str(SRC))
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE], env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(out.stdout)
+
+
+def test_cli_import_stays_within_budget() -> None:
+    # Best of three, to ride out a noisy machine
+    results = [_probe() for _ in range(3)]
+    assert all(r["heavy"] == [] for r in results), results[0]["heavy"]
+    assert min(r["elapsed"] for r in results) < IMPORT_BUDGET
+
+
+def test_settings_read_environment_when_built(monkeypatch) -> None:
+    monkeypatch.setenv("IG_SESSION_TTL", "42")
+    monkeypatch.delenv("IG_PROFILE_DIR", raising=False)
+    assert Settings().session_ttl == 42.0
+    assert Settings().profile_dir is None
+
+    monkeypatch.setenv("IG_SESSION_TTL", "7")
+    monkeypatch.setenv("IG_PROFILE_DIR", "/tmp/profile")
+    cfg = Settings()
+    assert cfg.session_ttl == 7.0
+    assert cfg.profile_dir == Path("/tmp/profile")
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+=================================================================== 
+Project: Instagram Bot – Automate Instagram Messages 
+File: tests/test_supervisor.py 
+Author: Mobin Yousefi (GitHub: github.com/mobinyousefi) 
+Created: 2026-10-18 
+Updated: 2026-10-18 
+License: MIT License (see LICENSE file for details)
+=================================================================== 
+
+Description: 
+Tests for the driver supervisor: recycling on send count, memory and
+crash, and the /proc memory reading.
+
+Usage: 
+pytest -q tests/test_supervisor.py
+
+Notes: 
+- Drivers are fakes; no browser is started.
+
+===================================================================
+"""
+from __future__ import annotations
+
+import os
+from typing import List
+
+import pytest
+
+from instagram_bot.automation import supervisor as sup_mod
+from instagram_bot.automation.supervisor import CRASH, MEMORY, SEND_COUNT, DriverSupervisor
+
+
+class _Driver:
+    def __init__(self) -> None:
+        self.dead = False
+        self.quit_called = False
+
+    @property
+    def current_url(self) -> str:
+        if self.dead:
+            raise ConnectionRefusedError("chromedriver is gone")
+        return "about:blank"
+
+    def quit(self) -> None:
+        self.quit_called = True
+
+
+@pytest.fixture
+def drivers() -> List[_Driver]:
+    return []
+
+
+def _supervisor(drivers: List[_Driver], logins: List[_Driver] | None = None, **kw):
+    def factory() -> _Driver:
+        drivers.append(_Driver())
+        return drivers[-1]
+
+    return DriverSupervisor(factory, (logins if logins is not None else []).append, **kw)
+
+
+def test_recycles_after_max_sends(drivers) -> None:
+    logins: List[_Driver] = []
+    sup = _supervisor(drivers, logins, max_sends=3)
+    reasons = []
+    for _ in range(7):
+        sup.get()
+        reasons.append(sup.after_send())
+    assert reasons == [None, None, SEND_COUNT, None, None, SEND_COUNT, None]
+    assert sup.starts == 3 and logins == drivers
+    assert drivers[0].quit_called and drivers[1].quit_called and not drivers[2].quit_called
+    assert sup.recycles == {SEND_COUNT: 2}
+
+
+def test_recycles_when_memory_grows(drivers) -> None:
+    readings = iter([400.0, 900.0, 1600.0, 300.0])
+    sup = _supervisor(drivers, max_memory_mb=1500, memory_probe=lambda d: next(readings))
+    reasons = []
+    for _ in range(4):
+        sup.get()
+        reasons.append(sup.after_send())
+    assert reasons == [None, None, MEMORY, None]
+    assert len(drivers) == 2
+
+
+def test_crashed_driver_is_replaced_on_next_get(drivers) -> None:
+    sup = _supervisor(drivers)
+    first = sup.get()
+    first.dead = True
+    assert sup.after_send() == CRASH
+    assert sup.driver is None and first.quit_called
+    assert sup.get() is drivers[1]
+    assert sup.recycles == {CRASH: 1}
+
+
+def test_failed_login_quits_the_new_driver(drivers) -> None:
+    def login(driver) -> None:
+        raise RuntimeError("checkpoint")
+
+    sup = DriverSupervisor(lambda: drivers.append(_Driver()) or drivers[-1], login)
+    with pytest.raises(RuntimeError):
+        sup.get()
+    assert drivers[0].quit_called and sup.driver is None and sup.starts == 0
+
+
+def test_limits_of_zero_never_recycle(drivers) -> None:
+    sup = _supervisor(drivers, memory_probe=lambda d: pytest.fail("probed"))
+    for _ in range(50):
+        sup.get()
+        assert sup.after_send() is None
+    assert sup.starts == 1
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc"), reason="needs /proc")
+def test_process_tree_memory_counts_this_process() -> None:
+    mb = sup_mod.process_tree_mb(os.getpid())
+    assert mb is not None and mb > 1.0
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+=================================================================== 
+Project: Instagram Bot – Automate Instagram Messages 
+File: tests/test_thread_index.py 
+Author: Mobin Yousefi (GitHub: github.com/mobinyousefi) 
+Created: 2026-10-18 
+Updated: 2026-10-18 
+License: MIT License (see LICENSE file for details)
+=================================================================== 
+
+Description: 
+Tests for the username → thread URL index (no browser needed), and its
+use by send_dm against the in-process fake driver.
+
+Usage: 
+pytest -q
+
+Notes: 
+- The fake inbox lists threads with avatar alt text, as Instagram does.
+
+===================================================================
+"""
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from instagram_bot.messaging import send_dm
+from instagram_bot.testing.fake_driver import FakeDriver, FakeInstagram, VirtualClock
+from instagram_bot.thread_index import ThreadIndex, thread_url_from
+
+
+@pytest.fixture
+def fake():
+    with VirtualClock().patch() as clock:
+        driver = FakeDriver(clock)
+        site = FakeInstagram(driver)
+        site.log_in()
+        yield driver, site
+
+
+def test_thread_url_from():
+    base = "https://www.instagram.com"
+    assert thread_url_from(f"{base}/direct/t/1234/?x=1") == f"{base}/direct/t/1234/"
+    assert thread_url_from(f"{base}/direct/new/") is None
+
+
+def test_index_roundtrip_and_drop(tmp_path):
+    path = tmp_path / "threads.json"
+    index = ThreadIndex(path)
+    index.put("@SomeUser", "https://www.instagram.com/direct/t/42")
+    assert ThreadIndex(path).get("someuser") == "https://www.instagram.com/direct/t/42/"
+
+    index.drop("someuser")
+    assert "someuser" not in ThreadIndex(path)
+
+
+def test_corrupt_index_is_empty(tmp_path):
+    path = tmp_path / "threads.json"
+    path.write_text("{not json", encoding="utf-8")
+    assert len(ThreadIndex(path)) == 0
+
+
+def test_failed_save_keeps_the_previous_index(tmp_path, monkeypatch):
+    path = tmp_path / "threads.json"
+    index = ThreadIndex(path)
+    index.put("alice", "https://www.instagram.com/direct/t/1/")
+
+    def disk_full(src, dst):
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(os, "replace", disk_full)
+    with pytest.raises(OSError):
+        index.put("bob", "https://www.instagram.com/direct/t/2/")
+    assert ThreadIndex(path).get("alice") == "https://www.instagram.com/direct/t/1/"
+    assert [p.name for p in tmp_path.iterdir()] == ["threads.json"]  # no temp file left
+
+
+def test_harvest_keys_threads_by_username(fake, tmp_path):
+    driver, site = fake
+    for user in ("alice", "bob"):
+        send_dm(driver, site.base_url, user, "hi", typing="insert")
+    index = ThreadIndex(tmp_path / "threads.json")
+    assert index.harvest_inbox(driver, site.base_url) == 2
+    for tid, user in site.threads.items():
+        assert index.get(user) == f"{site.base_url}/direct/t/{tid}/"
+
+
+def test_entry_pointing_at_someone_else_is_not_trusted(fake, tmp_path):
+    driver, site = fake
+    send_dm(driver, site.base_url, "bob", "hi bob", typing="insert")
+    bobs_thread = thread_url_from(driver.current_url)
+    index = ThreadIndex(tmp_path / "threads.json")
+    index.put("alice", bobs_thread)
+
+    send_dm(driver, site.base_url, "alice", "hi alice", typing="insert", thread_index=index)
+    assert site.sent == [("bob", "hi bob"), ("alice", "hi alice")]
+    assert index.get("alice") not in (None, bobs_thread)